@@ -0,0 +1,360 @@
+# benchmarks/run.py
+# Times the scanner, every parser, and the schema diff against synthetic
+# inputs of increasing size, and saves the results as JSON so a change can
+# be compared against the commit before it:
+#
+#     python -m benchmarks.run                        # 1k, 10k and 100k
+#     python -m benchmarks.run --sizes 1000 --only scan
+#     python -m benchmarks.run --compare .benchmarks/<old>.json
+#
+# Deliberately a standalone harness, not a pytest plugin: it needs nothing
+# beyond envshield's own dependencies, and never runs as part of `pytest`.
+
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from rich.console import Console
+from rich.table import Table
+
+from envshield import __version__
+from envshield.core import scanner, schema_manager
+from envshield.parsers._docker_compose import DockerComposeParser
+from envshield.parsers._dotenv import DotenvParser
+from envshield.parsers._kubernetes import KubernetesParser
+from envshield.parsers._python import PythonParser
+
+from . import synthetic
+
+console = Console(stderr=True)
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_OUTPUT_DIR = ".benchmarks"
+
+
+class Case:
+    """
+    One benchmark: `run` is timed `repeat` times after `setup` (untimed)
+    has run once. `check`, if given, gets `run`'s last return value and
+    raises if it's wrong -- a faster scan that misses secrets is not an
+    improvement.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        size: int,
+        run: Callable[[], Any],
+        setup: Optional[Callable[[], None]] = None,
+        check: Optional[Callable[[Any], None]] = None,
+    ):
+        self.name = name
+        self.size = size
+        self.run = run
+        self.setup = setup
+        self.check = check
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}[{self.size}]"
+
+
+@contextlib.contextmanager
+def _working_directory(path: str):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def _expect(expected: Dict[str, int]) -> Callable[[tuple], None]:
+    def _check(findings: tuple) -> None:
+        secrets, undeclared = findings[0], findings[1]
+        found = {"secrets": len(secrets), "undeclared_variables": len(undeclared)}
+        wanted = {key: expected[key] for key in found}
+        if found != wanted:
+            raise AssertionError(f"scan found {found}, expected {wanted}")
+
+    return _check
+
+
+def _scan_cases(size: int, expected: Dict[str, int]) -> List[Case]:
+    def _scan_files(jobs: Optional[int], use_cache: bool) -> Callable[[], tuple]:
+        def _run() -> tuple:
+            with scanner._quiet_console():
+                return scanner._scan_files(
+                    ["."], False, None, None, jobs=jobs, use_cache=use_cache
+                )
+
+        return _run
+
+    def _scan_result() -> tuple:
+        result = scanner.scan_result(["."], False, None, None, use_cache=False)
+        return result["secrets"], result["undeclared_variables"]
+
+    check = _expect(expected)
+    return [
+        Case("scan_files/serial", size, _scan_files(1, False), check=check),
+        Case("scan_files/parallel", size, _scan_files(None, False), check=check),
+        Case(
+            "scan_files/cached",
+            size,
+            _scan_files(None, True),
+            setup=_scan_files(None, True),
+            check=check,
+        ),
+        Case("scan_result", size, _scan_result, check=check),
+    ]
+
+
+def _parser_cases(root: str, size: int) -> List[Case]:
+    parsers = (
+        ("dotenv", DotenvParser, synthetic.write_dotenv, ".env"),
+        ("python", PythonParser, synthetic.write_python_settings, "settings.py"),
+        (
+            "docker_compose",
+            DockerComposeParser,
+            synthetic.write_docker_compose,
+            "docker-compose.yml",
+        ),
+        (
+            "kubernetes",
+            KubernetesParser,
+            synthetic.write_kubernetes_manifest,
+            "deployment.yaml",
+        ),
+    )
+    cases = []
+    for name, parser_class, write, file_name in parsers:
+        path = os.path.join(root, file_name)
+        write(path, size)
+
+        def _check(found: Dict[str, str]) -> None:
+            if len(found) != size:
+                raise AssertionError(f"parsed {len(found)} variables, expected {size}")
+
+        cases.append(
+            Case(
+                f"parsers/{name}.get_vars",
+                size,
+                lambda parser_class=parser_class, path=path: parser_class().get_vars(
+                    path, get_values=True
+                ),
+                check=_check,
+            )
+        )
+    return cases
+
+
+def _schema_cases(size: int) -> List[Case]:
+    schema, local_values = synthetic.build_schema(size)
+
+    def _check(diff: schema_manager.SchemaDiff) -> None:
+        if diff.is_clean or not (diff.missing and diff.invalid and diff.extra):
+            raise AssertionError("expected missing, invalid and extra variables")
+
+    return [
+        Case(
+            "schema_manager.diff_against_schema",
+            size,
+            lambda: schema_manager.diff_against_schema(schema, local_values),
+            check=_check,
+        )
+    ]
+
+
+def _time_case(case: Case, repeat: int) -> Dict[str, Any]:
+    if case.setup is not None:
+        case.setup()
+    seconds = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = case.run()
+        seconds.append(time.perf_counter() - started)
+    if case.check is not None:
+        case.check(result)
+    return {
+        "name": case.name,
+        "size": case.size,
+        "repeat": repeat,
+        "seconds": [round(s, 6) for s in seconds],
+        "min": round(min(seconds), 6),
+        "median": round(statistics.median(seconds), 6),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(
+    sizes: List[int],
+    repeat: int,
+    only: Optional[str] = None,
+    secret_ratio: float = 0.01,
+) -> Dict[str, Any]:
+    """Runs every case (whose key contains `only`, if given) at every size."""
+    results = {}
+    for size in sizes:
+        with tempfile.TemporaryDirectory(prefix=f"envshield-bench-{size}-") as tmp:
+            tree = os.path.join(tmp, "tree")
+            configs = os.path.join(tmp, "configs")
+            os.makedirs(configs)
+
+            cases = []
+            if only is None or "scan" in only:
+                console.print(f"[dim]Building a {size}-file tree...[/dim]")
+                expected = synthetic.build_source_tree(
+                    tree, size, secret_ratio=secret_ratio
+                )
+                cases.extend(_scan_cases(size, expected))
+            cases.extend(_parser_cases(configs, size))
+            cases.extend(_schema_cases(size))
+
+            for case in cases:
+                if only is not None and only not in case.key:
+                    continue
+                console.print(f"[cyan]{case.key}[/cyan]...")
+                directory = tree if case.name.startswith("scan") else configs
+                with _working_directory(directory):
+                    results[case.key] = _time_case(case, repeat)
+
+    return {
+        "envshield_version": __version__,
+        "commit": _git_commit(),
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "secret_ratio": secret_ratio,
+        "results": results,
+    }
+
+
+def compare(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float
+) -> List[str]:
+    """
+    Prints each case's median against `baseline`'s, and returns the keys
+    of the cases that got slower by more than `threshold` (0.1 = 10%).
+    """
+    table = Table(
+        title=f"Against {(baseline.get('commit') or 'baseline')[:12]}",
+        border_style="blue",
+    )
+    table.add_column("Case", style="cyan")
+    table.add_column("Before (s)", justify="right")
+    table.add_column("After (s)", justify="right")
+    table.add_column("Change", justify="right")
+    regressions = []
+    for key, result in current["results"].items():
+        before = baseline["results"].get(key)
+        if before is None:
+            table.add_row(key, "-", f"{result['median']:.4f}", "new")
+            continue
+        change = result["median"] / before["median"] - 1 if before["median"] else 0.0
+        style = "green" if change < -threshold else "red" if change > threshold else ""
+        if change > threshold:
+            regressions.append(key)
+        table.add_row(
+            key,
+            f"{before['median']:.4f}",
+            f"{result['median']:.4f}",
+            f"[{style}]{change:+.1%}[/{style}]" if style else f"{change:+.1%}",
+        )
+    console.print(table)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="Benchmarks envshield's scanner, parsers and schema diff.",
+    )
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in DEFAULT_SIZES),
+        help="Comma-separated tree/schema sizes (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Timed runs per case (default: 3)."
+    )
+    parser.add_argument(
+        "--only", help="Run only the cases whose name contains this text."
+    )
+    parser.add_argument(
+        "--secret-ratio",
+        type=float,
+        default=0.01,
+        help="Share of files seeded with a secret (default: 0.01).",
+    )
+    parser.add_argument(
+        "--output",
+        help=f"Where to write the JSON results (default: {DEFAULT_OUTPUT_DIR}/<commit>.json).",
+    )
+    parser.add_argument(
+        "--compare", help="A previous run's JSON results to compare against."
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="With --compare, exit non-zero if any case's median is this much slower (default: 0.1, i.e. 10%%).",
+    )
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    report = run_benchmarks(sizes, args.repeat, args.only, args.secret_ratio)
+
+    output = args.output or os.path.join(
+        DEFAULT_OUTPUT_DIR, f"{(report['commit'] or 'unknown')[:12]}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    console.print(f"Results written to [cyan]{output}[/cyan].")
+
+    table = Table(title="Benchmarks", border_style="blue")
+    table.add_column("Case", style="cyan")
+    table.add_column("Median (s)", justify="right")
+    table.add_column("Min (s)", justify="right")
+    for key, result in report["results"].items():
+        table.add_row(key, f"{result['median']:.4f}", f"{result['min']:.4f}")
+    console.print(table)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold)
+        if regressions:
+            console.print(
+                f"[bold red]{len(regressions)} case(s) slower by more than {args.threshold:.0%}.[/bold red]"
+            )
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
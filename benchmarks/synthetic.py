@@ -0,0 +1,197 @@
+# benchmarks/synthetic.py
+# Builds the synthetic inputs the benchmarks run against: source trees with
+# a controlled share of seeded secrets, config files for every parser, and
+# large schemas. Everything is generated from a seeded RNG, so the same
+# arguments always produce the same bytes -- and results stay comparable
+# from one commit to the next.
+#
+# Secret values are assembled at runtime from their prefixes, so this file
+# itself never contains anything the scanner would flag.
+
+import os
+import random
+import string
+from typing import Any, Dict, Tuple
+
+_UPPER_DIGITS = string.ascii_uppercase + string.digits
+_ALNUM = string.ascii_letters + string.digits
+
+# One line template per seeded secret kind, each filled in with a random
+# value of the right shape.
+_SECRET_TEMPLATES = (
+    lambda rng: "aws_id = " + "AK" + "IA" + _random(rng, _UPPER_DIGITS, 16),
+    lambda rng: "token = '" + "gh" + "p_" + _random(rng, _ALNUM, 36) + "'",
+    lambda rng: "STRIPE = '" + "sk_" + "live_" + _random(rng, _ALNUM, 24) + "'",
+    lambda rng: "API" + "_KEY = '" + _random(rng, _ALNUM, 24) + "'",
+)
+
+_PLAIN_LINES = (
+    "def handler_{i}(event, context):",
+    "    result = compute(event['payload'], retries={i})",
+    "    return {{'status': 200, 'body': result}}",
+    "# Comment line {i}: nothing to see here",
+    "items = [item for item in range({i}) if item % 3]",
+    "logger.info('processed %s records', len(items))",
+)
+
+_EXTENSIONS = (".py", ".py", ".py", ".js", ".ts", ".md", ".yml", ".txt")
+
+
+def _random(rng: random.Random, alphabet: str, length: int) -> str:
+    return "".join(rng.choice(alphabet) for _ in range(length))
+
+
+def build_source_tree(
+    root: str,
+    file_count: int,
+    secret_ratio: float = 0.01,
+    usage_ratio: float = 0.1,
+    lines_per_file: int = 40,
+    files_per_dir: int = 100,
+    seed: int = 0,
+) -> Dict[str, int]:
+    """
+    Writes `file_count` text files under `root`, `files_per_dir` to a
+    directory. A `secret_ratio` share of them get exactly one seeded secret
+    each, and a `usage_ratio` share one `os.getenv` read of a variable no
+    schema declares. Returns the counts a correct scan must report:
+    {"files", "secrets", "undeclared_variables"}.
+    """
+    rng = random.Random(seed)
+    secret_files = set(rng.sample(range(file_count), int(file_count * secret_ratio)))
+    usage_files = set(rng.sample(range(file_count), int(file_count * usage_ratio)))
+
+    for i in range(file_count):
+        directory = os.path.join(root, f"pkg_{i // files_per_dir:04d}")
+        if i % files_per_dir == 0:
+            os.makedirs(directory, exist_ok=True)
+        lines = [
+            rng.choice(_PLAIN_LINES).format(i=rng.randrange(1000))
+            for _ in range(lines_per_file)
+        ]
+        if i in secret_files:
+            lines.insert(rng.randrange(len(lines)), rng.choice(_SECRET_TEMPLATES)(rng))
+        if i in usage_files:
+            lines.insert(
+                rng.randrange(len(lines)), f"value = os.getenv('BENCH_VAR_{i}')"
+            )
+        extension = _EXTENSIONS[i % len(_EXTENSIONS)]
+        with open(os.path.join(directory, f"module_{i:06d}{extension}"), "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+    return {
+        "files": file_count,
+        "secrets": len(secret_files),
+        "undeclared_variables": len(usage_files),
+    }
+
+
+def _var_name(i: int) -> str:
+    return f"BENCH_VAR_{i:06d}"
+
+
+def write_dotenv(path: str, var_count: int) -> None:
+    with open(path, "w") as f:
+        f.write("# Synthetic .env for benchmarking\n")
+        for i in range(var_count):
+            if i % 10 == 0:
+                f.write(
+                    f'export {_var_name(i)}="quoted value {i}" # trailing comment\n'
+                )
+            else:
+                f.write(f"{_var_name(i)}=value_{i}\n")
+
+
+def write_python_settings(path: str, var_count: int) -> None:
+    with open(path, "w") as f:
+        f.write("import os\n\n")
+        for i in range(var_count):
+            if i % 10 == 0:
+                f.write(f"{_var_name(i)} = os.getenv('{_var_name(i)}', 'default')\n")
+            else:
+                f.write(f"{_var_name(i)} = 'value_{i}'\n")
+
+
+def write_docker_compose(path: str, var_count: int) -> None:
+    with open(path, "w") as f:
+        f.write("services:\n  app:\n    image: example/app:latest\n    environment:\n")
+        for i in range(var_count):
+            f.write(f"      {_var_name(i)}: value_{i}\n")
+
+
+def write_kubernetes_manifest(path: str, var_count: int) -> None:
+    with open(path, "w") as f:
+        f.write(
+            "apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: app-config\ndata:\n"
+        )
+        for i in range(0, var_count, 2):
+            f.write(f"  {_var_name(i)}: value_{i}\n")
+        f.write(
+            "---\n"
+            "apiVersion: apps/v1\nkind: Deployment\nmetadata:\n  name: app\n"
+            "spec:\n  template:\n    spec:\n      containers:\n"
+            "        - name: app\n          image: example/app:latest\n"
+            "          env:\n"
+        )
+        for i in range(var_count):
+            if i % 2 == 0:
+                f.write(
+                    f"            - name: {_var_name(i)}\n"
+                    "              valueFrom:\n"
+                    "                configMapKeyRef:\n"
+                    "                  name: app-config\n"
+                    f"                  key: {_var_name(i)}\n"
+                )
+            else:
+                f.write(
+                    f"            - name: {_var_name(i)}\n"
+                    f"              value: value_{i}\n"
+                )
+
+
+# (field schema, a valid local value) pairs cycled through to build a large
+# schema that exercises every kind of constraint diff_against_schema checks.
+_FIELD_KINDS: Tuple[Tuple[Dict[str, Any], str], ...] = (
+    ({}, "plain"),
+    ({"type": "int"}, "42"),
+    ({"type": "port"}, "8080"),
+    ({"type": "url"}, "https://example.com/path"),
+    ({"type": "email"}, "dev@example.com"),
+    ({"type": "bool"}, "true"),
+    ({"enum": ["dev", "staging", "prod"]}, "staging"),
+    ({"pattern": r"^[a-z]+-\d+$"}, "abc-123"),
+    ({"defaultValue": "fallback"}, "set"),
+)
+
+
+def build_schema(
+    var_count: int, seed: int = 0
+) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    A `var_count`-variable schema and a matching set of local values, with
+    a few percent of them missing, blank, invalid, or extra -- so every
+    branch of diff_against_schema has work to do.
+    """
+    rng = random.Random(seed)
+    schema: Dict[str, Any] = {}
+    local_values: Dict[str, str] = {}
+    for i in range(var_count):
+        name = _var_name(i)
+        field, valid_value = _FIELD_KINDS[i % len(_FIELD_KINDS)]
+        field = dict(field)
+        if i % 50 == 1:
+            field["requiredIf"] = {"var": _var_name(i - 1), "equals": "plain"}
+        schema[name] = field
+
+        roll = rng.random()
+        if roll < 0.02:
+            continue  # missing
+        if roll < 0.04:
+            local_values[name] = ""  # blank
+        elif roll < 0.06:
+            local_values[name] = "not valid for this field!"
+        else:
+            local_values[name] = valid_value
+    for i in range(var_count // 50):
+        local_values[f"EXTRA_VAR_{i:06d}"] = "unexpected"
+    return schema, local_values
@@ -1,31 +1,25 @@
 # envshield/cli.py
 import json
 import os
+import sys
 from typing import List, Optional, cast
 
-import questionary
 import typer
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 
 from envshield import __version__
-from envshield.core import importer
 
 from .config import manager as config_manager
-from .core import (
-    doctor,
-    generator,
-    hooks_manager,
-    inspector,
-    scanner,
-    schema_manager,
-    service_discovery,
-    service_manager,
-    setup_manager,
-)
 from .core.exceptions import EnvShieldException
 
+# Every command imports the core modules it needs itself, rather than this
+# module importing all of them up front: between them they pull in
+# questionary (and with it prompt_toolkit), the parsers, the importer and
+# more, and the pre-commit hook's `envshield scan --staged` would pay for
+# all of that on every commit while using almost none of it.
+
 
 # --- Main App Setup ---
 def _version_callback(version: bool) -> None:
@@ -94,10 +88,18 @@ hook_app = typer.Typer(
     no_args_is_help=True,
 )
 app.add_typer(hook_app, name="hook")
+daemon_app = typer.Typer(
+    name="daemon",
+    help="Run a background process that answers the pre-commit hook's scans without a cold start.",
+    no_args_is_help=True,
+)
+app.add_typer(daemon_app, name="daemon")
 
 
 def _seed_schema_from_file(config_file: str, schema_path: str) -> None:
     """Writes a schema at `schema_path` generated from `config_file`'s real values, unless one already exists there."""
+    from .core import importer
+
     if os.path.exists(schema_path):
         return
     content = importer.generate_schema_from_file(config_file)
@@ -122,6 +124,14 @@ def init(
     ),
 ):
     """Initializes EnvShield -- builds env.schema.toml from your real config if one is found, otherwise a framework-aware template."""
+    from .core import (
+        hooks_manager,
+        importer,
+        inspector,
+        schema_manager,
+        service_discovery,
+    )
+
     console.print(
         Panel(
             "[bold cyan]Welcome to EnvShield! Setting up your secure foundation...[/bold cyan]",
@@ -260,6 +270,8 @@ def check(
     ),
 ):
     """Validates a local environment file against the schema. Also accepts a docker-compose or Kubernetes manifest."""
+    from .core import schema_manager, service_manager
+
     try:
         # resolve_targets already never blocks on the interactive "Which
         # service?" picker without a TTY to answer it (CI/scripting,
@@ -362,6 +374,8 @@ def doctor_command(
     ),
 ):
     """Runs a full health check on your project's EnvShield setup."""
+    from .core import doctor, service_manager
+
     if json_output and fix:
         console.print(
             "[bold red]Error:[/bold red] --json and --fix cannot be used together."
@@ -426,6 +440,8 @@ def setup(
     ),
 ):
     """Interactively creates (or completes) a local environment file from the schema."""
+    from .core import hooks_manager, service_manager, setup_manager
+
     try:
         targets = service_manager.resolve_targets(
             service, invocation_dir=INVOCATION_DIR
@@ -471,6 +487,8 @@ def schema_sync(
     ),
 ):
     """Generates/updates the environment template from your schema."""
+    from .core import schema_manager, service_manager
+
     try:
         targets = service_manager.resolve_targets(
             service, invocation_dir=INVOCATION_DIR
@@ -526,6 +544,8 @@ _GENERATE_DEFAULT_OUTPUT = {"python": "config.py", "typescript": "config.ts"}
 
 
 def _resolve_generate_lang(explicit_lang: Optional[str]) -> str:
+    from .core import inspector
+
     if explicit_lang:
         resolved = _GENERATE_LANG_ALIASES.get(explicit_lang.lower())
         if not resolved:
@@ -576,6 +596,8 @@ def generate(
     ),
 ):
     """Generates a typed, validated config module (pydantic-settings or zod) from your schema."""
+    from .core import generator, service_manager
+
     try:
         resolved_lang = _resolve_generate_lang(lang)
         resolved_output = output_file or _GENERATE_DEFAULT_OUTPUT[resolved_lang]
@@ -614,6 +636,10 @@ def generate(
         raise typer.Exit(code=1)
 
 
+# Machine-readable alternatives to scan's Rich tables (see --format).
+_SCAN_FORMATS = ("json", "ndjson", "sarif")
+
+
 @app.command()
 def scan(
     paths: List[str] = typer.Argument(
@@ -646,8 +672,171 @@ def scan(
         "--json",
         help="Print machine-readable JSON instead of tables; suppresses all other output.",
     ),
+    output_format: Optional[str] = typer.Option(
+        None,
+        "--format",
+        help="Machine-readable output format: 'json' (same as --json), 'ndjson' (one finding per line, written as files are scanned, then a summary line), or 'sarif' (SARIF 2.1.0, for code scanning platforms).",
+    ),
+    jobs: Optional[int] = typer.Option(
+        None,
+        "--jobs",
+        "-j",
+        min=1,
+        help="Number of worker processes to scan files with. Defaults to the CPU count.",
+    ),
+    no_cache: bool = typer.Option(
+        False,
+        "--no-cache",
+        help="Rescan every file instead of reusing results for unchanged files from .envshield/scan_cache.json.",
+    ),
+    include_ignored: bool = typer.Option(
+        False,
+        "--include-ignored",
+        help="Inside a Git repository, also scan files .gitignore excludes (walks the whole tree on disk).",
+    ),
+    profile: bool = typer.Option(
+        False,
+        "--profile",
+        help="Report where the scan spent its time, per phase and per pattern (a 'timings' key with --json).",
+    ),
+    watch: bool = typer.Option(
+        False,
+        "--watch",
+        "-w",
+        help="Keep running: rescan only the files that change, and reprint the findings after each change. Ctrl-C to stop.",
+    ),
+    watch_interval: float = typer.Option(
+        1.0,
+        "--watch-interval",
+        min=0.1,
+        help="With --watch, seconds between checks for changed files.",
+    ),
+    history: bool = typer.Option(
+        False,
+        "--history",
+        help="Scan every version of every file in the current branch's Git history for secrets, each unique one once, and report the commit that introduced each.",
+    ),
+    since: Optional[str] = typer.Option(
+        None,
+        "--since",
+        help="With --history, only scan commits after this one (a branch, tag or SHA).",
+    ),
+    diff_range: Optional[str] = typer.Option(
+        None,
+        "--diff",
+        help="Only scan the lines a commit range adds, as of its end: BASE..HEAD (or BASE...HEAD, from where they diverged). For pull-request CI.",
+    ),
+    shard: Optional[str] = typer.Option(
+        None,
+        "--shard",
+        help="Scan only shard i of N (1-based) of the files, to split one scan across CI nodes. Combine their --json results with 'envshield scan-merge'.",
+    ),
+    shard_by: str = typer.Option(
+        "hash",
+        "--shard-by",
+        help="With --shard, how files are split: 'hash' (by path) or 'size' (balancing bytes per shard).",
+    ),
 ):
-    """Scans files for hardcoded secrets and undeclared variables."""
+    """
+    Scans files for hardcoded secrets and undeclared variables.
+
+    'envshield scan-merge FILE...' combines the --json results of a scan
+    split with --shard into one.
+    """
+    from .core import scanner, service_manager
+
+    if output_format is not None:
+        output_format = output_format.lower()
+        if output_format not in _SCAN_FORMATS:
+            console.print(
+                f"[bold red]Error:[/bold red] Unsupported --format '{output_format}'. Use one of: {', '.join(_SCAN_FORMATS)}."
+            )
+            raise typer.Exit(code=1)
+        if json_output and output_format != "json":
+            console.print(
+                f"[bold red]Error:[/bold red] --json and --format {output_format} cannot be used together."
+            )
+            raise typer.Exit(code=1)
+    elif json_output:
+        output_format = "json"
+
+    # What each exclusive mode can't be combined with.
+    modes = (
+        (
+            "--watch",
+            watch,
+            (
+                ("--staged", staged),
+                ("--json/--format", output_format is not None),
+                ("--profile", profile),
+            ),
+        ),
+        (
+            "--history",
+            history,
+            (
+                ("paths", bool(paths)),
+                ("--staged", staged),
+                ("--watch", watch),
+                ("--service", service is not None),
+                ("--format ndjson/sarif", output_format in ("ndjson", "sarif")),
+                ("--include-ignored", include_ignored),
+                ("--profile", profile),
+            ),
+        ),
+        (
+            "--diff",
+            diff_range is not None,
+            (
+                ("paths", bool(paths)),
+                ("--staged", staged),
+                ("--watch", watch),
+                ("--history", history),
+                ("--include-ignored", include_ignored),
+            ),
+        ),
+        (
+            "--shard",
+            shard is not None,
+            (
+                ("--staged", staged),
+                ("--watch", watch),
+                ("--history", history),
+                ("--diff", diff_range is not None),
+            ),
+        ),
+    )
+    for mode, enabled, unsupported in modes:
+        conflicts = [flag for flag, given in unsupported if given]
+        if enabled and conflicts:
+            console.print(
+                f"[bold red]Error:[/bold red] {mode} cannot be used with {', '.join(conflicts)}."
+            )
+            raise typer.Exit(code=1)
+    if since is not None and not history:
+        console.print("[bold red]Error:[/bold red] --since only applies to --history.")
+        raise typer.Exit(code=1)
+    shard_spec = None
+    if shard is not None:
+        from .core import scan_shard
+
+        shard_by = shard_by.lower()
+        if shard_by not in scan_shard.SHARD_STRATEGIES:
+            console.print(
+                f"[bold red]Error:[/bold red] Unsupported --shard-by '{shard_by}'. Use one of: {', '.join(scan_shard.SHARD_STRATEGIES)}."
+            )
+            raise typer.Exit(code=1)
+        try:
+            shard_spec = (*scan_shard.parse_shard(shard), shard_by)
+        except EnvShieldException as e:
+            console.print(f"[bold red]Error:[/bold red] {e}")
+            raise typer.Exit(code=1)
+    if diff_range is not None and ".." not in diff_range:
+        console.print(
+            f"[bold red]Error:[/bold red] --diff takes a commit range, BASE..HEAD, not '{diff_range}'."
+        )
+        raise typer.Exit(code=1)
+
     try:
         if service:
             # Validate eagerly for a consistent "Available: ..." error --
@@ -655,13 +844,75 @@ def scan(
             # configured service", so this only fires for an explicit name.
             service_manager.resolve_service(service, invocation_dir=INVOCATION_DIR)
 
-        if json_output:
+        if history and output_format == "json":
+            from .core import scan_history
+
+            result = scan_history.history_scan_result(
+                since=since,
+                config_path=config,
+                exclude_patterns=exclude,
+                jobs=jobs,
+                use_cache=not no_cache,
+            )
+            print(json.dumps(result, indent=2))
+            if not result["clean"]:
+                raise typer.Exit(code=1)
+        elif history:
+            from .core import scan_history
+
+            scan_history.run_history_scan(
+                since=since,
+                config_path=config,
+                exclude_patterns=exclude,
+                jobs=jobs,
+                use_cache=not no_cache,
+            )
+        elif watch:
+            from .core import scan_watch
+
+            scan_watch.watch(
+                paths=paths,
+                config_path=config,
+                exclude_patterns=exclude,
+                service_name=service,
+                jobs=jobs,
+                use_cache=not no_cache,
+                respect_gitignore=not include_ignored,
+                interval=watch_interval,
+            )
+        elif output_format in ("ndjson", "sarif"):
+            stream_scan = (
+                scanner.scan_ndjson if output_format == "ndjson" else scanner.scan_sarif
+            )
+            clean = stream_scan(
+                sys.stdout,
+                paths=paths,
+                staged_only=staged,
+                config_path=config,
+                exclude_patterns=exclude,
+                service_name=service,
+                jobs=jobs,
+                use_cache=not no_cache,
+                respect_gitignore=not include_ignored,
+                profile=profile,
+                diff_range=diff_range,
+                shard=shard_spec,
+            )
+            if not clean:
+                raise typer.Exit(code=1)
+        elif output_format == "json":
             result = scanner.scan_result(
                 paths=paths,
                 staged_only=staged,
                 config_path=config,
                 exclude_patterns=exclude,
                 service_name=service,
+                jobs=jobs,
+                use_cache=not no_cache,
+                respect_gitignore=not include_ignored,
+                profile=profile,
+                diff_range=diff_range,
+                shard=shard_spec,
             )
             print(json.dumps(result, indent=2))
             if not result["clean"]:
@@ -673,16 +924,49 @@ def scan(
                 config_path=config,
                 exclude_patterns=exclude,
                 service_name=service,
+                jobs=jobs,
+                use_cache=not no_cache,
+                respect_gitignore=not include_ignored,
+                profile=profile,
+                diff_range=diff_range,
+                shard=shard_spec,
             )
     except EnvShieldException as e:
-        if json_output:
+        if output_format == "ndjson":
+            print(json.dumps({"type": "error", "clean": False, "error": str(e)}))
+        elif output_format == "sarif":
+            # A half-written log isn't valid SARIF anyway; stderr at least
+            # keeps the error out of whatever file stdout is going to.
+            typer.echo(f"Error: {e}", err=True)
+        elif output_format == "json":
             print(json.dumps({"clean": False, "error": str(e)}, indent=2))
         else:
             console.print(f"[bold red]Error:[/bold red] {e}")
         raise typer.Exit(code=1)
 
 
+@app.command("scan-merge")
+def scan_merge(
+    files: List[str] = typer.Argument(
+        ..., help="The JSON files each shard's 'scan --shard i/N --json' wrote."
+    ),
+):
+    """Combines the --json results of a scan split with 'scan --shard' into one (always JSON)."""
+    from .core import scan_shard
+
+    try:
+        result = scan_shard.merge_result_files(files)
+    except EnvShieldException as e:
+        print(json.dumps({"clean": False, "error": str(e)}, indent=2))
+        raise typer.Exit(code=1)
+    print(json.dumps(result, indent=2))
+    if not result["clean"]:
+        raise typer.Exit(code=1)
+
+
 def _install_hooks() -> None:
+    from .core import scanner
+
     scanner.install_pre_commit_hook()
     scanner.install_post_merge_hook()
 
@@ -710,12 +994,16 @@ def hook_install():
 @hook_app.command("status")
 def hook_status():
     """Shows which EnvShield Git hooks are currently installed."""
+    from .core import hooks_manager
+
     hooks_manager.HooksManager().print_hook_status()
 
 
 @hook_app.command("remove")
 def hook_remove():
     """Removes any EnvShield-installed Git hook. Leaves alone any hook EnvShield didn't install."""
+    from .core import scanner
+
     try:
         removed = scanner.remove_hooks()
     except EnvShieldException as e:
@@ -729,6 +1017,114 @@ def hook_remove():
         console.print(f"[bold green]✓[/bold green] Removed {hook_name} hook.")
 
 
+# How long `daemon start --detach` waits for the new daemon to answer.
+_DAEMON_START_TIMEOUT = 10.0
+
+
+@daemon_app.command("start")
+def daemon_start(
+    detach: bool = typer.Option(
+        False,
+        "--detach",
+        "-d",
+        help="Run in the background instead of in this terminal.",
+    ),
+    idle_timeout: Optional[float] = typer.Option(
+        None,
+        "--idle-timeout",
+        min=0,
+        help="Exit after this many seconds without a scan. Default: run until stopped.",
+    ),
+):
+    """Serves this repository's pre-commit scans from a warm process, over a per-repository Unix socket."""
+    import subprocess
+    import time
+
+    from .core import daemon
+
+    try:
+        if not detach:
+            daemon.run(idle_timeout)
+            return
+
+        if daemon.status():
+            console.print(
+                "[yellow]An envshield daemon is already running for this repository.[/yellow]"
+            )
+            return
+        command = [sys.executable, "-m", "envshield", "daemon", "start"]
+        if idle_timeout:
+            command += ["--idle-timeout", str(idle_timeout)]
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        deadline = time.monotonic() + _DAEMON_START_TIMEOUT
+        while time.monotonic() < deadline and process.poll() is None:
+            if daemon.status():
+                console.print(
+                    f"[bold green]✓ envshield daemon started[/bold green] [dim](pid {process.pid})[/dim]"
+                )
+                return
+            time.sleep(0.05)
+    except EnvShieldException as e:
+        console.print(f"[bold red]Error:[/bold red] {e}")
+        raise typer.Exit(code=1)
+
+    console.print(
+        "[bold red]Error:[/bold red] The daemon didn't start. Run 'envshield daemon start' without --detach to see why."
+    )
+    raise typer.Exit(code=1)
+
+
+@daemon_app.command("stop")
+def daemon_stop():
+    """Stops this repository's envshield daemon, if one is running."""
+    from .core import daemon
+
+    try:
+        stopped = daemon.stop()
+    except EnvShieldException as e:
+        console.print(f"[bold red]Error:[/bold red] {e}")
+        raise typer.Exit(code=1)
+    if stopped:
+        console.print("[bold green]✓[/bold green] Stopped the envshield daemon.")
+    else:
+        console.print(
+            "[yellow]No envshield daemon is running for this repository.[/yellow]"
+        )
+
+
+@daemon_app.command("status")
+def daemon_status(
+    json_output: bool = typer.Option(
+        False, "--json", help="Print machine-readable JSON instead of text."
+    ),
+):
+    """Shows whether an envshield daemon is serving this repository. Exits non-zero if not."""
+    from .core import daemon
+
+    try:
+        status = daemon.status()
+    except EnvShieldException as e:
+        console.print(f"[bold red]Error:[/bold red] {e}")
+        raise typer.Exit(code=1)
+
+    if json_output:
+        print(json.dumps({"running": status is not None, **(status or {})}, indent=2))
+    elif status is None:
+        console.print("[dim]No envshield daemon is running for this repository.[/dim]")
+    else:
+        console.print(
+            f"[bold green]✓ envshield daemon running[/bold green] (pid {status['pid']}, envshield {status['version']}) -- {status['scans']} scan(s) served."
+        )
+    if status is None:
+        raise typer.Exit(code=1)
+
+
 @app.command(name="import")
 def import_command(
     file: str = typer.Argument(
@@ -759,6 +1155,10 @@ def import_command(
     ),
 ):
     """Generates an env.schema.toml from an existing .env file."""
+    import questionary
+
+    from .core import importer, schema_manager, service_manager
+
     try:
         if service:
             service_manager.resolve_service(service, invocation_dir=INVOCATION_DIR)
@@ -892,6 +1292,8 @@ def service_add(
     ),
 ):
     """Registers one service in envshield.yml by hand, creating the file if needed."""
+    from .core import service_discovery
+
     try:
         schema_path = schema or os.path.join(directory, config_manager.SCHEMA_FILE_NAME)
         if not deployment_manifest:
@@ -977,6 +1379,10 @@ def service_discover(
     existing one with whatever's new -- already-configured services are
     never touched.
     """
+    import questionary
+
+    from .core import hooks_manager, service_discovery
+
     try:
         known_dirs = [
             config_manager.get_service_dir(name)
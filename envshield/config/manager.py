@@ -1,5 +1,7 @@
+import copy
 import os
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, Callable, Dict, List, Optional
 
 import toml
 import yaml
@@ -63,6 +65,52 @@ def find_project_root(start: str = ".") -> Optional[str]:
         current = parent
 
 
+# Parsed envshield.yml and schema files, keyed by absolute path, as
+# ((size, mtime_ns), parsed) -- only kept once a long-running process turns
+# it on (see keep_parsed_files); None, the usual case, parses every read.
+_parsed_files: Optional[Dict[str, tuple]] = None
+
+# A file modified this recently might change again within the same mtime
+# tick and at the same size, so its stat can't vouch for its parsed copy
+# (the same "racily clean" window as scan_cache's).
+_RACY_WINDOW_NS = 2_000_000_000
+
+
+def keep_parsed_files(keep: bool = True) -> None:
+    """
+    Remembers every envshield.yml and schema file parsed from now on, and
+    reparses one only once its size or mtime changes -- for `envshield
+    daemon`, which loads the same few files for every scan it runs.
+    `keep=False` forgets them all and goes back to parsing every read.
+    """
+    global _parsed_files
+    if not keep:
+        _parsed_files = None
+    elif _parsed_files is None:
+        _parsed_files = {}
+
+
+def _parse_file(path: str, parse: Callable[[Any], Any]) -> Any:
+    """`parse`s the open file at `path`, or reuses its last parse (see keep_parsed_files)."""
+    if _parsed_files is None:
+        with open(path, "r") as f:
+            return parse(f)
+
+    key = os.path.abspath(path)
+    st = os.stat(key)
+    signature = (st.st_size, st.st_mtime_ns)
+    cached = _parsed_files.get(key)
+    if cached is not None and cached[0] == signature:
+        # Callers are free to modify what they get back.
+        return copy.deepcopy(cached[1])
+
+    with open(path, "r") as f:
+        parsed = parse(f)
+    if st.st_mtime_ns < time.time_ns() - _RACY_WINDOW_NS:
+        _parsed_files[key] = (signature, copy.deepcopy(parsed))
+    return parsed
+
+
 def load_config(path: Optional[str] = None) -> Dict[str, Any]:
     """
     Loads and parses the envshield.yml file.
@@ -75,9 +123,8 @@ def load_config(path: Optional[str] = None) -> Dict[str, Any]:
             )
         return {}
     try:
-        with open(config_path, "r") as f:
-            config_data = yaml.safe_load(f)
-            return config_data if config_data else {}
+        config_data = _parse_file(config_path, yaml.safe_load)
+        return config_data if config_data else {}
     except yaml.YAMLError as e:
         raise ConfigParseError(config_path, str(e))
     except IOError as e:
@@ -135,8 +182,7 @@ def load_bare_schema(path: str = SCHEMA_FILE_NAME) -> Dict[str, Any]:
 def _load_toml_schema(schema_path: str) -> Dict[str, Any]:
     """Reads and parses one TOML schema file, with friendlier error messages on malformed TOML."""
     try:
-        with open(schema_path, "r") as f:
-            return toml.load(f)
+        return _parse_file(schema_path, toml.load)
     except toml.TomlDecodeError as e:
         error_msg = str(e)
         if "already exists" in error_msg:
@@ -0,0 +1,261 @@
+# envshield/core/daemon.py
+# `envshield daemon`: a long-running process that runs the pre-commit hook's
+# staged scans for one repository, handed to it over a Unix socket by the
+# hook's thin client (see daemon_client). Everything a cold `envshield scan
+# --staged` sets up before scanning anything -- the interpreter, its
+# imports, the compiled patterns, the parsed config and schemas, the scan
+# cache -- is already in memory, so each scan costs only the scan itself.
+
+import contextlib
+import io
+import json
+import os
+import socket
+import time
+from typing import Any, Dict, Optional
+
+import typer
+from rich.console import Console
+
+from ..config import manager as config_manager
+from ..utils import git_utils
+from . import daemon_client, scanner
+from .exceptions import EnvShieldException
+
+console = Console()
+
+
+def _require_unix_sockets() -> None:
+    if not hasattr(socket, "AF_UNIX"):
+        raise EnvShieldException(
+            "envshield daemon needs Unix domain sockets, which this platform doesn't support."
+        )
+
+
+def _repository_socket_path() -> str:
+    _require_unix_sockets()
+    common_dir = daemon_client.git_common_dir()
+    if common_dir is None:
+        raise EnvShieldException("Not inside a Git repository.")
+    return daemon_client.socket_path(common_dir)
+
+
+def status() -> Optional[Dict[str, Any]]:
+    """
+    What the daemon serving the current repository reports about itself --
+    {"pid", "version", "root", "started", "scans"} -- or None if none is.
+    """
+    reply = daemon_client.request(_repository_socket_path(), {"command": "status"})
+    return reply if reply and "pid" in reply else None
+
+
+def stop() -> bool:
+    """Asks the daemon serving the current repository to exit. Returns whether one was."""
+    reply = daemon_client.request(_repository_socket_path(), {"command": "stop"})
+    return bool(reply and reply.get("stopping"))
+
+
+@contextlib.contextmanager
+def _scan_console(request: Dict[str, Any]):
+    """
+    Points the scanner's console at a buffer for the duration, rendering
+    for the client's terminal (or lack of one) rather than the daemon's,
+    and yields the buffer.
+    """
+    buffer = io.StringIO()
+    previous = scanner.console
+    scanner.console = Console(
+        file=buffer,
+        force_terminal=bool(request.get("terminal")),
+        force_interactive=False,
+        no_color=bool(request.get("no_color")),
+        width=request.get("width") or None,
+    )
+    try:
+        yield buffer
+    finally:
+        scanner.console = previous
+
+
+@contextlib.contextmanager
+def _client_context(request: Dict[str, Any]):
+    """
+    Runs the block as if it were the client's own `envshield` process: from
+    its working directory (moved to the project root, as the CLI does),
+    with its GIT_* environment in place of the daemon's.
+    """
+    previous_cwd = os.getcwd()
+    previous_env = {
+        key: value for key, value in os.environ.items() if key.startswith("GIT_")
+    }
+    try:
+        os.chdir(request["cwd"])
+        root = config_manager.find_project_root()
+        if root:
+            os.chdir(root)
+        for key in previous_env:
+            del os.environ[key]
+        os.environ.update(request.get("env") or {})
+        # A cached GitContext could be another worktree's, or carry another
+        # commit's temporary index.
+        git_utils.invalidate_git_context()
+        yield
+    finally:
+        for key in [key for key in os.environ if key.startswith("GIT_")]:
+            del os.environ[key]
+        os.environ.update(previous_env)
+        git_utils.invalidate_git_context()
+        os.chdir(previous_cwd)
+
+
+class ScanDaemon:
+    """
+    Serves one repository's staged scans, one request at a time: each is a
+    line of JSON from daemon_client, answered with a line of JSON. A scan
+    is {"command": "scan", "cwd", "env", ...}, answered with its rendered
+    report and exit status -- {"output", "exit_code"} -- exactly as `envshield
+    scan --staged` would have printed and returned them; "status" and
+    "stop" are answered too. Anything that goes wrong is answered with
+    {"error"}, on which the client falls back to scanning for itself: a
+    daemon problem must never let a commit through unscanned.
+    """
+
+    def __init__(self, socket_path: str, idle_timeout: Optional[float] = None):
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self.root = os.getcwd()
+        self.started = time.time()
+        self.scans = 0
+        self._stopping = False
+        self._listener: Optional[socket.socket] = None
+
+    def listen(self) -> None:
+        """
+        Binds the socket, in a directory only this user can reach. A socket
+        file left behind by a daemon that didn't exit cleanly is replaced;
+        one that still answers means a daemon is already running.
+        """
+        _require_unix_sockets()
+        directory = os.path.dirname(self.socket_path)
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        if not daemon_client.is_private_dir(directory):
+            raise EnvShieldException(
+                f"Refusing to use {directory} for the daemon's socket: it must be a directory only you can access."
+            )
+        if os.path.exists(self.socket_path):
+            if daemon_client.request(self.socket_path, {"command": "status"}):
+                raise EnvShieldException(
+                    "An envshield daemon is already running for this repository."
+                )
+            os.remove(self.socket_path)
+
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(self.socket_path)
+        self._listener.listen()
+        # Everything is loaded once, now, rather than on the first commit.
+        config_manager.keep_parsed_files()
+        scanner._resident_caches = {}
+
+    def serve_forever(self) -> None:
+        """
+        Answers requests until asked to stop -- or, with an `idle_timeout`,
+        until that many seconds pass without one.
+        """
+        self._listener.settimeout(self.idle_timeout or None)
+        try:
+            while not self._stopping:
+                try:
+                    connection, _address = self._listener.accept()
+                except socket.timeout:
+                    break
+                with connection:
+                    self._handle(connection)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+            try:
+                os.remove(self.socket_path)
+            except OSError:
+                pass
+        scanner._resident_caches = None
+        config_manager.keep_parsed_files(False)
+
+    def _handle(self, connection: socket.socket) -> None:
+        connection.settimeout(None)
+        try:
+            with connection.makefile("rb") as stream:
+                line = stream.readline()
+            reply = self.respond(json.loads(line))
+        except Exception as e:
+            # Whatever broke, the client still gets an answer (see above).
+            reply = {"error": f"{type(e).__name__}: {e}"}
+        try:
+            connection.sendall(json.dumps(reply).encode("utf-8") + b"\n")
+        except OSError:
+            # The client gave up waiting; nothing to answer.
+            pass
+
+    def respond(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """The reply to one request (see the class docstring)."""
+        command = request.get("command")
+        if command == "status":
+            return {
+                "pid": os.getpid(),
+                "version": daemon_client.__version__,
+                "root": self.root,
+                "started": self.started,
+                "scans": self.scans,
+            }
+        if command == "stop":
+            self._stopping = True
+            return {"stopping": True}
+        if command != "scan":
+            return {"error": f"unknown command {command!r}"}
+        if request.get("version") != daemon_client.__version__:
+            # The patterns, or the scan itself, may differ between versions.
+            return {
+                "error": f"the daemon runs envshield {daemon_client.__version__}, not {request.get('version')}; restart it"
+            }
+        return self._scan(request)
+
+    def _scan(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        exit_code = 0
+        with _client_context(request), _scan_console(request) as output:
+            try:
+                scanner.run_scan(
+                    paths=None,
+                    staged_only=True,
+                    config_path=None,
+                    exclude_patterns=None,
+                )
+            except typer.Exit as e:
+                exit_code = e.exit_code
+            except EnvShieldException as e:
+                scanner.console.print(f"[bold red]Error:[/bold red] {e}")
+                exit_code = 1
+        self.scans += 1
+        return {"output": output.getvalue(), "exit_code": exit_code}
+
+
+def run(idle_timeout: Optional[float] = None) -> None:
+    """
+    `envshield daemon start`: serves the current repository's staged scans
+    until stopped (`envshield daemon stop`, Ctrl-C, or `idle_timeout`).
+    """
+    daemon = ScanDaemon(_repository_socket_path(), idle_timeout)
+    daemon.listen()
+    console.print(
+        f"[bold green]✓ envshield daemon serving {git_utils.get_git_root() or daemon.root}[/bold green] [dim](pid {os.getpid()})[/dim]"
+    )
+    console.print(
+        "[dim]The pre-commit hook now hands its scans to this process. Stop it with 'envshield daemon stop'.[/dim]"
+    )
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    console.print("[dim]envshield daemon stopped.[/dim]")
@@ -0,0 +1,186 @@
+# envshield/core/daemon_client.py
+# The thin client the pre-commit hook runs first: if an `envshield daemon` is
+# serving this repository, it hands the daemon the staged scan and prints
+# its report, so a commit never pays for envshield's own cold start.
+#
+# Deliberately standard-library only (envshield's __init__ is just its
+# version): importing typer, rich or the scanner here would put that cold
+# start right back.
+
+import hashlib
+import json
+import os
+import socket
+import subprocess
+import sys
+from typing import Any, Dict, Optional
+
+from envshield import __version__
+
+# The exit status meaning "no daemon answered -- run the scan yourself":
+# EX_TEMPFAIL, from sysexits.h. The pre-commit hook falls back to a plain
+# `envshield scan --staged` on it.
+UNAVAILABLE = 75
+
+# How long to wait for a daemon to accept a connection. The scan itself
+# can take as long as it takes.
+_CONNECT_TIMEOUT = 1.0
+
+# Environment variables Git sets for a hook that change what "staged"
+# means -- above all GIT_INDEX_FILE, which `git commit -a` and `git commit
+# <paths>` point at a temporary index -- and so have to reach the daemon's
+# own git calls. Anything else GIT_* is forwarded too.
+_PATH_GIT_VARIABLES = ("GIT_INDEX_FILE", "GIT_DIR", "GIT_WORK_TREE")
+
+# Where socket_dir goes, first set wins: the per-user runtime directory
+# (tmpfs, cleared at logout) if there is one, else the temp directory.
+_RUNTIME_DIR_VARIABLES = ("XDG_RUNTIME_DIR", "TMPDIR")
+
+
+def git_common_dir(cwd: Optional[str] = None) -> Optional[str]:
+    """
+    The absolute common Git directory of the repository `cwd` (default: the
+    current directory) is in -- shared by all its worktrees, so one daemon
+    serves every one of them -- or None outside a repository.
+    """
+    cwd = os.path.abspath(cwd or os.getcwd())
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--git-common-dir"],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError, NotADirectoryError):
+        return None
+    common_dir = result.stdout.strip()
+    return os.path.abspath(os.path.join(cwd, common_dir)) if common_dir else None
+
+
+def socket_dir() -> str:
+    """
+    The directory every daemon socket of this user lives in. It's only ever
+    trusted if it's a real directory owned by this user that nobody else
+    can get into (see is_private_dir), so no other user can stand up a
+    socket that answers for our repositories.
+    """
+    runtime_dir = next(
+        (os.environ[name] for name in _RUNTIME_DIR_VARIABLES if os.environ.get(name)),
+        "/tmp",
+    )
+    return os.path.join(runtime_dir, f"envshield-{os.getuid()}")
+
+
+def socket_dir_shell() -> str:
+    """
+    socket_dir as a POSIX shell expression, for the pre-commit hook to look
+    for a running daemon without starting an interpreter to ask.
+    """
+    runtime_dir = "/tmp"
+    for name in reversed(_RUNTIME_DIR_VARIABLES):
+        runtime_dir = f"${{{name}:-{runtime_dir}}}"
+    return f'"{runtime_dir}/envshield-$(id -u)"'
+
+
+def is_private_dir(path: str) -> bool:
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return (
+        os.path.isdir(path)
+        and not os.path.islink(path)
+        and st.st_uid == os.getuid()
+        and not st.st_mode & 0o077
+    )
+
+
+def socket_path(common_dir: str) -> str:
+    """
+    The Unix socket a daemon for the repository at `common_dir` listens on.
+    Named by a hash of the directory rather than kept inside it: a socket's
+    path can't be much over 100 bytes, and a repository's can.
+    """
+    digest = hashlib.blake2b(common_dir.encode("utf-8"), digest_size=8).hexdigest()
+    return os.path.join(socket_dir(), f"{digest}.sock")
+
+
+def request(
+    path: str, payload: Dict[str, Any], timeout: Optional[float] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Sends `payload` to the daemon listening at `path` and returns its
+    reply, or None if nothing is listening there (or it hung up without
+    one). Both are one line of JSON.
+    """
+    if not hasattr(socket, "AF_UNIX") or not is_private_dir(os.path.dirname(path)):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.settimeout(_CONNECT_TIMEOUT)
+            connection.connect(path)
+            connection.settimeout(timeout)
+            connection.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+            with connection.makefile("rb") as reply:
+                line = reply.readline()
+    except OSError:
+        return None
+    try:
+        return json.loads(line) if line else None
+    except ValueError:
+        return None
+
+
+def _forwarded_git_env() -> Dict[str, str]:
+    env = {key: value for key, value in os.environ.items() if key.startswith("GIT_")}
+    # Relative to this process's directory, which the daemon doesn't share.
+    for key in _PATH_GIT_VARIABLES:
+        if env.get(key):
+            env[key] = os.path.abspath(env[key])
+    return env
+
+
+def _terminal_width() -> Optional[int]:
+    try:
+        return os.get_terminal_size(sys.stdout.fileno()).columns
+    except (OSError, ValueError):
+        return None
+
+
+def main() -> int:
+    """
+    Runs a staged scan through this repository's daemon, printing its
+    report and returning its exit status -- or UNAVAILABLE, having printed
+    nothing to stdout, if no daemon could run it.
+    """
+    common_dir = git_common_dir()
+    if common_dir is None:
+        return UNAVAILABLE
+    reply = request(
+        socket_path(common_dir),
+        {
+            "command": "scan",
+            "version": __version__,
+            "cwd": os.getcwd(),
+            "env": _forwarded_git_env(),
+            "terminal": sys.stdout.isatty(),
+            "no_color": "NO_COLOR" in os.environ,
+            "width": _terminal_width(),
+        },
+    )
+    if reply is None:
+        return UNAVAILABLE
+    if "error" in reply:
+        print(
+            f"envshield daemon: {reply['error']} -- scanning without it.",
+            file=sys.stderr,
+        )
+        return UNAVAILABLE
+    sys.stdout.write(reply.get("output", ""))
+    sys.stdout.flush()
+    return int(reply.get("exit_code", 1))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,7 +10,7 @@ from rich.console import Console
 
 from ..parsers.factory import get_parser
 from .exceptions import EnvShieldException
-from .scanner import SECRET_PATTERNS
+from .scanner import match_secret_type
 
 _EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
 
@@ -72,9 +72,8 @@ def _classify_variable(key: str, value: str) -> Tuple[bool, Any]:
     """
     # 1. Check value against high-confidence secret patterns first -- this
     # always wins, even for a conventionally-public name.
-    for secret in SECRET_PATTERNS:
-        if re.search(secret["pattern"], value):
-            return True, None
+    if match_secret_type(value):
+        return True, None
 
     # 2. A conventionally-public name is never treated as secret from its
     # name alone -- skip the keyword heuristic entirely for these.
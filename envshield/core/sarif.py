@@ -0,0 +1,205 @@
+# envshield/core/sarif.py
+# Writes `envshield scan` findings as a SARIF 2.1.0 log -- the format code
+# scanning platforms (GitHub code scanning, Azure DevOps, ...) ingest.
+
+import json
+import os
+import pathlib
+import re
+import urllib.parse
+from typing import IO, Any, Dict, List, Optional
+
+from .. import __version__
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_VERSION = "2.1.0"
+
+UNDECLARED_VARIABLE_RULE_ID = "undeclared-variable"
+
+# The base every relative result URI is resolved against.
+_SRCROOT = "%SRCROOT%"
+
+
+def rule_id(secret_type: str) -> str:
+    """
+    The stable SARIF rule ID for a SECRET_PATTERNS entry, derived from its
+    name alone -- 'GitHub Personal Access Token (Classic)' is always
+    'secret/github-personal-access-token-classic' -- so a platform can
+    track, suppress, or dismiss one secret type across runs and versions
+    regardless of where the pattern sits in the list.
+    """
+    return "secret/" + re.sub(r"[^a-z0-9]+", "-", secret_type.lower()).strip("-")
+
+
+def _rules(secret_patterns: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    rules = [
+        {
+            "id": rule_id(pattern["name"]),
+            "name": pattern["name"],
+            "shortDescription": {"text": f"Hardcoded {pattern['name']}"},
+            "defaultConfiguration": {"level": "error"},
+        }
+        for pattern in secret_patterns
+    ]
+    rules.append(
+        {
+            "id": UNDECLARED_VARIABLE_RULE_ID,
+            "name": "Undeclared environment variable",
+            "shortDescription": {
+                "text": "Environment variable used in code but not declared in the schema"
+            },
+            "defaultConfiguration": {"level": "warning"},
+        }
+    )
+    return rules
+
+
+def _artifact_location(file_path: str, root: str) -> Dict[str, str]:
+    """
+    A file under `root` (the directory the scan ran from) gets a relative
+    URI against %SRCROOT%, which is what lets a platform map it onto its
+    own checkout; anything else an absolute file:// URI.
+    """
+    absolute = os.path.abspath(file_path)
+    relative = os.path.relpath(absolute, root)
+    if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+        return {"uri": pathlib.Path(absolute).as_uri()}
+    return {
+        "uri": urllib.parse.quote(relative.replace(os.sep, "/")),
+        "uriBaseId": _SRCROOT,
+    }
+
+
+class SarifWriter:
+    """
+    Writes one SARIF log to `out` incrementally: start() writes everything
+    up to the opening of the results array, add() appends each file's
+    results as they come in, and finish() closes the document -- so the
+    log is never built up in memory, however many findings there are.
+
+    Matched line text is deliberately left out of every result: a SARIF
+    file is uploaded and stored elsewhere, and would otherwise be one more
+    place for the very secrets it reports to leak.
+    """
+
+    def __init__(
+        self, out: IO[str], secret_patterns: List[Dict[str, Any]], root: str = "."
+    ):
+        self.out = out
+        self.root = os.path.abspath(root)
+        self.rules = _rules(secret_patterns)
+        self._rule_index = {rule["id"]: i for i, rule in enumerate(self.rules)}
+        self.result_count = 0
+
+    def start(self) -> None:
+        root_uri = pathlib.Path(self.root).as_uri().rstrip("/") + "/"
+        driver = {
+            "name": "envshield",
+            "version": __version__,
+            "informationUri": "https://github.com/rabbilyasar/envshield",
+            "rules": self.rules,
+        }
+        self.out.write(
+            "{"
+            f'"$schema":{json.dumps(SARIF_SCHEMA)},'
+            f'"version":{json.dumps(SARIF_VERSION)},'
+            '"runs":[{'
+            f'"tool":{{"driver":{json.dumps(driver)}}},'
+            f'"originalUriBaseIds":{{{json.dumps(_SRCROOT)}:{{"uri":{json.dumps(root_uri)}}}}},'
+            '"results":['
+        )
+
+    def add(self, secrets: List[Dict], undeclared: List[Dict]) -> None:
+        for finding in secrets:
+            self._write_result(
+                rule_id(finding["secret_type"]),
+                "error",
+                f"Potential {finding['secret_type']} hardcoded in source.",
+                finding,
+            )
+        for finding in undeclared:
+            self._write_result(
+                UNDECLARED_VARIABLE_RULE_ID,
+                "warning",
+                f"'{finding['variable_name']}' is used in code but not declared in the schema.",
+                finding,
+            )
+
+    def _write_result(
+        self, result_rule_id: str, level: str, message: str, finding: Dict
+    ) -> None:
+        result = {
+            "ruleId": result_rule_id,
+            "ruleIndex": self._rule_index[result_rule_id],
+            "level": level,
+            "message": {"text": message},
+            "locations": [
+                {
+                    "physicalLocation": {
+                        "artifactLocation": _artifact_location(
+                            finding["file_path"], self.root
+                        ),
+                        "region": {"startLine": finding["line_num"]},
+                    }
+                }
+            ],
+        }
+        if self.result_count:
+            self.out.write(",")
+        self.out.write(json.dumps(result))
+        self.result_count += 1
+
+    def finish(
+        self,
+        skipped_files: List[str],
+        skipped_binary_files: List[str],
+        skipped_lines: Optional[List[Dict]] = None,
+        timings: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Closes the log. Files too large to scan, and lines too long for
+        some patterns, are reported as warning notifications on the run's
+        invocation -- coverage a reviewer should know is missing; binary
+        files, an expected skip, aren't. `timings` (from `--profile`) goes
+        in the invocation's properties.
+        """
+        notifications = [
+            {
+                "level": "warning",
+                "message": {"text": "File exceeds the maximum scan size; not scanned."},
+                "locations": [
+                    {
+                        "physicalLocation": {
+                            "artifactLocation": _artifact_location(path, self.root)
+                        }
+                    }
+                ],
+            }
+            for path in skipped_files
+        ]
+        notifications.extend(
+            {
+                "level": "warning",
+                "message": {"text": f"Line not fully scanned: {skipped['reason']}."},
+                "locations": [
+                    {
+                        "physicalLocation": {
+                            "artifactLocation": _artifact_location(
+                                skipped["file_path"], self.root
+                            ),
+                            "region": {"startLine": skipped["line_num"]},
+                        }
+                    }
+                ],
+            }
+            for skipped in skipped_lines or ()
+        )
+        invocation = {
+            "executionSuccessful": True,
+            "toolExecutionNotifications": notifications,
+            "properties": {"skippedBinaryFiles": len(skipped_binary_files)},
+        }
+        if timings is not None:
+            invocation["properties"]["timings"] = timings
+        self.out.write(f'],"invocations":[{json.dumps(invocation)}]}}]}}\n')
+        self.out.flush()
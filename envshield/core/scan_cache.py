@@ -0,0 +1,270 @@
+# envshield/core/scan_cache.py
+# An on-disk memo of per-file scan results, so a repeat `envshield scan` of a
+# mostly-unchanged tree only regex-scans the files that actually changed.
+
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .. import state
+
+# Bumped whenever the on-disk layout, or what a cached result means,
+# changes -- an older cache is then just discarded, never misread.
+_CACHE_VERSION = 1
+
+# Least-recently-used entries beyond this are dropped on save, so the cache
+# for a huge or fast-churning tree can't grow without bound.
+MAX_ENTRIES = 100_000
+
+# A file modified within this long of being scanned might be modified again
+# within the same mtime tick without its size changing either, so its stat
+# alone can't vouch for it next time -- only its content hash can. (The same
+# "racily clean" problem Git's index has; 2s covers the coarsest common
+# filesystem timestamp resolution.)
+_RACY_WINDOW_NS = 2_000_000_000
+
+
+def fingerprint(*pattern_sets: List[Dict[str, Any]]) -> str:
+    """
+    A digest of every pattern the scanner runs. Any change to a pattern, its
+    name, its keywords, or their order changes what a scan would find, so a
+    cache recorded under a different fingerprint is ignored wholesale.
+    """
+    payload = json.dumps(
+        [
+            [[p["name"], p["pattern"], list(p.get("keywords", ()))] for p in patterns]
+            for patterns in pattern_sets
+        ]
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def file_digest(file_path: str) -> Optional[str]:
+    """Content hash of a file on disk, or None if it can't be read."""
+    try:
+        digest = hashlib.blake2b(digest_size=20)
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+    except OSError:
+        return None
+
+
+class _ResultCache:
+    """
+    The persistence shared by both caches below: a JSON file of entries,
+    each holding one scan's *unfiltered* result -- every secret hit as
+    (line, type) and every variable usage as (line, name) -- since which
+    usages count as undeclared depends on the schema, which is applied
+    afterwards (see scanner._scan_files). Editing a schema therefore never
+    invalidates anything. Matched line text isn't stored either: a cache of
+    secrets would just be one more file for them to leak from.
+
+    Entries record the generation (save count) they were last used in, and
+    the least recently used beyond `max_entries` are dropped on save.
+    """
+
+    def __init__(self, pattern_fingerprint: str, path: str, max_entries: int):
+        self.path = path
+        self.pattern_fingerprint = pattern_fingerprint
+        self.max_entries = max_entries
+        self._entries: Dict[str, dict] = {}
+        self._generation = 0
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != _CACHE_VERSION
+            or data.get("fingerprint") != self.pattern_fingerprint
+            or not isinstance(data.get("entries"), dict)
+        ):
+            return
+        self._entries = data["entries"]
+        self._generation = data.get("generation", 0)
+
+    def _hit(self, entry: dict):
+        entry["used"] = self._generation
+        return (
+            [(line_num, secret_type) for line_num, secret_type in entry["secrets"]],
+            [(line_num, var_name) for line_num, var_name in entry["usages"]],
+        )
+
+    def _put(self, key: str, secret_hits, usage_hits, **fields) -> None:
+        self._entries[key] = {
+            **fields,
+            "secrets": [list(hit) for hit in secret_hits],
+            "usages": [list(hit) for hit in usage_hits],
+            "used": self._generation,
+        }
+        self._dirty = True
+
+    def save(self) -> None:
+        """
+        Writes the cache back if anything changed, evicting the
+        least-recently-used entries beyond `max_entries`. A failure to write
+        (a read-only checkout, say) just means the next run starts cold.
+        """
+        if not self._dirty:
+            return
+        entries = self._entries
+        if len(entries) > self.max_entries:
+            keep = sorted(entries, key=lambda k: entries[k]["used"], reverse=True)
+            entries = {k: entries[k] for k in keep[: self.max_entries]}
+
+        data = {
+            "version": _CACHE_VERSION,
+            "fingerprint": self.pattern_fingerprint,
+            "generation": self._generation + 1,
+            "entries": entries,
+        }
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        self._entries = entries
+        self._generation += 1
+        self._dirty = False
+
+
+class ScanCache(_ResultCache):
+    """
+    Per-file scan results for files on disk, keyed by absolute path and
+    validated by size, mtime, and content hash: an entry whose size and
+    mtime still match is trusted without reading the file at all; one
+    whose mtime moved but whose content hash still matches (a `git
+    checkout` that rewrote an identical file, a `touch`) is a hit too, and
+    just has its mtime refreshed.
+    """
+
+    def __init__(
+        self,
+        pattern_fingerprint: str,
+        path: str,
+        max_entries: int = MAX_ENTRIES,
+    ):
+        super().__init__(pattern_fingerprint, path, max_entries)
+        # Content hashes computed by lookup() for files that missed, held
+        # until store() records the scan result they belong to.
+        self._pending_digests: Dict[str, Optional[str]] = {}
+
+    def lookup(
+        self, file_path: str, st: os.stat_result
+    ) -> Optional[Tuple[List[Tuple[int, str]], List[Tuple[int, str]]]]:
+        """
+        Returns the cached ([(line, secret_type)], [(line, variable_name)])
+        for `file_path` if its current `st` (or, failing that, its content)
+        still matches what was scanned -- or None if it has to be scanned.
+        """
+        key = os.path.abspath(file_path)
+        entry = self._entries.get(key)
+        if entry is not None and entry["size"] == st.st_size:
+            if entry["mtime_ns"] == st.st_mtime_ns and not entry["racy"]:
+                return self._hit(entry)
+
+        digest = file_digest(file_path)
+        if entry is not None and digest is not None and entry["digest"] == digest:
+            entry.update(self._stat_fields(st))
+            self._dirty = True
+            return self._hit(entry)
+
+        self._pending_digests[key] = digest
+        return None
+
+    def store(
+        self,
+        file_path: str,
+        st: os.stat_result,
+        secret_hits: List[Tuple[int, str]],
+        usage_hits: List[Tuple[int, str]],
+    ) -> None:
+        """
+        Records a fresh scan result for a file lookup() just missed on.
+        `st` must be the same stat passed to lookup(): both were taken
+        before the file was read for scanning, so if it changes mid-scan,
+        the next run's stat won't match and it's simply scanned again.
+        """
+        key = os.path.abspath(file_path)
+        digest = self._pending_digests.pop(key, None)
+        if digest is None:
+            return
+        self._put(key, secret_hits, usage_hits, digest=digest, **self._stat_fields(st))
+
+    @staticmethod
+    def _stat_fields(st: os.stat_result) -> dict:
+        return {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "racy": st.st_mtime_ns >= time.time_ns() - _RACY_WINDOW_NS,
+        }
+
+
+def cache_path(project_root: Optional[str]) -> Optional[str]:
+    """
+    Where a project's ScanCache lives: in the .envshield directory next to
+    its envshield.yml (which `init` gitignores), wherever inside the project
+    the scan runs from. None outside a project -- such a scan just isn't
+    cached, rather than leaving a stray .envshield directory behind.
+    """
+    if project_root is None:
+        return None
+    return os.path.join(project_root, state.STATE_DIR, "scan_cache.json")
+
+
+def blob_cache_path(git_common_dir: str) -> str:
+    """
+    Where a repository's BlobScanCache lives: inside its *common* Git
+    directory, which every linked worktree (`git worktree add`) shares, so
+    a blob scanned from one checkout is a hit from all the others.
+    """
+    return os.path.join(git_common_dir, "envshield", "blob_scan_cache.json")
+
+
+class BlobScanCache(_ResultCache):
+    """
+    Scan results keyed by Git blob OID. A blob's OID is the hash of its
+    content, so an entry never needs validating: the same OID staged again
+    -- on another branch, after a rebase, in another worktree -- is the same
+    content, and is never decoded or regex-scanned twice.
+    """
+
+    def __init__(
+        self,
+        pattern_fingerprint: str,
+        path: str,
+        max_entries: int = MAX_ENTRIES,
+    ):
+        super().__init__(pattern_fingerprint, path, max_entries)
+
+    def lookup(
+        self, blob_oid: str
+    ) -> Optional[Tuple[List[Tuple[int, str]], List[Tuple[int, str]]]]:
+        """Returns the cached result for `blob_oid` (see ScanCache.lookup), or None."""
+        entry = self._entries.get(blob_oid)
+        return self._hit(entry) if entry is not None else None
+
+    def store(
+        self,
+        blob_oid: str,
+        secret_hits: List[Tuple[int, str]],
+        usage_hits: List[Tuple[int, str]],
+    ) -> None:
+        """Records the result of a full scan of `blob_oid`'s content."""
+        self._put(blob_oid, secret_hits, usage_hits)
@@ -0,0 +1,326 @@
+# envshield/core/scan_history.py
+# `envshield scan --history`: scans the current branch's history (or the part
+# of it since a given ref) for secrets that were ever committed, including
+# ones long since deleted. Each unique blob is read and scanned exactly
+# once -- however many commits and paths it appears under -- and each
+# finding is then attributed to the commit(s) and path(s) that introduced
+# it.
+
+import os
+from typing import Any, Dict, List, Optional
+
+import typer
+from rich.progress import BarColumn, Progress, SpinnerColumn, TextColumn
+from rich.table import Table
+
+from ..utils import git_utils
+from . import scan_cache, scanner
+from .exceptions import EnvShieldException
+
+# Blobs are read into memory and handed to the worker pool in batches of at
+# most this many blobs or bytes, whichever comes first -- so a history of
+# any size is scanned in bounded memory, with each batch still big enough
+# to be worth fanning out (see scanner._iter_scan_results).
+_BATCH_BLOBS = 4096
+_BATCH_BYTES = 64 << 20
+
+# How much of a commit's OID the report shows.
+_SHORT_OID = 12
+
+
+def _revisions(since: Optional[str]) -> List[str]:
+    """The `git rev-list` revisions a history scan covers, after checking they exist."""
+    context = git_utils.get_git_context()
+    if context is None:
+        raise EnvShieldException("--history needs to run inside a Git repository.")
+    if git_utils.resolve_commit("HEAD") is None:
+        raise EnvShieldException("This repository has no commits to scan yet.")
+    if since is None:
+        return ["HEAD"]
+    if git_utils.resolve_commit(since) is None:
+        raise EnvShieldException(
+            f"--since: '{since}' isn't a commit in this repository."
+        )
+    return ["HEAD", f"^{since}"]
+
+
+def _blob_text(blobs: git_utils.BlobReader, blob_oid: str) -> Optional[str]:
+    data = blobs.read(blob_oid)
+    return data.decode("utf-8", errors="ignore") if data is not None else None
+
+
+def _scan_history(
+    since: Optional[str],
+    config_path: Optional[str],
+    exclude_patterns: Optional[List[str]],
+    jobs: Optional[int] = None,
+    use_cache: bool = True,
+) -> tuple:
+    """
+    Does the actual history scan, returning (secret_findings,
+    skipped_large_files, skipped_binary_files, skipped_lines, commit_count,
+    blob_count). Each secret finding is the usual {"file_path", "line_num",
+    "secret_type", "line_content"} plus the "commit" that introduced it
+    (None if only a merge did) and its "blob" -- once for every commit
+    and path that introduced the same blob.
+
+    Exclusions apply to each (blob, path) pair: a blob is only skipped if
+    every path it was committed under is excluded, and findings are never
+    attributed to an excluded path. Binary and size limits apply to each
+    blob by the path it's scanned under. With `use_cache`, blobs go through
+    the same OID-keyed cache staged scans use (see scan_cache.BlobScanCache),
+    so a blob already scanned by a commit hook -- or an earlier history
+    scan -- isn't read or scanned again.
+    """
+    revisions = _revisions(since)
+    root = git_utils.get_git_context().root
+    (
+        exclusions,
+        binary_extensions,
+        _stream_threshold,
+        max_file_size,
+        max_line_length,
+    ) = scanner._scan_settings(config_path, exclude_patterns)
+    matcher = scanner._ExclusionMatcher(exclusions)
+
+    listed = git_utils.list_history_blobs(revisions)
+    if listed is None:
+        raise EnvShieldException(
+            "Couldn't list the repository's history (git rev-list failed)."
+        )
+    commit_count, history_blobs = listed
+
+    # rev-list names each blob by just one of its paths. One that path
+    # excludes may also have been committed under a path that isn't
+    # excluded -- and is then scanned under that path instead.
+    to_scan = []
+    excluded_sizes: Dict[str, int] = {}
+    for blob_oid, path, size in history_blobs:
+        if matcher.matches(os.path.join(root, path)):
+            excluded_sizes[blob_oid] = size
+        else:
+            to_scan.append((blob_oid, path, size))
+    introductions: Dict[str, List[tuple]] = {}
+    if excluded_sizes:
+        introductions = git_utils.get_blob_introductions(revisions, set(excluded_sizes))
+        for blob_oid, size in excluded_sizes.items():
+            path = next(
+                (
+                    introduced_path
+                    for _commit, introduced_path in introductions.get(blob_oid, ())
+                    if not matcher.matches(os.path.join(root, introduced_path))
+                ),
+                None,
+            )
+            if path is not None:
+                to_scan.append((blob_oid, path, size))
+
+    cache = None
+    if use_cache:
+        cache = scanner._open_cache(
+            scan_cache.BlobScanCache,
+            scan_cache.blob_cache_path(git_utils.get_git_context().common_dir),
+        )
+
+    # blob_oid -> (path, secret_findings), for every blob with a secret in it.
+    secrets_by_blob: Dict[str, tuple] = {}
+    skipped_large_files = []
+    skipped_binary_files = []
+    skipped_lines = []
+
+    with (
+        Progress(
+            SpinnerColumn(),
+            BarColumn(),
+            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+            TextColumn("Scanning [cyan]{task.description}[/cyan]"),
+            console=scanner.console,
+        ) as progress,
+        git_utils.BlobReader(root) as blobs,
+    ):
+        scan_task = progress.add_task("history...", total=len(to_scan))
+        tasks: List[tuple] = []
+        planned: List[tuple] = []
+        batch_bytes = 0
+
+        def _scan_batch() -> None:
+            results = scanner._iter_scan_results(tasks, jobs, max_line_length)
+            for (blob_oid, path), (secrets, usages, blob_skipped_lines) in zip(
+                planned, results
+            ):
+                skipped_lines.extend(blob_skipped_lines)
+                if cache is not None and not blob_skipped_lines:
+                    cache.store(
+                        blob_oid,
+                        [(f["line_num"], f["secret_type"]) for f in secrets],
+                        [(f["line_num"], f["variable_name"]) for f in usages],
+                    )
+                if secrets:
+                    secrets_by_blob[blob_oid] = (path, secrets)
+                progress.update(scan_task, description=path, advance=1)
+            tasks.clear()
+            planned.clear()
+
+        for blob_oid, path, size in to_scan:
+            if scanner._has_binary_extension(path, binary_extensions):
+                skipped_binary_files.append(path)
+                progress.advance(scan_task)
+                continue
+            if size > max_file_size:
+                skipped_large_files.append(path)
+                progress.advance(scan_task)
+                continue
+            if cache is not None:
+                cached = cache.lookup(blob_oid)
+                findings = cached and scanner._findings_from_cache(
+                    path, cached, lambda: _blob_text(blobs, blob_oid)
+                )
+                if findings is not None:
+                    if findings[0]:
+                        secrets_by_blob[blob_oid] = (path, findings[0])
+                    progress.advance(scan_task)
+                    continue
+
+            data = blobs.read(blob_oid)
+            if data is None or scanner._looks_binary(
+                data[: scanner._BINARY_SNIFF_BYTES]
+            ):
+                if data is not None:
+                    skipped_binary_files.append(path)
+                progress.advance(scan_task)
+                continue
+            tasks.append((path, data.decode("utf-8", errors="ignore"), None, False))
+            planned.append((blob_oid, path))
+            batch_bytes += len(data)
+            if len(tasks) >= _BATCH_BLOBS or batch_bytes >= _BATCH_BYTES:
+                _scan_batch()
+                batch_bytes = 0
+        _scan_batch()
+
+    if cache is not None:
+        cache.save()
+
+    # Only now, and only for the handful of blobs with a secret in them,
+    # is it worth walking the history once more to see where each came from.
+    introductions.update(
+        git_utils.get_blob_introductions(
+            revisions, set(secrets_by_blob) - set(introductions)
+        )
+    )
+    secret_findings = []
+    for blob_oid, (path, secrets) in secrets_by_blob.items():
+        introduced = [
+            (commit, introduced_path)
+            for commit, introduced_path in introductions.get(blob_oid, ())
+            if not matcher.matches(os.path.join(root, introduced_path))
+        ]
+        for commit, introduced_path in introduced or [(None, path)]:
+            secret_findings.extend(
+                {
+                    "commit": commit,
+                    "file_path": introduced_path,
+                    "line_num": finding["line_num"],
+                    "secret_type": finding["secret_type"],
+                    "line_content": finding["line_content"],
+                    "blob": blob_oid,
+                }
+                for finding in secrets
+            )
+
+    return (
+        secret_findings,
+        # Several versions of one large or binary file are one entry.
+        list(dict.fromkeys(skipped_large_files)),
+        list(dict.fromkeys(skipped_binary_files)),
+        skipped_lines,
+        commit_count,
+        len(history_blobs),
+    )
+
+
+def run_history_scan(
+    since: Optional[str],
+    config_path: Optional[str],
+    exclude_patterns: Optional[List[str]],
+    jobs: Optional[int] = None,
+    use_cache: bool = True,
+) -> None:
+    """
+    `scan --history`: prints every secret ever committed to the scanned
+    history, with the commit that introduced it, and exits 1 if there
+    were any. Undeclared variables aren't reported -- what code long gone
+    read from the environment says nothing about today's schema.
+    """
+    (
+        secret_findings,
+        skipped_large_files,
+        skipped_binary_files,
+        skipped_lines,
+        commit_count,
+        blob_count,
+    ) = _scan_history(since, config_path, exclude_patterns, jobs, use_cache)
+
+    console = scanner.console
+    scanner._print_skipped(skipped_large_files, skipped_binary_files, skipped_lines)
+    console.print(
+        f"\nScanned [yellow]{blob_count}[/yellow] unique file version(s) across [yellow]{commit_count}[/yellow] commit(s)."
+    )
+    if not secret_findings:
+        console.print("\n[bold green]✓ No secrets found in the history.[/bold green]")
+        return
+
+    console.print(
+        f"\n[bold red]🚨 DANGER: Found {len(secret_findings)} potential secret(s) in the history![/bold red]"
+    )
+    table = Table(title="History Scan Results", border_style="red")
+    table.add_column("Commit", style="green")
+    table.add_column("File", style="cyan")
+    table.add_column("Line", style="yellow")
+    table.add_column("Secret Type", style="magenta")
+    table.add_column("Line Content", style="white")
+    for finding in secret_findings:
+        table.add_row(
+            finding["commit"][:_SHORT_OID] if finding["commit"] else "(merge)",
+            finding["file_path"],
+            str(finding["line_num"]),
+            finding["secret_type"],
+            finding["line_content"],
+        )
+    console.print(table)
+    console.print(
+        "\n[bold]Suggestion:[/bold] Deleting a secret in a later commit doesn't remove it from the history. Rotate it."
+    )
+    raise typer.Exit(code=1)
+
+
+def history_scan_result(
+    since: Optional[str],
+    config_path: Optional[str],
+    exclude_patterns: Optional[List[str]],
+    jobs: Optional[int] = None,
+    use_cache: bool = True,
+) -> Dict[str, Any]:
+    """
+    Same scan as run_history_scan, as scanner.scan_result's dict (with an
+    always-empty `undeclared_variables`) plus the `commits` and `blobs`
+    scanned -- for '--history --json'.
+    """
+    with scanner._quiet_console():
+        (
+            secret_findings,
+            skipped_large_files,
+            skipped_binary_files,
+            skipped_lines,
+            commit_count,
+            blob_count,
+        ) = _scan_history(since, config_path, exclude_patterns, jobs, use_cache)
+    return {
+        "clean": not secret_findings,
+        "secrets": secret_findings,
+        "undeclared_variables": [],
+        "skipped_files": skipped_large_files,
+        "skipped_binary_files": skipped_binary_files,
+        "skipped_lines": skipped_lines,
+        "commits": commit_count,
+        "blobs": blob_count,
+    }
@@ -0,0 +1,214 @@
+# envshield/core/scan_shard.py
+# Splitting one full-tree scan across several CI nodes (`scan --shard i/N`)
+# and putting their `--json` results back together (`scan-merge`). Every
+# node lists the same tree and picks out its own share of it, with nothing
+# shared between nodes but the checkout: the split has to come out the
+# same on every one of them.
+
+import hashlib
+import heapq
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from . import scan_timings
+from .exceptions import EnvShieldException
+
+# How files are split: "hash" assigns each file by a hash of its path --
+# lazily, file by file, and stable as files come and go -- and "size"
+# deals files out largest first to whichever shard has the fewest bytes
+# so far, so one shard doesn't end up with every large fixture.
+SHARD_STRATEGIES = ("hash", "size")
+
+_SHARD_RE = re.compile(r"^\s*(\d+)\s*/\s*(\d+)\s*$")
+
+# The keys every `scan --json` result has (see scanner.scan_result).
+_RESULT_KEYS = (
+    "clean",
+    "secrets",
+    "undeclared_variables",
+    "skipped_files",
+    "skipped_binary_files",
+    "skipped_lines",
+)
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parses '--shard i/N' (1-based, like a CI matrix index) into (i, N)."""
+    match = _SHARD_RE.match(value)
+    if not match:
+        raise EnvShieldException(f"--shard takes i/N, like 2/4, not '{value}'.")
+    index, count = int(match.group(1)), int(match.group(2))
+    if not 1 <= index <= count:
+        raise EnvShieldException(
+            f"--shard {value}: the shard number must be between 1 and {count}."
+        )
+    return index, count
+
+
+def _shard_key(file_path: str) -> str:
+    """
+    A file's path as it's hashed: relative to the directory the scan runs
+    from and '/'-separated, so nodes that check the repository out in
+    different places (or on different platforms) still agree.
+    """
+    if os.path.isabs(file_path):
+        try:
+            file_path = os.path.relpath(file_path)
+        except ValueError:
+            pass
+    return os.path.normpath(file_path).replace(os.sep, "/")
+
+
+def _hash_shard(file_path: str, count: int) -> int:
+    digest = hashlib.blake2b(
+        _shard_key(file_path).encode("utf-8", errors="surrogateescape"), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "big") % count
+
+
+def shard_files(
+    files: Iterable[Tuple[str, Optional[os.stat_result]]],
+    index: int,
+    count: int,
+    by: str = "hash",
+):
+    """
+    Keeps shard `index` of `count` of (file_path, stat_or_None) pairs.
+
+    "hash" filters lazily, so a walk still streams. "size" has to see
+    every file (and stat any that come without a stat) before it can
+    deal out the first one; the stats it takes are passed along, so
+    nothing is stat'd twice. Either way, files keep their listed order.
+    """
+    if by == "hash":
+        return (
+            (file_path, st)
+            for file_path, st in files
+            if _hash_shard(file_path, count) == index - 1
+        )
+
+    listed = []
+    for file_path, st in files:
+        if st is None:
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                st = None
+        listed.append((file_path, st))
+    # Largest first, ties broken by path, onto the lightest shard so far
+    # (the lowest-numbered, on a tie).
+    order = sorted(
+        range(len(listed)),
+        key=lambda i: (
+            -(listed[i][1].st_size if listed[i][1] is not None else 0),
+            _shard_key(listed[i][0]),
+        ),
+    )
+    loads = [(0, shard) for shard in range(count)]
+    mine = set()
+    for i in order:
+        load, shard = heapq.heappop(loads)
+        if shard == index - 1:
+            mine.add(i)
+        st = listed[i][1]
+        heapq.heappush(loads, (load + (st.st_size if st is not None else 0), shard))
+    return [entry for i, entry in enumerate(listed) if i in mine]
+
+
+def _check_shards(results: List[Tuple[str, Dict[str, Any]]]) -> None:
+    """
+    Refuses a set of sharded results that doesn't add up to one whole scan
+    -- a shard missing (its node failed before uploading anything, say)
+    would otherwise just look like a clean part of the tree.
+    """
+    shards = [(source, result.get("shard")) for source, result in results]
+    if not any(shard for _source, shard in shards):
+        return
+    unsharded = [source for source, shard in shards if not shard]
+    if unsharded:
+        raise EnvShieldException(
+            f"Can't merge sharded and unsharded results ({', '.join(unsharded)} wasn't sharded)."
+        )
+    splits = {(shard["count"], shard["by"]) for _source, shard in shards}
+    if len(splits) > 1:
+        raise EnvShieldException(
+            "Can't merge results from different splits: every shard must be run with the same --shard i/N count and --shard-by."
+        )
+    ((count, _by),) = splits
+    seen: Dict[int, str] = {}
+    for source, shard in shards:
+        if shard["index"] in seen:
+            raise EnvShieldException(
+                f"Shard {shard['index']}/{count} is in both {seen[shard['index']]} and {source}."
+            )
+        seen[shard["index"]] = source
+    missing = [str(index) for index in range(1, count + 1) if index not in seen]
+    if missing:
+        raise EnvShieldException(
+            f"Missing shard(s) {', '.join(missing)} of {count}: their files weren't scanned."
+        )
+
+
+def _by_location(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return sorted(entries, key=lambda entry: (entry["file_path"], entry["line_num"]))
+
+
+def merge_results(results: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Combines (source, result) pairs -- each one shard's `scan --json`
+    output, and where it came from, for error messages -- into the single
+    result an unsharded scan would have given: the same keys as
+    scanner.scan_result, findings ordered by file and line. `timings`, if
+    every shard has them, are summed phase by phase, with the slowest
+    shard's wall clock.
+    """
+    if not results:
+        raise EnvShieldException(
+            "Nothing to merge: pass the files each shard's 'scan --json' wrote."
+        )
+    for source, result in results:
+        if not isinstance(result, dict):
+            raise EnvShieldException(f"{source} isn't a 'scan --json' result.")
+        if "error" in result:
+            raise EnvShieldException(f"The scan in {source} failed: {result['error']}")
+        missing = [key for key in _RESULT_KEYS if key not in result]
+        if missing:
+            raise EnvShieldException(
+                f"{source} isn't a 'scan --json' result (no {', '.join(missing)})."
+            )
+    _check_shards(results)
+
+    def _all(key: str) -> List[Any]:
+        return [entry for _source, result in results for entry in result[key]]
+
+    secrets = _by_location(_all("secrets"))
+    undeclared = _by_location(_all("undeclared_variables"))
+    merged: Dict[str, Any] = {
+        "clean": not (secrets or undeclared),
+        "secrets": secrets,
+        "undeclared_variables": undeclared,
+        "skipped_files": sorted(_all("skipped_files")),
+        "skipped_binary_files": sorted(_all("skipped_binary_files")),
+        "skipped_lines": _by_location(_all("skipped_lines")),
+    }
+    if all("timings" in result for _source, result in results):
+        timings = scan_timings.ScanTimings()
+        for _source, result in results:
+            timings.merge(result["timings"])
+            timings.wall = max(timings.wall, result["timings"]["wall"])
+        merged["timings"] = timings.as_dict()
+    return merged
+
+
+def merge_result_files(paths: List[str]) -> Dict[str, Any]:
+    """`envshield scan-merge`: merge_results over the JSON files at `paths`."""
+    results = []
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                results.append((path, json.load(f)))
+        except (OSError, ValueError) as e:
+            raise EnvShieldException(f"Couldn't read {path}: {e}") from e
+    return merge_results(results)
@@ -0,0 +1,133 @@
+# envshield/core/scan_timings.py
+# Where an `envshield scan` spends its time -- collected only for
+# `--profile`, so an ordinary scan pays nothing for it.
+
+import collections
+import contextlib
+import heapq
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Phases, in the order a scan goes through them (and the report lists them).
+ENUMERATE = "enumerate files"
+FILTER = "exclusion filtering"
+GIT = "git"
+CACHE = "cache"
+BINARY = "binary detection"
+READ = "read & decode"
+MATCH = "pattern matching"
+PHASES = (ENUMERATE, FILTER, GIT, CACHE, BINARY, READ, MATCH)
+
+# How many of the costliest (file, pattern) pairs are kept.
+MAX_HOTSPOTS = 10
+
+
+class ScanTimings:
+    """
+    Seconds spent per scan phase and per pattern (by SECRET_PATTERNS /
+    USAGE_PATTERNS name), plus the MAX_HOTSPOTS costliest single runs of
+    one pattern over one file -- which is how a pattern that only stalls
+    on one pathological file shows up, rather than being averaged away.
+    Time spent in worker processes comes back from each worker and is
+    merged in, so for a parallel scan the read/match figures are summed
+    across processes and can exceed `wall`.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, float] = collections.defaultdict(float)
+        self.patterns: Dict[str, float] = collections.defaultdict(float)
+        self.wall = 0.0
+        # A min-heap of (seconds, file_path, pattern), so the cheapest of
+        # the costliest is the one replaced.
+        self.hotspots: List[Tuple[float, str, str]] = []
+        self._file_path: Optional[str] = None
+        self._file_patterns: Dict[str, float] = collections.defaultdict(float)
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] += seconds
+
+    def add_pattern(self, name: str, seconds: float) -> None:
+        self.patterns[name] += seconds
+        self.phases[MATCH] += seconds
+        if self._file_path is not None:
+            self._file_patterns[name] += seconds
+
+    @contextlib.contextmanager
+    def file(self, file_path: str) -> Iterator[None]:
+        """Attributes the add_pattern() calls made meanwhile to `file_path`."""
+        self._file_path = file_path
+        self._file_patterns.clear()
+        try:
+            yield
+        finally:
+            for name, seconds in self._file_patterns.items():
+                self._add_hotspot(seconds, file_path, name)
+            self._file_path = None
+
+    def _add_hotspot(self, seconds: float, file_path: str, name: str) -> None:
+        if len(self.hotspots) < MAX_HOTSPOTS:
+            heapq.heappush(self.hotspots, (seconds, file_path, name))
+        elif seconds > self.hotspots[0][0]:
+            heapq.heapreplace(self.hotspots, (seconds, file_path, name))
+
+    @contextlib.contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[phase] += time.perf_counter() - started
+
+    def timed_iter(self, iterable: Iterable, phase: str, net_of: Optional[str] = None):
+        """
+        Yields from `iterable`, adding the time spent waiting on each item
+        to `phase` -- less whatever `net_of` accrued meanwhile, for a lazy
+        pipeline (walk, then filter) whose stages are timed separately.
+        """
+        iterator = iter(iterable)
+        while True:
+            started = time.perf_counter()
+            nested_before = self.phases[net_of] if net_of else 0.0
+            try:
+                item = next(iterator)
+            except StopIteration:
+                item = StopIteration
+            elapsed = time.perf_counter() - started
+            if net_of:
+                elapsed -= self.phases[net_of] - nested_before
+            self.phases[phase] += elapsed
+            if item is StopIteration:
+                return
+            yield item
+
+    def merge(self, other: Dict[str, Dict[str, float]]) -> None:
+        """Adds in another ScanTimings' as_dict() -- a worker process's share."""
+        for phase, seconds in other["phases"].items():
+            self.phases[phase] += seconds
+        for name, seconds in other["patterns"].items():
+            self.patterns[name] += seconds
+        for hotspot in other["hotspots"]:
+            self._add_hotspot(
+                hotspot["seconds"], hotspot["file_path"], hotspot["pattern"]
+            )
+
+    def as_dict(self) -> Dict[str, object]:
+        """The JSON-serializable form: `timings` in `scan --json --profile`."""
+        return {
+            "wall": round(self.wall, 6),
+            "phases": {
+                phase: round(self.phases[phase], 6)
+                for phase in PHASES
+                if phase in self.phases
+            },
+            "patterns": {
+                name: round(seconds, 6)
+                for name, seconds in sorted(
+                    self.patterns.items(), key=lambda item: item[1], reverse=True
+                )
+            },
+            "hotspots": [
+                {"file_path": file_path, "pattern": name, "seconds": round(seconds, 6)}
+                for seconds, file_path, name in sorted(self.hotspots, reverse=True)
+            ],
+        }
@@ -0,0 +1,323 @@
+# envshield/core/scan_watch.py
+# `envshield scan --watch`: scans the tree once, then keeps polling it and
+# rescans only the files that changed, keeping every file's findings in
+# memory and updating them in place -- so saving a file costs a scan of
+# that file, not of the whole tree.
+
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from ..config import manager as config_manager
+from . import scan_cache, scanner
+from .exceptions import EnvShieldException
+
+# Seconds between polls of the tree.
+DEFAULT_INTERVAL = 1.0
+
+# How many of a poll's changed files the report names.
+_MAX_LISTED_CHANGES = 10
+
+
+def _stat_signature(paths: List[str]) -> tuple:
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            signature.append((path, None))
+            continue
+        signature.append((path, st.st_size, st.st_mtime_ns))
+    return tuple(signature)
+
+
+def _is_schema_file(path: str) -> bool:
+    # Covers a registered schema's `extends` bases too, which
+    # ScanWatcher doesn't otherwise know about.
+    return os.path.basename(path).endswith("schema.toml")
+
+
+class ScanWatcher:
+    """
+    A watched scan's state: every file's stat as of the last poll (a
+    snapshot of the same files `scan` itself would cover), and each file's
+    findings as of its last scan, kept per file so a changed one's are
+    simply replaced.
+
+    Every variable usage is kept, unfiltered, and only checked against the
+    schemas when asked for (see undeclared_findings) -- so a schema change
+    just re-resolves the schemas, and rescans nothing. A schema that won't
+    load (saved mid-edit, say) leaves the last one that did in use, with
+    the reason in `schema_error`, until it's fixed. Only an
+    envshield.yml change, which can change what's scanned and how, rescans
+    everything (cheaply, from the scan cache, unless `use_cache` is off).
+    """
+
+    def __init__(
+        self,
+        paths: Optional[List[str]],
+        config_path: Optional[str],
+        exclude_patterns: Optional[List[str]],
+        service_name: Optional[str] = None,
+        jobs: Optional[int] = None,
+        use_cache: bool = True,
+        respect_gitignore: bool = True,
+    ):
+        self.paths = paths
+        self.config_path = config_path
+        self.exclude_patterns = exclude_patterns
+        self.service_name = service_name
+        self.jobs = jobs
+        self.respect_gitignore = respect_gitignore
+        self.files: Dict[str, os.stat_result] = {}
+        # file_path -> (secret_findings, usage_findings, skipped_lines)
+        self.findings: Dict[str, tuple] = {}
+        self.skipped_large_files: set = set()
+        self.skipped_binary_files: set = set()
+        cache_path = scan_cache.cache_path(config_manager.find_project_root())
+        self._cache = (
+            scan_cache.ScanCache(scanner._PATTERN_FINGERPRINT, cache_path)
+            if use_cache and cache_path
+            else None
+        )
+        self._config_signature: Optional[tuple] = None
+        self._schema_paths: List[str] = []
+        self._schema_signature: Optional[tuple] = None
+        self._resolver = None
+        self.schema_error: Optional[str] = None
+
+    def _config_file(self) -> str:
+        return self.config_path or config_manager.CONFIG_FILE_NAME
+
+    def _schema_files(self) -> List[str]:
+        try:
+            services = config_manager.get_services()
+        except EnvShieldException:
+            return []
+        return [
+            service_config["schema"]
+            for service_config in services.values()
+            if isinstance(service_config, dict) and service_config.get("schema")
+        ]
+
+    def _reload_config(self) -> None:
+        (
+            self._exclusions,
+            self._binary_extensions,
+            self._stream_threshold,
+            self._max_file_size,
+            self._max_line_length,
+        ) = scanner._scan_settings(self.config_path, self.exclude_patterns)
+        self._reresolve_schemas()
+        # What's scanned, and how, may have changed along with it.
+        self.files = {}
+        self.findings = {}
+        self.skipped_large_files = set()
+        self.skipped_binary_files = set()
+
+    def _reresolve_schemas(self) -> None:
+        self._schema_paths = self._schema_files()
+        self._schema_signature = _stat_signature(self._schema_paths)
+        try:
+            self._resolver = scanner._build_undeclared_var_resolver(self.service_name)
+        except EnvShieldException as e:
+            self.schema_error = str(e)
+        else:
+            self.schema_error = None
+
+    def _snapshot(self) -> Dict[str, os.stat_result]:
+        with scanner._quiet_console():
+            listed = scanner._collect_files_to_scan(
+                self.paths, False, self.respect_gitignore
+            )
+            snapshot = {}
+            for file_path, st in scanner._filter_files(listed, self._exclusions):
+                if st is None:
+                    try:
+                        st = os.stat(file_path)
+                    except OSError:
+                        continue
+                snapshot[file_path] = st
+        return snapshot
+
+    def poll(self) -> Tuple[List[str], List[str]]:
+        """
+        Rescans every file added or modified since the last poll (every
+        file at all, the first time) and forgets every file removed.
+        Returns the (rescanned, removed) paths.
+        """
+        config_signature = _stat_signature([self._config_file()])
+        if config_signature != self._config_signature:
+            self._config_signature = config_signature
+            self._reload_config()
+
+        snapshot = self._snapshot()
+        changed = [
+            file_path
+            for file_path, st in snapshot.items()
+            if (previous := self.files.get(file_path)) is None
+            or (previous.st_size, previous.st_mtime_ns) != (st.st_size, st.st_mtime_ns)
+        ]
+        removed = [file_path for file_path in self.files if file_path not in snapshot]
+
+        if self.files and (
+            any(_is_schema_file(path) for path in changed + removed)
+            or _stat_signature(self._schema_paths) != self._schema_signature
+        ):
+            self._reresolve_schemas()
+        for file_path in removed:
+            self._forget(file_path)
+        self._scan(changed, snapshot)
+        self.files = snapshot
+        return changed, removed
+
+    def _forget(self, file_path: str) -> None:
+        self.findings.pop(file_path, None)
+        self.skipped_large_files.discard(file_path)
+        self.skipped_binary_files.discard(file_path)
+
+    def _scan(self, file_paths: List[str], snapshot: Dict[str, os.stat_result]):
+        """
+        The same per-file decisions _collect_and_scan_files makes for a
+        file on disk -- skip it, reuse its cached result, or scan it --
+        with the scanning itself done by the same _iter_scan_results.
+        """
+        tasks = []
+        scanned = []
+        for file_path in file_paths:
+            self._forget(file_path)
+            st = snapshot[file_path]
+            if scanner._has_binary_extension(file_path, self._binary_extensions):
+                self.skipped_binary_files.add(file_path)
+                continue
+            if st.st_size > self._max_file_size:
+                self.skipped_large_files.add(file_path)
+                continue
+            if self._cache is not None:
+                cached = self._cache.lookup(file_path, st)
+                findings = cached and scanner._findings_from_cache(
+                    file_path, cached, lambda: scanner._read_text_file(file_path)
+                )
+                if findings is not None:
+                    self.findings[file_path] = (*findings, [])
+                    continue
+            if scanner._file_looks_binary(file_path):
+                self.skipped_binary_files.add(file_path)
+                continue
+            tasks.append((file_path, None, None, st.st_size > self._stream_threshold))
+            scanned.append((file_path, st))
+
+        results = scanner._iter_scan_results(tasks, self.jobs, self._max_line_length)
+        for (file_path, st), (secrets, usages, skipped_lines) in zip(scanned, results):
+            self.findings[file_path] = (secrets, usages, skipped_lines)
+            if self._cache is not None and not skipped_lines:
+                self._cache.store(
+                    file_path,
+                    st,
+                    [(f["line_num"], f["secret_type"]) for f in secrets],
+                    [(f["line_num"], f["variable_name"]) for f in usages],
+                )
+        if self._cache is not None:
+            self._cache.save()
+
+    def secret_findings(self) -> List[Dict]:
+        return [
+            finding
+            for file_path in sorted(self.findings)
+            for finding in self.findings[file_path][0]
+        ]
+
+    def undeclared_findings(self) -> List[Dict]:
+        """Every usage of a variable its file's schema doesn't declare, as of now."""
+        undeclared = []
+        for file_path in sorted(self.findings):
+            schema_vars = self._resolver(file_path) if self._resolver else set()
+            undeclared.extend(
+                usage
+                for usage in self.findings[file_path][1]
+                if usage["variable_name"] not in schema_vars
+            )
+        return undeclared
+
+    def skipped_lines(self) -> List[Dict]:
+        return [
+            skipped
+            for file_path in sorted(self.findings)
+            for skipped in self.findings[file_path][2]
+        ]
+
+
+def _print_report(
+    watcher: ScanWatcher, rescanned: List[str], removed: List[str], first: bool
+) -> None:
+    console = scanner.console
+    console.clear()
+    if first:
+        console.print(f"Scanned [yellow]{len(watcher.files)}[/yellow] file(s).")
+    else:
+        changes = [f"[cyan]{path}[/cyan]" for path in rescanned[:_MAX_LISTED_CHANGES]]
+        changes += [
+            f"[dim]{path} (removed)[/dim]"
+            for path in removed[: max(0, _MAX_LISTED_CHANGES - len(changes))]
+        ]
+        more = len(rescanned) + len(removed) - len(changes)
+        console.print(
+            f"[dim]{time.strftime('%H:%M:%S')}[/dim] Rescanned {', '.join(changes)}"
+            + (f" and {more} more" if more else "")
+        )
+    if watcher.schema_error:
+        console.print(f"\n[bold red]Error:[/bold red] {watcher.schema_error}")
+        console.print(
+            "[dim]Undeclared variables are checked against the last schemas that loaded until it's fixed.[/dim]"
+        )
+
+    found_issues = scanner._print_findings(
+        watcher.secret_findings(), watcher.undeclared_findings()
+    )
+    if watcher.skipped_large_files or watcher.skipped_lines():
+        console.print(
+            f"\n[yellow]⚠️  {len(watcher.skipped_large_files)} file(s) over the size limit and {len(watcher.skipped_lines())} line(s) too long for some patterns weren't fully scanned.[/yellow]"
+        )
+    if not found_issues:
+        console.print(
+            "\n[bold green]✓ No issues found. Your configuration is secure and compliant![/bold green]"
+        )
+    console.print("\n[dim]Watching for changes... (Ctrl-C to stop)[/dim]")
+
+
+def watch(
+    paths: Optional[List[str]],
+    config_path: Optional[str],
+    exclude_patterns: Optional[List[str]],
+    service_name: Optional[str] = None,
+    jobs: Optional[int] = None,
+    use_cache: bool = True,
+    respect_gitignore: bool = True,
+    interval: float = DEFAULT_INTERVAL,
+) -> None:
+    """
+    `scan --watch`: a full scan, then a rescan of whatever changed, polled
+    every `interval` seconds, with the current findings reprinted after
+    each -- until Ctrl-C.
+    """
+    watcher = ScanWatcher(
+        paths,
+        config_path,
+        exclude_patterns,
+        service_name,
+        jobs,
+        use_cache,
+        respect_gitignore,
+    )
+    scanner.console.print("Scanning, then watching for changes...")
+    rescanned, removed = watcher.poll()
+    _print_report(watcher, rescanned, removed, first=True)
+    try:
+        while True:
+            time.sleep(interval)
+            schema_error = watcher.schema_error
+            rescanned, removed = watcher.poll()
+            if rescanned or removed or watcher.schema_error != schema_error:
+                _print_report(watcher, rescanned, removed, first=False)
+    except KeyboardInterrupt:
+        pass
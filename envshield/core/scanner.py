@@ -1,24 +1,52 @@
 # envshield/core/scanner.py
-import difflib
+import bisect
+import collections
+import concurrent.futures
+import contextlib
 import fnmatch
+import itertools
+import json
+import mmap
 import os
 import re
+import shlex
 import stat
-from typing import Any, Dict, List, Optional
+import sys
+import time
+from concurrent.futures.process import BrokenProcessPool
+from typing import IO, Any, Callable, Dict, Iterable, List, Optional, Tuple
 
-import questionary
 import typer
 from rich.console import Console
 from rich.progress import BarColumn, Progress, SpinnerColumn, TextColumn
 from rich.table import Table
 
 from ..config import manager as config_manager
+
+# Every scan opens a cache and times its phases; sarif and daemon_client
+# only serve one output format and the hook's script, so they're imported
+# where they're used.
+from ..core import scan_cache, scan_timings
 from ..core.exceptions import EnvShieldException, SchemaNotFoundError
 from ..utils import git_utils
 
 console = Console()
 
-SECRET_PATTERNS: List[Dict[str, str]] = [
+# Each entry's optional "keywords" are literal substrings at least one of
+# which *must* appear in any text the pattern can match -- a necessary
+# condition, never a sufficient one. They let the scanner rule a pattern out
+# with a C-level substring check instead of a full regex pass, which is what
+# almost every line of almost every file needs. Keywords for a '(?i)'
+# pattern are compared case-insensitively. An entry with no keywords is
+# always run, so omitting them is only ever slower, never less accurate.
+#
+# An entry marked "backtracks" has an unbounded repetition that can
+# backtrack over a whole line, so on a long line with many near-misses
+# (a minified bundle, a one-line JSON dump) its cost grows with the square
+# of the line's length. It isn't run on lines over
+# `secret_scanning.max_line_length`; those lines are reported as skipped
+# instead. Every other pattern is bounded, and runs on every line.
+SECRET_PATTERNS: List[Dict[str, Any]] = [
     {
         # Value may be quoted (Python/JSON-style: KEY = "value") or bare
         # (dotenv-style: KEY=value) -- real .env files are conventionally
@@ -32,24 +60,40 @@ SECRET_PATTERNS: List[Dict[str, str]] = [
         # one here would misfire on the single most common shape -- 'KEY='
         # with no space -- since '=' is itself a member of the value charset.
         "pattern": r"(?i)(key|api(?!version)|token|secret|password|auth|credential)[a-z0-9_ .\-,]{0,25}\s*[:=]\s*(?:['\"][0-9a-zA-Z\-_=]{16,64}['\"]|[0-9a-zA-Z\-_=]{16,64}(?![0-9a-zA-Z\-_=]))",
+        "keywords": ("key", "api", "token", "secret", "password", "auth", "credential"),
     },
     {
         # Matches either the header or footer line, in case one was
         # deliberately stripped from a leaked key blob.
         "name": "Private Key",
         "pattern": r"-----(?:BEGIN|END) (?:EC|PGP|DSA|RSA|OPENSSH|ENCRYPTED)? ?PRIVATE KEY(?: BLOCK)?-----",
+        "keywords": ("PRIVATE KEY",),
     },
     {
         "name": "JSON Web Token (JWT)",
         "pattern": r"\beyJ[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\b",
+        "keywords": ("eyJ",),
     },
     {
         "name": "Database Connection String",
         "pattern": r"(?i)(postgres|mysql|mongodb(?:\+srv)?|redis)://[^:]+:[^@]+@",
+        "keywords": ("://",),
+        "backtracks": True,
     },
     {
         "name": "AWS Access Key ID",
         "pattern": r"\b(A3T[A-Z0-9]|AKIA|AGPA|AIDA|AROA|AIPA|ANPA|ANVA|ASIA)[A-Z0-9]{16}\b",
+        "keywords": (
+            "A3T",
+            "AKIA",
+            "AGPA",
+            "AIDA",
+            "AROA",
+            "AIPA",
+            "ANPA",
+            "ANVA",
+            "ASIA",
+        ),
     },
     {
         "name": "AWS Secret Access Key",
@@ -60,32 +104,73 @@ SECRET_PATTERNS: List[Dict[str, str]] = [
         # part of a token" here would reject the exact 'KEY=<secret>' shape
         # this branch exists to catch.
         "pattern": r"(?i)aws(.{0,20})?(?:['\"][0-9a-zA-Z\/+=]{40}['\"]|(?<![0-9a-zA-Z\/+])[0-9a-zA-Z\/+=]{40}(?![0-9a-zA-Z\/+]))",
+        "keywords": ("aws",),
+    },
+    {
+        "name": "Google Cloud API Key",
+        "pattern": r"\bAIza[0-9A-Za-z\-_]{35}\b",
+        "keywords": ("AIza",),
+    },
+    {
+        "name": "Google OAuth Access Token",
+        "pattern": r"\bya29\.[0-9A-Za-z\-_]+\b",
+        "keywords": ("ya29.",),
     },
-    {"name": "Google Cloud API Key", "pattern": r"\bAIza[0-9A-Za-z\-_]{35}\b"},
-    {"name": "Google OAuth Access Token", "pattern": r"\bya29\.[0-9A-Za-z\-_]+\b"},
     {
         "name": "GitHub Personal Access Token (Classic)",
         "pattern": r"\bghp_[0-9a-zA-Z]{36}\b",
+        "keywords": ("ghp_",),
     },
     {
         "name": "GitHub Personal Access Token (Fine-grained)",
         "pattern": r"\bgithub_pat_[0-9a-zA-Z]{22}_[0-9a-zA-Z]{59}\b",
+        "keywords": ("github_pat_",),
+    },
+    {
+        "name": "GitHub OAuth Access Token",
+        "pattern": r"\bgho_[0-9a-zA-Z]{36}\b",
+        "keywords": ("gho_",),
+    },
+    {
+        "name": "GitHub App Token",
+        "pattern": r"\b(ghu|ghs)_[0-9a-zA-Z]{36}\b",
+        "keywords": ("ghu_", "ghs_"),
     },
-    {"name": "GitHub OAuth Access Token", "pattern": r"\bgho_[0-9a-zA-Z]{36}\b"},
-    {"name": "GitHub App Token", "pattern": r"\b(ghu|ghs)_[0-9a-zA-Z]{36}\b"},
     {
         "name": "Terraform Cloud/Enterprise Token",
         "pattern": r"\b[a-zA-Z0-9]+\.atlasv1\.[a-zA-Z0-9\-_=]{60,70}\b",
+        "keywords": (".atlasv1.",),
+    },
+    {
+        "name": "Slack Token",
+        "pattern": r"\bxox[baprs]-[0-9a-zA-Z]{10,48}\b",
+        "keywords": ("xox",),
+    },
+    {
+        "name": "Telegram Bot Token",
+        "pattern": r"\b[0-9]{8,10}:[a-zA-Z0-9_-]{35}\b",
+        "keywords": (":",),
+    },
+    {
+        "name": "Twilio API Key",
+        "pattern": r"\bSK[0-9a-fA-F]{32}\b",
+        "keywords": ("SK",),
     },
-    {"name": "Slack Token", "pattern": r"\bxox[baprs]-[0-9a-zA-Z]{10,48}\b"},
-    {"name": "Telegram Bot Token", "pattern": r"\b[0-9]{8,10}:[a-zA-Z0-9_-]{35}\b"},
-    {"name": "Twilio API Key", "pattern": r"\bSK[0-9a-fA-F]{32}\b"},
     {
         "name": "SendGrid API Key",
         "pattern": r"\bSG\.[a-zA-Z0-9_-]{22}\.[a-zA-Z0-9_-]{43}\b",
+        "keywords": ("SG.",),
+    },
+    {
+        "name": "Mailchimp API Key",
+        "pattern": r"\b[0-9a-f]{32}-us[0-9]{1,2}\b",
+        "keywords": ("-us",),
+    },
+    {
+        "name": "Mailgun API Key",
+        "pattern": r"\bkey-[0-9a-zA-Z]{32}\b",
+        "keywords": ("key-",),
     },
-    {"name": "Mailchimp API Key", "pattern": r"\b[0-9a-f]{32}-us[0-9]{1,2}\b"},
-    {"name": "Mailgun API Key", "pattern": r"\bkey-[0-9a-zA-Z]{32}\b"},
     {
         # Only the 'sk_' (secret) prefix -- 'pk_' is Stripe's *publishable*
         # key, explicitly meant to ship in client-side code (e.g. a
@@ -93,30 +178,644 @@ SECRET_PATTERNS: List[Dict[str, str]] = [
         # false positive on exactly the values that are supposed to be public.
         "name": "Stripe Secret Key",
         "pattern": r"\bsk_(test|live)_[0-9a-zA-Z]{24,99}\b",
+        "keywords": ("sk_test_", "sk_live_"),
     },
     {
         "name": "Heroku API Key",
         "pattern": r"(?i)heroku[a-z0-9_\- ]*['\"][0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}['\"]",
+        "keywords": ("heroku",),
+        "backtracks": True,
     },
     {
         "name": "Discord Bot Token",
         "pattern": r"\b[MN][A-Za-z\d]{23,25}\.[\w-]{6}\.[\w-]{27,}\b",
+        "keywords": (".",),
+    },
+    {
+        "name": "npm Token",
+        "pattern": r"\bnpm_[a-zA-Z0-9]{36}\b",
+        "keywords": ("npm_",),
     },
-    {"name": "npm Token", "pattern": r"\bnpm_[a-zA-Z0-9]{36}\b"},
     {
         "name": "PyPI Upload Token",
         "pattern": r"\bpypi-AgEIcHlwaS5vcmc[A-Za-z0-9-_]{50,1000}\b",
+        "keywords": ("pypi-AgEIcHlwaS5vcmc",),
     },
 ]
-USAGE_PATTERNS: List[Dict[str, str]] = [
+USAGE_PATTERNS: List[Dict[str, Any]] = [
     {
         "name": "Python os.environ.get",
         "pattern": r"os\.environ\.get\s*\(\s*['\"](\w+)['\"]",
+        "keywords": ("os.environ.get",),
+    },
+    {
+        "name": "Python os.getenv",
+        "pattern": r"os\.getenv\s*\(\s*['\"](\w+)['\"]",
+        "keywords": ("os.getenv",),
+    },
+    {
+        "name": "Node.js process.env",
+        "pattern": r"process\.env\.(\w+)",
+        "keywords": ("process.env.",),
     },
-    {"name": "Python os.getenv", "pattern": r"os\.getenv\s*\(\s*['\"](\w+)['\"]"},
-    {"name": "Node.js process.env", "pattern": r"process\.env\.(\w+)"},
 ]
 
+
+def _compile_patterns(patterns: List[Dict[str, Any]]) -> List[tuple]:
+    """
+    Compiles a SECRET_PATTERNS/USAGE_PATTERNS-shaped list once, up front,
+    into (name, compiled_regex, keywords, ignore_case) tuples -- instead of
+    leaning on `re`'s internal cache for every pattern on every line.
+    """
+    compiled = []
+    for entry in patterns:
+        regex = re.compile(entry["pattern"])
+        ignore_case = bool(regex.flags & re.IGNORECASE)
+        keywords = tuple(
+            keyword.lower() if ignore_case else keyword
+            for keyword in entry.get("keywords", ())
+        )
+        compiled.append((entry["name"], regex, keywords, ignore_case))
+    return compiled
+
+
+_COMPILED_SECRET_PATTERNS = _compile_patterns(SECRET_PATTERNS)
+_COMPILED_USAGE_PATTERNS = _compile_patterns(USAGE_PATTERNS)
+_BACKTRACKING_PATTERNS = frozenset(
+    entry["name"] for entry in SECRET_PATTERNS if entry.get("backtracks")
+)
+
+
+def _keywords_present(keywords: tuple, haystack: str) -> bool:
+    """
+    Whether a pattern could possibly match `haystack`, judging by its
+    keywords alone. Callers pass an already-lowercased haystack for a
+    '(?i)' pattern, so one `.lower()` is shared across every such pattern.
+    """
+    return not keywords or any(keyword in haystack for keyword in keywords)
+
+
+def match_secret_type(text: str, skip_backtracking: bool = False) -> Optional[str]:
+    """
+    Returns the name of the first SECRET_PATTERNS entry (in list order) that
+    matches anywhere in `text`, or None -- the same first-match-wins answer
+    as looping `re.search` over SECRET_PATTERNS, just without running the
+    regex for any pattern whose keywords don't even appear in `text`.
+    `skip_backtracking` leaves out the "backtracks" patterns, for a line
+    too long to run them on.
+    """
+    lowered = text.lower()
+    for name, regex, keywords, ignore_case in _COMPILED_SECRET_PATTERNS:
+        if skip_backtracking and name in _BACKTRACKING_PATTERNS:
+            continue
+        if _keywords_present(keywords, lowered if ignore_case else text):
+            if regex.search(text):
+                return name
+    return None
+
+
+def _backtracking_patterns_in(line: str) -> List[str]:
+    """The "backtracks" patterns that could match `line`, judging by their keywords."""
+    lowered = line.lower()
+    return [
+        name
+        for name, _regex, keywords, ignore_case in _COMPILED_SECRET_PATTERNS
+        if name in _BACKTRACKING_PATTERNS
+        and _keywords_present(keywords, lowered if ignore_case else line)
+    ]
+
+
+def _find_usage_vars(line: str) -> List[str]:
+    """Every variable name USAGE_PATTERNS finds in one line, in pattern-then-position order."""
+    found = []
+    for _name, regex, keywords, _ignore_case in _COMPILED_USAGE_PATTERNS:
+        if _keywords_present(keywords, line):
+            found.extend(regex.findall(line))
+    return found
+
+
+_NEWLINE_RE = re.compile("\n")
+_NEWLINE_BYTES_RE = re.compile(b"\n")
+
+
+class _LineIndex:
+    """
+    Maps character offsets in a whole-file buffer back to 1-indexed line
+    numbers (by bisecting a list of line-start offsets), and line numbers
+    back to that line's text. Lines end at '\\n' only, the same way Git and
+    every editor number them. `text` can also be a bytes-like buffer (see
+    _scan_mapped), in which case offsets are byte offsets and a line is
+    returned as bytes.
+
+    The offsets are only computed on first use: most files have no match at
+    all, and never need them.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self._starts: Optional[List[int]] = None
+
+    @property
+    def starts(self) -> List[int]:
+        if self._starts is None:
+            newline = _NEWLINE_RE if isinstance(self.text, str) else _NEWLINE_BYTES_RE
+            self._starts = [0]
+            self._starts.extend(m.end() for m in newline.finditer(self.text))
+        return self._starts
+
+    def line_of(self, offset: int) -> int:
+        return bisect.bisect_right(self.starts, offset)
+
+    def start_of(self, line_num: int) -> int:
+        return self.starts[line_num - 1]
+
+    def line(self, line_num: int) -> str:
+        start = self.starts[line_num - 1]
+        end = self.starts[line_num] if line_num < len(self.starts) else len(self.text)
+        return self.text[start:end]
+
+
+# Lines longer than this many characters aren't run through the
+# "backtracks" patterns (see SECRET_PATTERNS). Set with
+# `secret_scanning.max_line_length` in envshield.yml.
+DEFAULT_MAX_LINE_LENGTH = 10_000
+
+
+def _long_line_spans(text: str, max_line_length: int) -> List[tuple]:
+    """
+    (start, end) offsets of every line in `text` (str or bytes-like) longer
+    than `max_line_length`, its newline included in `end`. Each step looks
+    for the last newline in the next `max_line_length + 1` characters and
+    jumps straight past it, so a file of ordinary lines is crossed in a
+    few large strides rather than line by line.
+    """
+    newline = "\n" if isinstance(text, str) else b"\n"
+    spans = []
+    pos = 0
+    while len(text) - pos > max_line_length:
+        cut = text.rfind(newline, pos, pos + max_line_length + 1)
+        if cut != -1:
+            pos = cut + 1
+            continue
+        end = text.find(newline, pos + max_line_length)
+        end = len(text) if end == -1 else end + 1
+        spans.append((pos, end))
+        pos = end
+    return spans
+
+
+def _skipped_long_lines(
+    text: str, index: _LineIndex, spans: List[tuple], own_end: Optional[int] = None
+) -> Dict[int, List[str]]:
+    """
+    {line_num: pattern names} for each long line in `spans` (starting
+    before `own_end`, if given) that holds the keywords of a "backtracks"
+    pattern -- one that was skipped on it, rather than just not needed.
+    """
+    skipped = {}
+    for start, end in spans:
+        if own_end is not None and start >= own_end:
+            break
+        line = text[start:end]
+        if not isinstance(line, str):
+            line = line.decode("ascii")
+        names = _backtracking_patterns_in(line)
+        if names:
+            skipped[index.line_of(start)] = names
+    return skipped
+
+
+def _skipped_line_findings(
+    file_path: str, skipped: Dict[int, List[str]], max_line_length: int
+) -> List[Dict]:
+    """The `skipped_lines` entries reported for one file's _skipped_long_lines."""
+    return [
+        {
+            "file_path": file_path,
+            "line_num": line_num,
+            "patterns": names,
+            "reason": f"line longer than {max_line_length} characters "
+            "(secret_scanning.max_line_length); not checked for " + ", ".join(names),
+        }
+        for line_num, names in sorted(skipped.items())
+    ]
+
+
+def _finditer_around(regex: Any, text: str, skip_spans: List[tuple]):
+    """`regex.finditer(text)`, minus the (start, end) spans in `skip_spans`."""
+    pos = 0
+    for start, end in skip_spans:
+        yield from regex.finditer(text, pos, start)
+        pos = end
+    yield from regex.finditer(text, pos)
+
+
+def _iter_line_matches(
+    regex: Any, text: str, index: _LineIndex, skip_spans: List[tuple] = ()
+):
+    """
+    Yields (line_num, offset, match) for every match of `regex` in the
+    whole-file `text` that a line-by-line search would also have found --
+    except on the whole lines `skip_spans` covers (see _long_line_spans).
+
+    One `finditer` pass over the whole buffer replaces a Python-level loop
+    over every line. The catch is that a pattern like `\\s*` or `[^:]+` can
+    match across a newline in a whole buffer where it never could in a
+    single line -- so any match that does is discarded, and just the lines
+    it spans are searched again one at a time, exactly as before. Those
+    lines' results come from that search alone: a whole-buffer match on one
+    of them (after a cross-line match ends there, say) would otherwise be
+    found twice. `offset` is always absolute, so results from both paths
+    sort together.
+    """
+    single_line = []
+    rescan_lines = set()
+    for match in _finditer_around(regex, text, skip_spans):
+        start_line = index.line_of(match.start())
+        end_line = index.line_of(max(match.end() - 1, match.start()))
+        if start_line == end_line:
+            single_line.append((start_line, match.start(), match))
+        else:
+            rescan_lines.update(range(start_line, end_line + 1))
+
+    for line_num, offset, match in single_line:
+        if line_num not in rescan_lines:
+            yield line_num, offset, match
+    for line_num in sorted(rescan_lines):
+        line_start = index.start_of(line_num)
+        for match in regex.finditer(index.line(line_num)):
+            yield line_num, line_start + match.start(), match
+
+
+# The ScanTimings a `--profile` scan is currently filling in (see
+# _scan_files), or None -- the usual case, in which nothing is timed.
+_timings: Optional[scan_timings.ScanTimings] = None
+_NOT_TIMED = contextlib.nullcontext()
+
+
+def _match_text(
+    text: str,
+    index: _LineIndex,
+    own_end: Optional[int] = None,
+    max_line_length: int = DEFAULT_MAX_LINE_LENGTH,
+):
+    """
+    Runs every pattern once over `text` with `finditer` (after its keywords
+    rule it in at all), returning ({line_num: (order, secret_name)},
+    [(line_num, order, offset, variable_name)], {line_num: skipped pattern
+    names}) -- line numbers and offsets relative to `text`. Only matches
+    starting before `own_end` (default: anywhere) count; see _scan_stream.
+
+    The first pattern (in SECRET_PATTERNS order) to match a line wins it --
+    patterns are visited in that order, so setdefault keeps the winner.
+    A "backtracks" pattern skips every line over `max_line_length`; the
+    last dict holds the ones it would otherwise have been run on.
+    """
+    timings = _timings
+    lowered = text.lower()
+    long_spans = None
+
+    secret_lines: Dict[int, tuple] = {}
+    for order, (name, regex, keywords, ignore_case) in enumerate(
+        _COMPILED_SECRET_PATTERNS
+    ):
+        started = time.perf_counter() if timings else 0.0
+        if _keywords_present(keywords, lowered if ignore_case else text):
+            skip_spans = ()
+            if name in _BACKTRACKING_PATTERNS:
+                if long_spans is None:
+                    long_spans = _long_line_spans(text, max_line_length)
+                skip_spans = long_spans
+            for line_num, offset, _match in _iter_line_matches(
+                regex, text, index, skip_spans
+            ):
+                if own_end is None or offset < own_end:
+                    secret_lines.setdefault(line_num, (order, name))
+        if timings:
+            timings.add_pattern(name, time.perf_counter() - started)
+
+    usage_hits = []
+    for order, (name, regex, keywords, _ignore_case) in enumerate(
+        _COMPILED_USAGE_PATTERNS
+    ):
+        started = time.perf_counter() if timings else 0.0
+        if _keywords_present(keywords, text):
+            for line_num, offset, match in _iter_line_matches(regex, text, index):
+                if own_end is None or offset < own_end:
+                    usage_hits.append((line_num, order, offset, match.group(1)))
+        if timings:
+            timings.add_pattern(name, time.perf_counter() - started)
+
+    skipped = _skipped_long_lines(text, index, long_spans or (), own_end)
+    return secret_lines, usage_hits, skipped
+
+
+def _compile_byte_patterns(patterns: List[Dict[str, Any]]) -> List[tuple]:
+    """
+    Like _compile_patterns, but for matching raw file bytes (see
+    _scan_mapped): the same (name, regex, keywords, ignore_case) tuples,
+    with the regex and keywords encoded.
+    """
+    return [
+        (
+            name,
+            re.compile(regex.pattern.encode("ascii")),
+            tuple(keyword.encode("ascii") for keyword in keywords),
+            ignore_case,
+        )
+        for name, regex, keywords, ignore_case in _compile_patterns(patterns)
+    ]
+
+
+_COMPILED_SECRET_BYTE_PATTERNS = _compile_byte_patterns(SECRET_PATTERNS)
+_COMPILED_USAGE_BYTE_PATTERNS = _compile_byte_patterns(USAGE_PATTERNS)
+_IGNORE_CASE_BYTE_KEYWORDS = frozenset(
+    keyword
+    for _name, _regex, keywords, ignore_case in _COMPILED_SECRET_BYTE_PATTERNS
+    + _COMPILED_USAGE_BYTE_PATTERNS
+    if ignore_case
+    for keyword in keywords
+)
+
+# A memory-mapped file is lowercased this much at a time to check the
+# '(?i)' patterns' keywords -- a case-insensitive regex search for them
+# is several times slower than a plain substring check on a lowered copy,
+# and a whole lowered copy is exactly what mapping the file avoids.
+_KEYWORD_BLOCK_BYTES = 1 << 20
+
+
+def _folded_keywords_present(buffer, keywords: frozenset) -> frozenset:
+    """Which of the (lowercase) `keywords` appear anywhere in `buffer`, ignoring case."""
+    if not keywords:
+        return frozenset()
+    overlap = max(len(keyword) for keyword in keywords) - 1
+    found = set()
+    for start in range(0, len(buffer), _KEYWORD_BLOCK_BYTES):
+        block = buffer[max(0, start - overlap) : start + _KEYWORD_BLOCK_BYTES].lower()
+        found.update(keyword for keyword in keywords - found if keyword in block)
+        if len(found) == len(keywords):
+            break
+    return frozenset(found)
+
+
+# The byte patterns only behave exactly like their str counterparts on
+# plain ASCII: in a str pattern, `\w`, `\s`, `\b` and '(?i)' are
+# Unicode-aware, and `\s` also matches the \x1c-\x1f separators, which a
+# bytes pattern's `\s` doesn't. Nor is a mapped file's '\r' translated the
+# way reading it as text does (universal newlines), so a file with any
+# would be split into different lines. A buffer containing any of those
+# bytes goes through the str engine instead.
+_NOT_PLAIN_ASCII_RE = re.compile(b"[\r\x1c-\x1f\x80-\xff]")
+
+
+def _match_bytes(
+    buffer, index: _LineIndex, max_line_length: int = DEFAULT_MAX_LINE_LENGTH
+):
+    """
+    _match_text for a plain-ASCII bytes-like `buffer`, with the byte
+    patterns: ({line_num: secret_name}, [(line_num, order, offset,
+    variable_name)], {line_num: skipped pattern names}).
+    """
+    folded = _folded_keywords_present(buffer, _IGNORE_CASE_BYTE_KEYWORDS)
+
+    def keywords_present(keywords: tuple, ignore_case: bool) -> bool:
+        if ignore_case:
+            return not keywords or not folded.isdisjoint(keywords)
+        return not keywords or any(buffer.find(keyword) != -1 for keyword in keywords)
+
+    timings = _timings
+    long_spans = None
+    secret_lines: Dict[int, str] = {}
+    for name, regex, keywords, ignore_case in _COMPILED_SECRET_BYTE_PATTERNS:
+        started = time.perf_counter() if timings else 0.0
+        if keywords_present(keywords, ignore_case):
+            skip_spans = ()
+            if name in _BACKTRACKING_PATTERNS:
+                if long_spans is None:
+                    long_spans = _long_line_spans(buffer, max_line_length)
+                skip_spans = long_spans
+            for line_num, _offset, _match in _iter_line_matches(
+                regex, buffer, index, skip_spans
+            ):
+                secret_lines.setdefault(line_num, name)
+        if timings:
+            timings.add_pattern(name, time.perf_counter() - started)
+
+    usage_hits = []
+    for order, (name, regex, keywords, ignore_case) in enumerate(
+        _COMPILED_USAGE_BYTE_PATTERNS
+    ):
+        started = time.perf_counter() if timings else 0.0
+        if keywords_present(keywords, ignore_case):
+            for line_num, offset, match in _iter_line_matches(regex, buffer, index):
+                usage_hits.append(
+                    (line_num, order, offset, match.group(1).decode("ascii"))
+                )
+        if timings:
+            timings.add_pattern(name, time.perf_counter() - started)
+
+    skipped = _skipped_long_lines(buffer, index, long_spans or ())
+    return secret_lines, usage_hits, skipped
+
+
+def _scan_mapped(
+    file_path: str,
+    schema_vars: set,
+    max_line_length: int = DEFAULT_MAX_LINE_LENGTH,
+    skipped_lines: Optional[List[Dict]] = None,
+) -> Optional[tuple]:
+    """
+    Scans a file on disk through a read-only memory map with the byte
+    patterns, so a file with nothing to report is never read into a Python
+    buffer, decoded, or copied at all -- only the lines that actually hold
+    a secret are decoded, to build their findings. Results are the same as
+    _scan_text's over the decoded file.
+
+    Returns None if the file isn't plain ASCII with '\\n' line endings
+    (see _NOT_PLAIN_ASCII_RE) or can't be mapped, for the caller to fall
+    back to reading it as text.
+    Lines too long for some patterns (see _match_text) are appended to
+    `skipped_lines`, if given -- as they are by _scan_text and _scan_stream.
+    """
+    try:
+        with open(file_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return [], []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                if _NOT_PLAIN_ASCII_RE.search(buffer):
+                    return None
+                index = _LineIndex(buffer)
+                secret_lines, usage_hits, skipped = _match_bytes(
+                    buffer, index, max_line_length
+                )
+                secret_findings = [
+                    {
+                        "file_path": file_path,
+                        "line_num": line_num,
+                        "secret_type": secret_lines[line_num],
+                        "line_content": index.line(line_num).decode("ascii").strip(),
+                    }
+                    for line_num in sorted(secret_lines)
+                ]
+    except (OSError, ValueError):
+        return None
+    usage_hits.sort()
+    if skipped_lines is not None:
+        skipped_lines.extend(
+            _skipped_line_findings(file_path, skipped, max_line_length)
+        )
+    return _build_findings(file_path, secret_findings, usage_hits, schema_vars)
+
+
+def _scan_text(
+    text: str,
+    file_path: str,
+    schema_vars: set,
+    max_line_length: int = DEFAULT_MAX_LINE_LENGTH,
+    skipped_lines: Optional[List[Dict]] = None,
+) -> (List[Dict], List[Dict]):
+    """
+    Whole-buffer counterpart to scanning `text` line by line: each pattern
+    runs once over the entire file (see _match_text), and matches are mapped
+    back to line numbers through a newline-offset index that's only built
+    if something actually matched. Findings, and their order, are the same
+    as a per-line scan's.
+    """
+    index = _LineIndex(text)
+    secret_lines, usage_hits, skipped = _match_text(
+        text, index, max_line_length=max_line_length
+    )
+    usage_hits.sort()
+    if skipped_lines is not None:
+        skipped_lines.extend(
+            _skipped_line_findings(file_path, skipped, max_line_length)
+        )
+
+    secret_findings = [
+        {
+            "file_path": file_path,
+            "line_num": line_num,
+            "secret_type": secret_lines[line_num][1],
+            "line_content": index.line(line_num).strip(),
+        }
+        for line_num in sorted(secret_lines)
+    ]
+    return _build_findings(file_path, secret_findings, usage_hits, schema_vars)
+
+
+# Files over the streaming threshold (see _scan_files) are read this many
+# characters at a time rather than all at once.
+_STREAM_CHUNK_CHARS = 1 << 20
+
+# A single line longer than a couple of chunks (minified bundles, one-line
+# JSON dumps) can't be held whole without giving up bounded memory, so it's
+# scanned in windows that overlap by this much -- enough for any realistic
+# secret. (The patterns' `\s*`/`[^:]+` parts have no fixed upper bound, so
+# no overlap could be exact for a match longer than this.)
+_STREAM_OVERLAP_CHARS = 4096
+
+
+def _scan_stream(
+    f,
+    file_path: str,
+    schema_vars: set,
+    chunk_chars: int = _STREAM_CHUNK_CHARS,
+    max_line_length: int = DEFAULT_MAX_LINE_LENGTH,
+    skipped_lines: Optional[List[Dict]] = None,
+) -> (List[Dict], List[Dict]):
+    """
+    Streaming counterpart to _scan_text, for a file too large to read into
+    memory in one go: `f` (an open text file) is read `chunk_chars` at a
+    time, and each pass scans the buffered text only up to its last
+    complete line, carrying the partial line into the next read. Since no
+    finding ever spans a newline, scanning whole lines block by block
+    finds exactly what one whole-file pass would, in bounded memory.
+
+    The one exception is a single line longer than two chunks: it's cut
+    `_STREAM_OVERLAP_CHARS` short of the buffer's end, scanned, and
+    continued from the cut with that tail still buffered. Each match is
+    counted only in the block it starts in, so the overlap never reports
+    one twice. `line_content` for such a line is just the block of it that
+    held the winning match.
+    """
+    # line_num -> (pattern order, secret name, line content)
+    secret_lines: Dict[int, tuple] = {}
+    usage_hits = []
+    skipped: Dict[int, List[str]] = {}
+    buffer = ""
+    lines_before = 0  # complete lines already consumed before `buffer`
+    offset_before = 0  # characters already consumed before `buffer`
+    while True:
+        data = f.read(chunk_chars)
+        buffer += data
+        if not data:
+            own_end = len(buffer)
+        else:
+            own_end = buffer.rfind("\n") + 1
+            if own_end == 0:
+                if len(buffer) <= chunk_chars:
+                    continue
+                own_end = len(buffer) - _STREAM_OVERLAP_CHARS
+
+        if own_end > 0:
+            index = _LineIndex(buffer)
+            block_secrets, block_usages, block_skipped = _match_text(
+                buffer, index, own_end, max_line_length
+            )
+            for line_num, (order, name) in block_secrets.items():
+                current = secret_lines.get(lines_before + line_num)
+                if current is None or order < current[0]:
+                    secret_lines[lines_before + line_num] = (
+                        order,
+                        name,
+                        index.line(line_num).strip(),
+                    )
+            usage_hits.extend(
+                (lines_before + line_num, order, offset_before + offset, var_name)
+                for line_num, order, offset, var_name in block_usages
+            )
+            # A line scanned in several windows is reported once.
+            for line_num, names in block_skipped.items():
+                seen = skipped.setdefault(lines_before + line_num, [])
+                seen.extend(name for name in names if name not in seen)
+            lines_before += buffer.count("\n", 0, own_end)
+            offset_before += own_end
+            buffer = buffer[own_end:]
+
+        if not data:
+            break
+
+    usage_hits.sort()
+    if skipped_lines is not None:
+        skipped_lines.extend(
+            _skipped_line_findings(file_path, skipped, max_line_length)
+        )
+    secret_findings = [
+        {
+            "file_path": file_path,
+            "line_num": line_num,
+            "secret_type": secret_lines[line_num][1],
+            "line_content": secret_lines[line_num][2],
+        }
+        for line_num in sorted(secret_lines)
+    ]
+    return _build_findings(file_path, secret_findings, usage_hits, schema_vars)
+
+
+def _build_findings(
+    file_path: str,
+    secret_findings: List[Dict],
+    usage_hits: List[tuple],
+    schema_vars: set,
+) -> (List[Dict], List[Dict]):
+    undeclared_findings = [
+        {"file_path": file_path, "line_num": line_num, "variable_name": var_name}
+        for line_num, _order, _offset, var_name in usage_hits
+        if var_name not in schema_vars
+    ]
+    return secret_findings, undeclared_findings
+
+
 # Directories that are never useful to scan and are expensive/noisy to walk:
 # dependency trees, VCS internals, virtualenvs, and build artifacts. These are
 # always pruned in addition to whatever the user configures in envshield.yml.
@@ -133,63 +832,119 @@ DEFAULT_EXCLUDED_DIRS = {
     ".tox",
     "dist",
     "build",
+    # EnvShield's own state, including its scan cache.
+    ".envshield",
 }
 
 
-def _is_default_excluded_dir(dirname: str) -> bool:
-    return (
-        dirname in DEFAULT_EXCLUDED_DIRS
-        or dirname.endswith(".egg-info")
-        or dirname.endswith(".dist-info")
-    )
+# Extensions that are never worth opening: images, archives and packages,
+# compiled artifacts, media, fonts, and binary data stores. Replaced
+# wholesale by `secret_scanning.binary_extensions` in envshield.yml, if set.
+DEFAULT_BINARY_EXTENSIONS = frozenset(
+    {
+        # Images
+        ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".webp", ".tif", ".tiff", ".psd",
+        # Archives and packages
+        ".zip", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".tar", ".rar", ".whl", ".egg", ".jar", ".war",
+        # Compiled code and native libraries
+        ".pyc", ".pyo", ".so", ".dll", ".dylib", ".exe", ".o", ".a", ".lib", ".class", ".wasm",
+        # Audio and video
+        ".mp3", ".mp4", ".m4a", ".mov", ".avi", ".mkv", ".wav", ".flac", ".ogg", ".webm",
+        # Fonts
+        ".woff", ".woff2", ".ttf", ".otf", ".eot",
+        # Documents and data stores
+        ".pdf", ".sqlite", ".sqlite3", ".db", ".parquet", ".pkl", ".npy", ".npz",
+    }
+)  # fmt: skip
+
+# How much of a file's start is inspected to decide whether it's binary --
+# the same heuristic (and amount) Git itself uses for a NUL byte.
+_BINARY_SNIFF_BYTES = 8192
+_BINARY_MAGIC_NUMBERS = (
+    b"\x89PNG\r\n\x1a\n",
+    b"\xff\xd8\xff",  # JPEG
+    b"GIF87a",
+    b"GIF89a",
+    b"%PDF-",
+    b"PK\x03\x04",  # zip, and everything built on it: wheels, jars, docx
+    b"\x1f\x8b",  # gzip
+    b"BZh",
+    b"\xfd7zXZ\x00",
+    b"7z\xbc\xaf\x27\x1c",
+    b"\x7fELF",
+    b"\xcf\xfa\xed\xfe",  # Mach-O
+    b"\xca\xfe\xba\xbe",  # Java class / Mach-O universal
+    b"SQLite format 3\x00",
+    b"\x00asm",
+)
+
+
+def _looks_binary(head: bytes) -> bool:
+    """Whether a file's first few KB look like binary data, not text."""
+    return b"\x00" in head or head.startswith(_BINARY_MAGIC_NUMBERS)
+
+
+def _file_looks_binary(file_path: str) -> bool:
+    try:
+        with open(file_path, "rb") as f:
+            return _looks_binary(f.read(_BINARY_SNIFF_BYTES))
+    except (IOError, OSError):
+        return False
 
 
-def _get_diff_lines(file_path: str) -> Optional[set]:
-    """Get line numbers that are newly added in the staged version.
+def _has_binary_extension(file_path: str, binary_extensions) -> bool:
+    return os.path.splitext(file_path)[1].lower() in binary_extensions
 
-    Compares the staged version against HEAD to find lines that are new in
-    this commit (present in staged but not in HEAD).
 
-    Args:
-        file_path: Path to the file to check
+def _binary_extensions_from_config(config: Dict[str, Any]) -> frozenset:
+    """
+    `secret_scanning.binary_extensions` from envshield.yml, normalized
+    ('PNG' and '.png' alike mean '.png'), or the default deny list if it
+    isn't set. An empty list turns extension-based skipping off entirely;
+    content sniffing still applies either way.
+    """
+    configured = config.get("secret_scanning", {}).get("binary_extensions")
+    if configured is None:
+        return DEFAULT_BINARY_EXTENSIONS
+    return frozenset(
+        "." + str(extension).lower().lstrip(".") for extension in configured
+    )
+
 
-    Returns:
-        set: Line numbers (1-indexed) that are newly added
-        None: If the file doesn't exist in HEAD (brand new file) - scan all lines
-        empty set: If there are no new lines
+# Files over this many bytes are scanned a chunk at a time (see
+# _scan_stream) rather than read whole; files over the maximum aren't
+# scanned at all. Both can be set under `secret_scanning` in envshield.yml.
+DEFAULT_STREAM_THRESHOLD = 1_000_000
+DEFAULT_MAX_FILE_SIZE = 100_000_000
+
+
+def _size_limits_from_config(config: Dict[str, Any]) -> tuple:
     """
-    try:
-        head_content = git_utils.get_head_file_content(file_path)
+    (stream_threshold, max_file_size) from `secret_scanning` in
+    envshield.yml -- `large_file_threshold` and `max_file_size`, in bytes --
+    or their defaults where unset.
+    """
+    settings = config.get("secret_scanning", {})
+    threshold = settings.get("large_file_threshold")
+    max_size = settings.get("max_file_size")
+    return (
+        DEFAULT_STREAM_THRESHOLD if threshold is None else int(threshold),
+        DEFAULT_MAX_FILE_SIZE if max_size is None else int(max_size),
+    )
 
-        # Brand new file - return None to indicate "scan all lines"
-        if head_content is None:
-            return None
 
-        staged_content = git_utils.get_staged_file_content(file_path)
-        if staged_content is None:
-            return set()
-
-        # Extract lines
-        head_lines = head_content.splitlines()
-        staged_lines = staged_content.splitlines()
-
-        # A positional diff, not a content-set comparison: matching by exact
-        # line text alone would treat a genuinely new line as "pre-existing"
-        # whenever some unrelated line elsewhere in the file happens to have
-        # identical text (e.g. a repeated comment or template block) --
-        # letting a real new secret hide behind a coincidental text match.
-        matcher = difflib.SequenceMatcher(
-            None, head_lines, staged_lines, autojunk=False
-        )
-        new_line_numbers = set()
-        for tag, _i1, _i2, j1, j2 in matcher.get_opcodes():
-            if tag in ("insert", "replace"):
-                new_line_numbers.update(range(j1 + 1, j2 + 1))
-
-        return new_line_numbers
-    except Exception:
-        # On any error, return empty set (conservative - don't scan)
-        return set()
+def _max_line_length_from_config(config: Dict[str, Any]) -> int:
+    """`secret_scanning.max_line_length` from envshield.yml, or its default."""
+    max_line_length = config.get("secret_scanning", {}).get("max_line_length")
+    return DEFAULT_MAX_LINE_LENGTH if max_line_length is None else int(max_line_length)
+
+
+def _is_default_excluded_dir(dirname: str) -> bool:
+    return (
+        dirname in DEFAULT_EXCLUDED_DIRS
+        or dirname.endswith(".egg-info")
+        or dirname.endswith(".dist-info")
+    )
 
 
 def _scan_single_file(
@@ -197,10 +952,19 @@ def _scan_single_file(
     schema_vars: set,
     content: Optional[str] = None,
     new_lines_only: Optional[set] = None,
+    stream: bool = False,
+    max_line_length: int = DEFAULT_MAX_LINE_LENGTH,
+    skipped_lines: Optional[List[Dict]] = None,
 ) -> (List[Dict], List[Dict]):
     """
     Helper to scan one file for both secrets and undeclared variables.
     Returns two lists: one for secrets, one for undeclared variables.
+    The whole file is read into one buffer and scanned by _scan_text,
+    rather than split into a list of lines and looped over in Python --
+    unless `stream` is set (a file over the streaming threshold), in which
+    case it's read and scanned a chunk at a time by _scan_stream. A plain
+    ASCII file that's neither is scanned in place through a memory map
+    instead (see _scan_mapped), without being read or decoded at all.
 
     If `content` is provided, it's scanned directly instead of reading the
     file from disk — used for `--staged` scans, where we must scan what's
@@ -210,56 +974,424 @@ def _scan_single_file(
 
     If `new_lines_only` is provided, only those line numbers are scanned.
     Used for diff-aware scanning of excluded files.
+
+    Lines over `max_line_length` aren't checked against the "backtracks"
+    patterns (see SECRET_PATTERNS); each one that could have held such a
+    secret is appended to `skipped_lines`, if given, with the reason.
     """
-    secret_findings = []
-    undeclared_findings = []
+    args = (
+        file_path,
+        schema_vars,
+        content,
+        new_lines_only,
+        stream,
+        max_line_length,
+        skipped_lines,
+    )
+    timings = _timings
+    if timings is None:
+        return _scan_file_contents(*args)
+    # Everything but the pattern matching itself -- reading, decoding,
+    # mapping, building findings -- counts as reading.
+    started = time.perf_counter()
+    matching_before = timings.phases[scan_timings.MATCH]
+    try:
+        with timings.file(file_path):
+            return _scan_file_contents(*args)
+    finally:
+        elapsed = time.perf_counter() - started
+        timings.add(
+            scan_timings.READ,
+            elapsed - (timings.phases[scan_timings.MATCH] - matching_before),
+        )
+
+
+def _scan_file_contents(
+    file_path: str,
+    schema_vars: set,
+    content: Optional[str],
+    new_lines_only: Optional[set],
+    stream: bool,
+    max_line_length: int,
+    skipped_lines: Optional[List[Dict]],
+) -> (List[Dict], List[Dict]):
+    if content is None and new_lines_only is None and not stream:
+        findings = _scan_mapped(file_path, schema_vars, max_line_length, skipped_lines)
+        if findings is not None:
+            return findings
 
     try:
-        if content is not None:
-            lines = content.splitlines(keepends=True)
-        else:
+        if content is None:
             with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                lines = f.readlines()
+                if stream and new_lines_only is None:
+                    return _scan_stream(
+                        f,
+                        file_path,
+                        schema_vars,
+                        max_line_length=max_line_length,
+                        skipped_lines=skipped_lines,
+                    )
+                content = f.read()
+    except (IOError, OSError):
+        return [], []
+
+    if new_lines_only is None:
+        return _scan_text(
+            content, file_path, schema_vars, max_line_length, skipped_lines
+        )
 
-        for line_num, line in enumerate(lines, 1):
-            # If new_lines_only is specified, skip lines not in that set
-            if new_lines_only is not None and line_num not in new_lines_only:
+    # Diff-aware scanning only ever touches a handful of lines in what's
+    # often a large file (a lockfile, a fixture) -- pull out just those
+    # lines and check each on its own rather than regex-scanning the lot.
+    secret_findings = []
+    undeclared_findings = []
+    skipped: Dict[int, List[str]] = {}
+    index = _LineIndex(content)
+    # Per-line matching isn't broken down by pattern; see _match_text.
+    with _timings.phase(scan_timings.MATCH) if _timings else _NOT_TIMED:
+        for line_num in sorted(new_lines_only):
+            if not 1 <= line_num <= len(index.starts):
                 continue
+            line = index.line(line_num)
+
+            too_long = len(line.rstrip("\n")) > max_line_length
+            if too_long:
+                names = _backtracking_patterns_in(line)
+                if names:
+                    skipped[line_num] = names
+            secret_type = match_secret_type(line, skip_backtracking=too_long)
+            if secret_type:
+                secret_findings.append(
+                    {
+                        "file_path": file_path,
+                        "line_num": line_num,
+                        "secret_type": secret_type,
+                        "line_content": line.strip(),
+                    }
+                )
 
-            # Check for secrets
-            for secret in SECRET_PATTERNS:
-                if re.search(secret["pattern"], line):
-                    secret_findings.append(
+            for var_name in _find_usage_vars(line):
+                if var_name not in schema_vars:
+                    undeclared_findings.append(
                         {
                             "file_path": file_path,
                             "line_num": line_num,
-                            "secret_type": secret["name"],
-                            "line_content": line.strip(),
+                            "variable_name": var_name,
                         }
                     )
-                    break
 
-            # Check for undeclared variables
-            for usage in USAGE_PATTERNS:
-                matches = re.findall(usage["pattern"], line)
-                for var_name in matches:
-                    if var_name not in schema_vars:
-                        undeclared_findings.append(
-                            {
-                                "file_path": file_path,
-                                "line_num": line_num,
-                                "variable_name": var_name,
-                            }
-                        )
+    if skipped_lines is not None:
+        skipped_lines.extend(
+            _skipped_line_findings(file_path, skipped, max_line_length)
+        )
+    return secret_findings, undeclared_findings
+
+
+# Files go to worker processes in chunks rather than one at a time, so the
+# per-task pickling/IPC round trip is paid once per chunk, not per file. A
+# scan smaller than _PARALLEL_SCAN_MIN_FILES stays in-process entirely:
+# starting a pool costs more than it could save on, say, the handful of
+# files a typical pre-commit hook sees.
+_SCAN_CHUNK_SIZE = 64
+_PARALLEL_SCAN_MIN_FILES = 256
 
+
+def _scan_task_chunk(
+    tasks: List[tuple], max_line_length: int = DEFAULT_MAX_LINE_LENGTH
+) -> List[tuple]:
+    """
+    Runs _scan_single_file over one chunk of (file_path, content,
+    new_lines_only, stream) tasks -- the unit of work a worker process
+    receives -- returning a (secret_findings, usage_findings,
+    skipped_lines) triple per task.
+
+    Every variable usage is returned, unfiltered: which schema a file is
+    checked against is decided by a closure over the loaded schemas (see
+    _build_undeclared_var_resolver), which stays in the parent process
+    rather than being pickled out to every worker.
+    """
+    results = []
+    for file_path, content, new_lines_only, stream in tasks:
+        skipped_lines = []
+        secrets, usages = _scan_single_file(
+            file_path,
+            set(),
+            content=content,
+            new_lines_only=new_lines_only,
+            stream=stream,
+            max_line_length=max_line_length,
+            skipped_lines=skipped_lines,
+        )
+        results.append((secrets, usages, skipped_lines))
+    return results
+
+
+def _profiled_scan_task_chunk(
+    tasks: List[tuple], max_line_length: int = DEFAULT_MAX_LINE_LENGTH
+) -> tuple:
+    """
+    _scan_task_chunk for a `--profile` scan, in a worker process: returns
+    (results, timings) with this chunk's own timings, for the parent to
+    merge into the scan's -- a worker's module state never makes it back
+    on its own.
+    """
+    global _timings
+    previous, _timings = _timings, scan_timings.ScanTimings()
+    try:
+        return _scan_task_chunk(tasks, max_line_length), _timings.as_dict()
+    finally:
+        _timings = previous
+
+
+def _iter_scan_results(
+    tasks: Iterable[tuple],
+    jobs: Optional[int] = None,
+    max_line_length: int = DEFAULT_MAX_LINE_LENGTH,
+):
+    """
+    Yields one (secret_findings, usage_findings, skipped_lines) triple per
+    task, always in task order.
+
+    `tasks` can be any iterable, and is only ever pulled from a few chunks
+    ahead of what's been yielded -- so a generator that's still walking a
+    tree (or reading blobs) keeps doing so while earlier chunks are being
+    scanned, and only a bounded number of tasks are ever held at once.
+
+    Large scans fan out across a process pool of up to `jobs` workers
+    (default: the CPU count) -- the regex work is CPU-bound, so threads
+    wouldn't help. If a pool can't be started at all (a sandbox without
+    working multiprocessing, say) or dies partway, whatever's left is just
+    scanned in-process instead.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    tasks = iter(tasks)
+    # Chunks handed to the pool and not yet yielded, oldest first, and
+    # their futures -- kept apart so a chunk the pool never accepted is
+    # still scanned, in-process, below.
+    in_flight = collections.deque()
+    futures = collections.deque()
+    if jobs > 1:
+        # Enough tasks to tell whether a pool is worth starting at all, and
+        # how finely to split the work between its workers.
+        head = list(itertools.islice(tasks, jobs * 4 * _SCAN_CHUNK_SIZE))
+        tasks = itertools.chain(head, tasks)
+        if len(head) >= _PARALLEL_SCAN_MIN_FILES:
+            chunk_size = max(1, min(_SCAN_CHUNK_SIZE, -(-len(head) // (jobs * 4))))
+            chunks = iter(lambda: list(itertools.islice(tasks, chunk_size)), [])
+            scan_chunk = (
+                _scan_task_chunk if _timings is None else _profiled_scan_task_chunk
+            )
+            try:
+                with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=jobs
+                ) as executor:
+                    for chunk in itertools.chain(chunks, [None]):
+                        if chunk is not None:
+                            in_flight.append(chunk)
+                            futures.append(
+                                executor.submit(scan_chunk, chunk, max_line_length)
+                            )
+                            # Two chunks per worker keeps every worker busy.
+                            if len(futures) < jobs * 2:
+                                continue
+                        # The oldest chunk's results -- or, once there are
+                        # no more chunks, every remaining one's.
+                        while futures and (chunk is None or len(futures) >= jobs * 2):
+                            chunk_results = futures[0].result()
+                            if _timings is not None:
+                                chunk_results, chunk_timings = chunk_results
+                                _timings.merge(chunk_timings)
+                            futures.popleft()
+                            in_flight.popleft()
+                            yield from chunk_results
+            except (OSError, NotImplementedError, BrokenProcessPool):
+                pass
+
+    for task in itertools.chain(itertools.chain.from_iterable(in_flight), tasks):
+        yield from _scan_task_chunk([task], max_line_length)
+
+
+_PATTERN_FINGERPRINT = scan_cache.fingerprint(SECRET_PATTERNS, USAGE_PATTERNS)
+
+# Scan caches kept loaded between scans, keyed by their file's absolute
+# path -- only ever set (to a dict) by a long-running `envshield daemon`
+# (see daemon.py), so each scan it runs reuses the last one's cache instead
+# of loading it from disk again. None -- the usual case -- opens each cache
+# afresh.
+_resident_caches: Optional[Dict[str, scan_cache._ResultCache]] = None
+
+
+def _open_cache(cache_class: type, path: str) -> scan_cache._ResultCache:
+    if _resident_caches is None:
+        return cache_class(_PATTERN_FINGERPRINT, path)
+    key = os.path.abspath(path)
+    cache = _resident_caches.get(key)
+    if cache is None:
+        cache = _resident_caches[key] = cache_class(_PATTERN_FINGERPRINT, path)
+    return cache
+
+
+def _read_text_file(file_path: str) -> Optional[str]:
+    try:
+        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+            return f.read()
     except (IOError, OSError):
-        return [], []
+        return None
 
-    return secret_findings, undeclared_findings
 
+def _findings_from_cache(
+    file_path: str,
+    cached: tuple,
+    load_content,
+    new_lines_only: Optional[set] = None,
+) -> Optional[tuple]:
+    """
+    Rebuilds full (secret_findings, usage_findings) from a scan_cache hit,
+    narrowed to `new_lines_only` if given -- a whole-file result restricted
+    to some lines is exactly what scanning just those lines would find.
+
+    The cache holds no line text, so if any cached secret survives,
+    `load_content()` (the file on disk, or its blob) is read again for the
+    text of those lines -- None if that fails, and it's scanned afresh.
+    """
+    secret_hits, usage_hits = cached
+    if new_lines_only is not None:
+        secret_hits = [hit for hit in secret_hits if hit[0] in new_lines_only]
+        usage_hits = [hit for hit in usage_hits if hit[0] in new_lines_only]
+    secret_findings = []
+    if secret_hits:
+        content = load_content()
+        if content is None:
+            return None
+        index = _LineIndex(content)
+        if any(line_num > len(index.starts) for line_num, _ in secret_hits):
+            return None
+        secret_findings = [
+            {
+                "file_path": file_path,
+                "line_num": line_num,
+                "secret_type": secret_type,
+                "line_content": index.line(line_num).strip(),
+            }
+            for line_num, secret_type in secret_hits
+        ]
+    usage_findings = [
+        {"file_path": file_path, "line_num": line_num, "variable_name": var_name}
+        for line_num, var_name in usage_hits
+    ]
+    return secret_findings, usage_findings
+
+
+# Directories are listed on a small thread pool: os.scandir releases the
+# GIL while it waits on the filesystem, so on a network mount -- where every
+# listing is a round trip -- several can be in flight at once. On a local
+# disk the threads cost next to nothing.
+_WALK_THREADS = 8
 
-def _collect_files_to_scan(paths: Optional[List[str]], staged_only: bool) -> List[str]:
-    """Collects a list of files to be scanned based on user input."""
+
+def _list_directory(directory: str) -> tuple:
+    """
+    One directory's ([(file_path, stat)], [subdirectory_path]) for
+    _scandir_walk, or two empty lists if it can't be read -- os.walk's
+    behavior too. Each file's stat comes from its DirEntry, so nothing
+    downstream has to stat it again.
+    """
+    files, subdirs = [], []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    # Like os.walk, never descend through a symlinked
+                    # directory -- and never treat one as a file, either.
+                    if not entry.is_symlink() and not _is_default_excluded_dir(
+                        entry.name
+                    ):
+                        subdirs.append(entry.path)
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    st = None
+                files.append((entry.path, st))
+    except OSError:
+        pass
+    return files, subdirs
+
+
+def _scandir_walk(directory: str):
+    """
+    Yields (file_path, stat) for every file under `directory`, pruning
+    DEFAULT_EXCLUDED_DIRS, as soon as each directory has been listed.
+    Subdirectories are listed concurrently (see _WALK_THREADS), but
+    consumed strictly in the order they were found, so the sequence is the
+    same from run to run. `stat` is None for a file that couldn't be
+    stat'ed (a dangling symlink, say).
+    """
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=_WALK_THREADS)
+    finished = False
+    try:
+        pending = collections.deque([pool.submit(_list_directory, directory)])
+        while pending:
+            files, subdirs = pending.popleft().result()
+            pending.extend(pool.submit(_list_directory, subdir) for subdir in subdirs)
+            yield from files
+        finished = True
+    finally:
+        # A walk run to completion joins its (by now idle) threads, so none
+        # are left behind when the scan forks its worker processes; one
+        # abandoned midway just drops whatever listings are still queued.
+        pool.shutdown(wait=finished, cancel_futures=True)
+
+
+def _walk_directory(directory: str, respect_gitignore: bool = True):
+    """
+    Yields (file_path, stat_or_None) for every file under `directory`,
+    minus anything in a DEFAULT_EXCLUDED_DIRS directory.
+
+    Inside a Git work tree (and with `respect_gitignore`), the list comes
+    from one `git ls-files` (see git_utils.list_unignored_files), so
+    nothing .gitignore excludes -- build output, data dumps, caches not on
+    the default list -- is ever walked at all; those paths come with no
+    stat. Otherwise, or if Git isn't available, it's a _scandir_walk of the
+    tree on disk.
+    """
+    listed = git_utils.list_unignored_files(directory) if respect_gitignore else None
+    if listed is None:
+        yield from _scandir_walk(directory)
+        return
+
+    for relative_path in listed:
+        parts = relative_path.rstrip("/").split("/")
+        if any(_is_default_excluded_dir(part) for part in parts[:-1]):
+            continue
+        if relative_path.endswith("/"):
+            # An untracked nested repository or a submodule: Git won't list
+            # inside either, so it's enumerated under its own .gitignore
+            # rules instead.
+            if not _is_default_excluded_dir(parts[-1]):
+                yield from _walk_directory(
+                    os.path.join(directory, *parts), respect_gitignore
+                )
+            continue
+        yield os.path.join(directory, *parts), None
+
+
+def _collect_files_to_scan(
+    paths: Optional[List[str]], staged_only: bool, respect_gitignore: bool = True
+):
+    """
+    Collects the files to be scanned based on user input, as
+    (file_path, stat_or_None) pairs. See _walk_directory for how
+    `respect_gitignore` affects directories.
+
+    Staged files come back as a list. Anything else is a generator that
+    walks lazily, so scanning can start on the first files found instead
+    of waiting for the whole tree to be listed.
+    """
 
     if staged_only:
         console.print("Scanning [yellow]staged files[/yellow]...")
@@ -267,39 +1399,78 @@ def _collect_files_to_scan(paths: Optional[List[str]], staged_only: bool) -> Lis
         if not files:
             console.print("[green]No staged files to scan.[/green]")
             raise typer.Exit()
-        return files
+        return [(file_path, None) for file_path in files]
 
-    files_to_scan = []
     scan_paths = paths or ["."]
 
     if "." in scan_paths:
         console.print("Scanning [yellow]current directory[/yellow] recursively...")
 
-    for path in scan_paths:
-        if os.path.isfile(path):
-            files_to_scan.append(os.path.abspath(path))
-        elif os.path.isdir(path):
-            for root, dirs, files in os.walk(path):
-                # Prune in-place so os.walk doesn't descend into these dirs at all.
-                dirs[:] = [d for d in dirs if not _is_default_excluded_dir(d)]
-                for file in files:
-                    files_to_scan.append(os.path.join(root, file))
-    return files_to_scan
-
-
-def _filter_files(files: List[str], exclude_patterns: List[str]) -> List[str]:
-    """Filters a list of files against a list of glob patterns."""
-    final_files = []
-    for file_path in files:
-        is_excluded = False
-        normalized_path = file_path.replace(os.getcwd() + os.sep, "")
-        for pattern in exclude_patterns:
-            if fnmatch.fnmatch(normalized_path, pattern):
-                is_excluded = True
-                break
-        if not is_excluded:
-            final_files.append(file_path)
-    return final_files
+    def _iter_files():
+        for path in scan_paths:
+            if os.path.isfile(path):
+                yield os.path.abspath(path), None
+            elif os.path.isdir(path):
+                yield from _walk_directory(path, respect_gitignore)
+
+    return _iter_files()
+
+
+_GLOB_MAGIC_RE = re.compile(r"[*?[]")
+
+
+class _ExclusionMatcher:
+    """
+    Matches file paths against a list of exclusion globs exactly as calling
+    `fnmatch.fnmatch(path, pattern)` for each pattern would -- on the path
+    made cwd-relative -- but compiled once up front, so each path costs
+    roughly one check instead of one per pattern:
+
+    - a pattern with no wildcards at all is a set lookup;
+    - '*' followed by a literal ('*.lock', '*/fixtures/seed.sql') is one
+      `str.endswith` over all of them at once ('*' matches '/' too);
+    - everything else is folded into a single alternation regex.
+    """
+
+    def __init__(self, patterns: List[str], cwd: Optional[str] = None):
+        self._cwd_prefix = (cwd or os.getcwd()) + os.sep
+        exact, suffixes, translated = set(), [], []
+        for pattern in patterns:
+            pattern = os.path.normcase(pattern)
+            if not _GLOB_MAGIC_RE.search(pattern):
+                exact.add(pattern)
+            elif pattern.startswith("*") and not _GLOB_MAGIC_RE.search(pattern[1:]):
+                suffixes.append(pattern[1:])
+            else:
+                translated.append(fnmatch.translate(pattern))
+        self._exact = exact
+        self._suffixes = tuple(suffixes)
+        self._regex = re.compile("|".join(translated)) if translated else None
+
+    def matches(self, file_path: str) -> bool:
+        normalized_path = os.path.normcase(file_path.replace(self._cwd_prefix, ""))
+        return (
+            normalized_path in self._exact
+            or (bool(self._suffixes) and normalized_path.endswith(self._suffixes))
+            or (
+                self._regex is not None
+                and self._regex.match(normalized_path) is not None
+            )
+        )
+
+
+def _filter_files(files, exclude_patterns: List[str]):
+    """Lazily filters (file_path, stat) pairs against a list of glob patterns."""
+    matcher = _ExclusionMatcher(exclude_patterns)
+    timings = _timings
+    for file_path, st in files:
+        if timings:
+            with timings.phase(scan_timings.FILTER):
+                excluded = matcher.matches(file_path)
+        else:
+            excluded = matcher.matches(file_path)
+        if not excluded:
+            yield file_path, st
 
 
 def _normalize_for_dir_match(file_path: str) -> str:
@@ -388,10 +1559,25 @@ def _scan_files(
     config_path: Optional[str],
     exclude_patterns: Optional[List[str]],
     service_name: Optional[str] = None,
+    jobs: Optional[int] = None,
+    use_cache: bool = True,
+    respect_gitignore: bool = True,
+    on_findings: Optional[Callable[[List[Dict], List[Dict]], None]] = None,
+    timings: Optional[scan_timings.ScanTimings] = None,
+    diff_range: Optional[str] = None,
+    shard: Optional[Tuple[int, int, str]] = None,
 ):
     """
     Does the actual file collection and scanning, returning the raw
-    (secret_findings, undeclared_findings, skipped_large_files) lists.
+    (secret_findings, undeclared_findings, skipped_large_files,
+    skipped_binary_files, skipped_lines) lists -- the last holding each
+    line over `secret_scanning.max_line_length` that some pattern wasn't
+    run on, as {"file_path", "line_num", "patterns", "reason"}.
+
+    If `on_findings` is given, it's called with each file's (secret_findings,
+    undeclared_findings) as soon as that file's result is in, and the
+    findings aren't collected at all -- the first two lists returned are
+    then empty. That's how `--format ndjson` (see scan_ndjson) streams.
 
     Extracted from run_scan so both the Rich-rendering path and the
     '--json' path (see scan_result) share one implementation instead of
@@ -400,39 +1586,180 @@ def _scan_files(
     If `service_name` is provided, scans for variables against that service's schema.
     Otherwise, on a multi-service project, each file is checked against
     whichever service's schema its directory belongs to.
+
+    `jobs` caps how many worker processes scan files in parallel (default:
+    the CPU count) -- see _iter_scan_results.
+
+    With `use_cache`, a file on disk whose size/mtime/content hash match a
+    previous scan's (see scan_cache.ScanCache) reuses that scan's result
+    instead of being scanned again; a staged scan does the same by blob OID
+    (see scan_cache.BlobScanCache), so a blob already scanned on any branch
+    or worktree is never read or scanned again.
+
+    `respect_gitignore` (the default) enumerates a directory inside a Git
+    repository with `git ls-files`, skipping whatever it ignores -- see
+    _walk_directory.
+
+    If `timings` is given, it's filled in with where the scan spent its
+    time, phase by phase and pattern by pattern -- for `--profile`.
+
+    With `diff_range` ('BASE..HEAD'), only the lines that range adds are
+    scanned, as they are at its end -- for `--diff`. It's a staged scan in
+    every other respect, with the range's diff in place of the index's.
+
+    With `shard` -- (index, count, strategy), for `--shard i/N` -- only
+    that shard's share of the files is scanned (see scan_shard.shard_files).
+    """
+    global _timings
+    args = (
+        paths,
+        staged_only,
+        config_path,
+        exclude_patterns,
+        service_name,
+        jobs,
+        use_cache,
+        respect_gitignore,
+        on_findings,
+        diff_range,
+        shard,
+    )
+    if timings is None:
+        return _collect_and_scan_files(*args)
+
+    previous, _timings = _timings, timings
+    started = time.perf_counter()
+    try:
+        return _collect_and_scan_files(*args)
+    finally:
+        timings.wall += time.perf_counter() - started
+        _timings = previous
+
+
+def _phase(phase: str):
+    """Times a block as `phase` of a `--profile` scan; a no-op otherwise."""
+    return _timings.phase(phase) if _timings else _NOT_TIMED
+
+
+def _scan_settings(
+    config_path: Optional[str], exclude_patterns: Optional[List[str]]
+) -> tuple:
+    """
+    (exclusions, binary_extensions, stream_threshold, max_file_size,
+    max_line_length) for a scan: `secret_scanning` in envshield.yml (plus
+    `exclude_patterns`), or the defaults wherever it says nothing -- or
+    can't be loaded at all.
     """
     all_exclusions = []
+    binary_extensions = DEFAULT_BINARY_EXTENSIONS
+    stream_threshold, max_file_size = DEFAULT_STREAM_THRESHOLD, DEFAULT_MAX_FILE_SIZE
+    max_line_length = DEFAULT_MAX_LINE_LENGTH
     try:
         config = config_manager.load_config(config_path)
         config_exclusions = config.get("secret_scanning", {}).get("exclude_files", [])
         all_exclusions.extend(config_exclusions)
+        binary_extensions = _binary_extensions_from_config(config)
+        stream_threshold, max_file_size = _size_limits_from_config(config)
+        max_line_length = _max_line_length_from_config(config)
     except EnvShieldException:
         pass
 
     if exclude_patterns:
         all_exclusions.extend(exclude_patterns)
+    return (
+        all_exclusions,
+        binary_extensions,
+        stream_threshold,
+        max_file_size,
+        max_line_length,
+    )
+
+
+def _collect_and_scan_files(
+    paths,
+    staged_only,
+    config_path,
+    exclude_patterns,
+    service_name,
+    jobs,
+    use_cache,
+    respect_gitignore,
+    on_findings,
+    diff_range,
+    shard,
+):
+    """The body of _scan_files -- see there."""
+    (
+        all_exclusions,
+        binary_extensions,
+        stream_threshold,
+        max_file_size,
+        max_line_length,
+    ) = _scan_settings(config_path, exclude_patterns)
 
     schema_resolver = _build_undeclared_var_resolver(service_name)
 
-    files_to_scan = _collect_files_to_scan(paths, staged_only)
+    range_added_lines: Dict[str, Optional[set]] = {}
+    range_blob_ids: Dict[str, str] = {}
+    # The commit a --diff range ends at: every file is read from there.
+    range_end = None
+    if diff_range is not None:
+        console.print(f"Scanning lines added in [yellow]{diff_range}[/yellow]...")
+        with _phase(scan_timings.GIT):
+            changes = git_utils.get_range_added_lines(diff_range)
+            range_end = git_utils.get_range_end(diff_range)
+        if changes is None or range_end is None:
+            raise EnvShieldException(
+                f"Couldn't diff '{diff_range}'. Both ends must be commits in this repository; a shallow CI checkout may need more history fetched."
+            )
+        range_added_lines, range_blob_ids = changes
+        files_to_scan = [(file_path, None) for file_path in range_added_lines]
+        # From here on, a staged scan -- of the range's blobs, not the index's.
+        staged_only = True
+    else:
+        with _phase(scan_timings.ENUMERATE):
+            files_to_scan = _collect_files_to_scan(
+                paths, staged_only, respect_gitignore
+            )
+            if shard is not None:
+                # Only a sharded scan needs it.
+                from . import scan_shard
+
+                shard_index, shard_count, shard_by = shard
+                console.print(
+                    f"Scanning shard [yellow]{shard_index}/{shard_count}[/yellow] (by {shard_by})..."
+                )
+                files_to_scan = scan_shard.shard_files(files_to_scan, *shard)
 
     # For staged scans: keep excluded files for diff-aware scanning
     # For non-staged scans: filter out excluded files as before
     if staged_only:
         final_files_to_scan = files_to_scan
-        excluded_files = set()
-        for pattern in all_exclusions:
-            for file_path in files_to_scan:
-                normalized_path = file_path.replace(os.getcwd() + os.sep, "")
-                if fnmatch.fnmatch(normalized_path, pattern):
-                    excluded_files.add(file_path)
+        with _phase(scan_timings.FILTER):
+            matcher = _ExclusionMatcher(all_exclusions)
+            excluded_files = {
+                file_path
+                for file_path, _st in files_to_scan
+                if matcher.matches(file_path)
+            }
     else:
         final_files_to_scan = _filter_files(files_to_scan, all_exclusions)
+        if _timings:
+            # The walk is lazy, so its time is only spent as it's consumed.
+            final_files_to_scan = _timings.timed_iter(
+                final_files_to_scan, scan_timings.ENUMERATE, net_of=scan_timings.FILTER
+            )
         excluded_files = set()
 
     all_secret_findings = []
     all_undeclared_findings = []
     skipped_large_files = []
+    # Binary files are skipped before any regex runs over them: scanning
+    # decoded image or archive bytes is wasted work that only ever turns
+    # up false positives.
+    skipped_binary_files = []
+    # Lines too long to run every pattern on (see _match_text), with why.
+    skipped_lines = []
 
     with Progress(
         SpinnerColumn(),
@@ -441,60 +1768,246 @@ def _scan_files(
         TextColumn("Scanning [cyan]{task.description}[/cyan]"),
         console=console,
     ) as progress:
-        scan_task = progress.add_task("files...", total=len(final_files_to_scan))
-        for file_path in final_files_to_scan:
-            progress.update(
-                scan_task, description=os.path.basename(file_path), advance=1
-            )
+        # A directory scan streams its files in as they're found, so the
+        # total is only known once planning has seen them all.
+        scan_task = progress.add_task(
+            "files...",
+            total=len(final_files_to_scan) if staged_only else None,
+        )
 
-            schema_vars = schema_resolver(file_path) if schema_resolver else set()
+        # Planning: decide, per file, whether and how it gets scanned --
+        # anything needing git or the console stays here, in this process.
+        # What's left is a stream of self-contained (file_path, content,
+        # new_lines_only, stream) tasks a worker process can run on its own,
+        # pulled only a few chunks ahead of the scanning (see
+        # _iter_scan_results) -- so the walk overlaps the scan, and a staged
+        # blob is only read once its chunk is due. Every file that gets a
+        # result at all is also recorded, in order, in `planned` as
+        # (file_path, cached_findings, cache_key): a cache hit has its
+        # findings already; anything else is the next task's result, to be
+        # stored in the cache under `cache_key` (a stat for a file on disk,
+        # a blob OID for a staged file) if set.
+        planned = collections.deque()
+        cache = None
+        with _phase(scan_timings.CACHE):
+            if use_cache and not staged_only:
+                cache_path = scan_cache.cache_path(config_manager.find_project_root())
+                if cache_path:
+                    cache = _open_cache(scan_cache.ScanCache, cache_path)
+            elif use_cache:
+                git_context = git_utils.get_git_context()
+                if git_context:
+                    cache = _open_cache(
+                        scan_cache.BlobScanCache,
+                        scan_cache.blob_cache_path(git_context.common_dir),
+                    )
+        # Staged blobs are all read through one `git cat-file --batch`
+        # process rather than a `git show` (plus `git rev-parse`) apiece,
+        # and by the exact OID staged for each path.
+        blob_context = (
+            git_utils.BlobReader() if staged_only else contextlib.nullcontext()
+        )
+        with _phase(scan_timings.GIT):
+            if diff_range is not None:
+                blob_ids = range_blob_ids
+            else:
+                blob_ids = git_utils.get_staged_blob_ids() if staged_only else {}
+            # Every excluded file's newly-added lines, from one `git diff
+            # --cached -U0` for the whole index rather than a HEAD-vs-staged
+            # comparison per file.
+            staged_added_lines = (
+                git_utils.get_staged_added_lines()
+                if excluded_files and diff_range is None
+                else {}
+            )
 
-            if staged_only:
-                # Scan what's actually staged in the index, not the working-tree
-                # copy on disk -- they can differ (see get_staged_file_content).
-                content = git_utils.get_staged_file_content(file_path)
-                if content is None:
-                    continue
-                if len(content) > 1_000_000:
-                    skipped_large_files.append(file_path)
+        def _planned_tasks():
+            file_count = 0
+            for file_path, known_st in final_files_to_scan:
+                file_count += 1
+                if _has_binary_extension(file_path, binary_extensions):
+                    skipped_binary_files.append(file_path)
+                    progress.advance(scan_task)
                     continue
 
-                # Diff-aware scanning for excluded files
-                new_lines_only = None
-                if file_path in excluded_files:
-                    new_lines = _get_diff_lines(file_path)
-                    if new_lines is None:
-                        # Brand new file - scan all lines despite exclusion
-                        console.print(
-                            f"[yellow]ℹ️  Scanning new file {os.path.basename(file_path)} (despite exclusion)[/yellow]"
-                        )
-                        new_lines_only = None
-                    elif len(new_lines) == 0:
-                        # File is excluded and has no new lines - skip it
+                if staged_only:
+                    # Diff-aware scanning for excluded files -- and, for
+                    # --diff, for every file: only what the range adds.
+                    new_lines_only = None
+                    if diff_range is not None:
+                        new_lines_only = range_added_lines[file_path]
+                        if new_lines_only is not None and not new_lines_only:
+                            progress.advance(scan_task)
+                            continue
+                    elif file_path in excluded_files:
+                        new_lines = staged_added_lines.get(file_path, set())
+                        if new_lines is None:
+                            # Brand new file - scan all lines despite exclusion
+                            console.print(
+                                f"[yellow]ℹ️  Scanning new file {os.path.basename(file_path)} (despite exclusion)[/yellow]"
+                            )
+                            new_lines_only = None
+                        elif len(new_lines) == 0:
+                            # File is excluded and has no new lines - skip it
+                            progress.advance(scan_task)
+                            continue
+                        else:
+                            # File is excluded, but scan only newly-added lines
+                            console.print(
+                                f"[dim]ℹ️  {os.path.basename(file_path)} (excluded; diffs only: {len(new_lines)} new line(s))[/dim]"
+                            )
+                            new_lines_only = new_lines
+
+                    blob_oid = blob_ids.get(file_path)
+                    if cache is not None and blob_oid:
+                        with _phase(scan_timings.CACHE):
+                            cached = cache.lookup(blob_oid)
+                            findings = cached and _findings_from_cache(
+                                file_path,
+                                cached,
+                                lambda: blobs.blob_content(
+                                    blob_oid, file_path, range_end
+                                ),
+                                new_lines_only,
+                            )
+                        if findings is not None:
+                            planned.append((file_path, findings, None))
+                            continue
+
+                    # Scan what's actually staged in the index, not the working-tree
+                    # copy on disk -- they can differ (see get_staged_file_content).
+                    # For --diff, what's committed at the range's end, never
+                    # the index.
+                    with _phase(scan_timings.GIT):
+                        if blob_oid:
+                            content = blobs.blob_content(blob_oid, file_path, range_end)
+                        elif range_end is not None:
+                            content = blobs.head_content(file_path, range_end)
+                        else:
+                            content = blobs.staged_content(file_path)
+                    if content is None:
+                        progress.advance(scan_task)
+                        continue
+                    # A staged blob is already in memory by now, so
+                    # streaming it would save nothing; only the hard
+                    # maximum applies.
+                    if len(content) > max_file_size:
+                        skipped_large_files.append(file_path)
+                        progress.advance(scan_task)
                         continue
-                    else:
-                        # File is excluded, but scan only newly-added lines
-                        console.print(
-                            f"[dim]ℹ️  {os.path.basename(file_path)} (excluded; diffs only: {len(new_lines)} new line(s))[/dim]"
+                    # NULs survive decoding, as does any ASCII magic number.
+                    with _phase(scan_timings.BINARY):
+                        looks_binary = _looks_binary(
+                            content[:_BINARY_SNIFF_BYTES].encode(
+                                "utf-8", errors="ignore"
+                            )
                         )
-                        new_lines_only = new_lines
+                    if looks_binary:
+                        skipped_binary_files.append(file_path)
+                        progress.advance(scan_task)
+                        continue
 
-                secrets, undeclared = _scan_single_file(
-                    file_path,
-                    schema_vars,
-                    content=content,
-                    new_lines_only=new_lines_only,
-                )
+                    # Only a whole-blob result is worth remembering; a
+                    # diff-aware one covers just this commit's new lines.
+                    cacheable = cache is not None and new_lines_only is None
+                    planned.append((file_path, None, blob_oid if cacheable else None))
+                    yield (file_path, content, new_lines_only, False)
+                else:
+                    # A walked file already carries the stat its directory
+                    # listing produced; only a listed or named one needs one.
+                    st = known_st
+                    if st is None:
+                        try:
+                            st = os.stat(file_path)
+                        except OSError:
+                            st = None
+                    if st is not None and st.st_size > max_file_size:
+                        skipped_large_files.append(file_path)
+                        progress.advance(scan_task)
+                        continue
+                    if cache is not None and st is not None:
+                        with _phase(scan_timings.CACHE):
+                            cached = cache.lookup(file_path, st)
+                            findings = cached and _findings_from_cache(
+                                file_path, cached, lambda: _read_text_file(file_path)
+                            )
+                        if findings is not None:
+                            planned.append((file_path, findings, None))
+                            continue
+                    # Only reached on a cache miss: a cached file is known
+                    # to be text already.
+                    with _phase(scan_timings.BINARY):
+                        looks_binary = _file_looks_binary(file_path)
+                    if looks_binary:
+                        skipped_binary_files.append(file_path)
+                        progress.advance(scan_task)
+                        continue
+                    stream = st is not None and st.st_size > stream_threshold
+                    planned.append((file_path, None, st if cache is not None else None))
+                    yield (file_path, None, None, stream)
+
+            progress.update(scan_task, total=file_count)
+
+        def _report(file_path, secrets, usages):
+            progress.update(
+                scan_task, description=os.path.basename(file_path), advance=1
+            )
+            schema_vars = schema_resolver(file_path) if schema_resolver else set()
+            undeclared = [
+                usage for usage in usages if usage["variable_name"] not in schema_vars
+            ]
+            if on_findings is not None:
+                on_findings(secrets, undeclared)
             else:
-                if os.path.exists(file_path) and os.path.getsize(file_path) > 1_000_000:
-                    skipped_large_files.append(file_path)
-                    continue
-                secrets, undeclared = _scan_single_file(file_path, schema_vars)
+                all_secret_findings.extend(secrets)
+                all_undeclared_findings.extend(undeclared)
+
+        # Scanning: the regex work itself, possibly spread across worker
+        # processes. Results come back in task order either way, so output
+        # is deterministic regardless of `jobs` or which files were cached.
+        with blob_context as blobs:
+            results = _iter_scan_results(_planned_tasks(), jobs, max_line_length)
+            # Each result is the first task's still in `planned`, after any
+            # cache hits planned ahead of it; the final None is for the
+            # cache hits planned after the last task.
+            for result in itertools.chain(results, [None]):
+                while planned and planned[0][1] is not None:
+                    file_path, cached_findings, _cache_key = planned.popleft()
+                    _report(file_path, *cached_findings)
+                if result is None:
+                    break
+                file_path, _cached_findings, cache_key = planned.popleft()
+                secrets, usages, file_skipped_lines = result
+                skipped_lines.extend(file_skipped_lines)
+                # A result with lines left unchecked isn't cached, so the
+                # file gets a full scan again under a higher limit.
+                if cache_key is not None and not file_skipped_lines:
+                    secret_hits = [(f["line_num"], f["secret_type"]) for f in secrets]
+                    usage_hits = [(f["line_num"], f["variable_name"]) for f in usages]
+                    with _phase(scan_timings.CACHE):
+                        if staged_only:
+                            cache.store(cache_key, secret_hits, usage_hits)
+                        else:
+                            cache.store(file_path, cache_key, secret_hits, usage_hits)
+                _report(file_path, secrets, usages)
+
+    if cache is not None:
+        with _phase(scan_timings.CACHE):
+            cache.save()
 
-            all_secret_findings.extend(secrets)
-            all_undeclared_findings.extend(undeclared)
+    return (
+        all_secret_findings,
+        all_undeclared_findings,
+        skipped_large_files,
+        skipped_binary_files,
+        skipped_lines,
+    )
 
-    return all_secret_findings, all_undeclared_findings, skipped_large_files
+
+# Binary files are an expected skip, not a coverage gap like an oversized
+# file -- listed, but capped so a repo full of images doesn't bury the
+# actual findings.
+_MAX_LISTED_BINARY_FILES = 10
 
 
 def run_scan(
@@ -503,6 +2016,12 @@ def run_scan(
     config_path: Optional[str],
     exclude_patterns: Optional[List[str]],
     service_name: Optional[str] = None,
+    jobs: Optional[int] = None,
+    use_cache: bool = True,
+    respect_gitignore: bool = True,
+    profile: bool = False,
+    diff_range: Optional[str] = None,
+    shard: Optional[Tuple[int, int, str]] = None,
 ):
     """
     The main function to orchestrate the scanning process.
@@ -510,30 +2029,106 @@ def run_scan(
     If `service_name` is provided, scans for variables against that service's schema.
     Otherwise, on a multi-service project, each file is checked against
     whichever service's schema its directory belongs to.
+
+    `profile` prints where the scan spent its time (see _print_timings).
+    `diff_range` scans only the lines a commit range adds, and `shard`
+    only one shard's share of the files (see _scan_files).
     """
-    all_secret_findings, all_undeclared_findings, skipped_large_files = _scan_files(
-        paths, staged_only, config_path, exclude_patterns, service_name
+    timings = scan_timings.ScanTimings() if profile else None
+    (
+        all_secret_findings,
+        all_undeclared_findings,
+        skipped_large_files,
+        skipped_binary_files,
+        skipped_lines,
+    ) = _scan_files(
+        paths,
+        staged_only,
+        config_path,
+        exclude_patterns,
+        service_name,
+        jobs,
+        use_cache,
+        respect_gitignore,
+        timings=timings,
+        diff_range=diff_range,
+        shard=shard,
     )
 
+    if timings is not None:
+        _print_timings(timings)
+
+    _print_skipped(skipped_large_files, skipped_binary_files, skipped_lines)
+
+    found_issues = _print_findings(all_secret_findings, all_undeclared_findings)
+
+    if not found_issues:
+        console.print(
+            "\n[bold green]✓ No issues found. Your configuration is secure and compliant![/bold green]"
+        )
+        return
+
+    if staged_only:
+        console.print(
+            "\n[bold red]Commit aborted. Please fix the issues above before committing.[/bold red]"
+        )
+
+    raise typer.Exit(code=1)
+
+
+def _print_skipped(
+    skipped_large_files: List[str],
+    skipped_binary_files: List[str],
+    skipped_lines: List[Dict],
+) -> None:
+    """Lists whatever a scan skipped, or scanned only partly, and why."""
     if skipped_large_files:
         console.print(
-            f"\n[bold yellow]⚠️  Skipped {len(skipped_large_files)} file(s) over 1MB (not scanned -- coverage is incomplete for these):[/bold yellow]"
+            f"\n[bold yellow]⚠️  Skipped {len(skipped_large_files)} file(s) over the size limit (secret_scanning.max_file_size; not scanned -- coverage is incomplete for these):[/bold yellow]"
         )
         for skipped_path in skipped_large_files:
             console.print(f"    [dim]{skipped_path}[/dim]")
 
+    if skipped_lines:
+        console.print(
+            f"\n[bold yellow]⚠️  Skipped {len(skipped_lines)} line(s) too long for some patterns (secret_scanning.max_line_length; coverage is incomplete for these):[/bold yellow]"
+        )
+        for skipped_line in skipped_lines:
+            console.print(
+                f"    [dim]{skipped_line['file_path']}:{skipped_line['line_num']} -- {skipped_line['reason']}[/dim]"
+            )
+
+    if skipped_binary_files:
+        console.print(
+            f"\n[dim]Skipped {len(skipped_binary_files)} binary file(s) (not text -- nothing to scan):[/dim]"
+        )
+        for skipped_path in skipped_binary_files[:_MAX_LISTED_BINARY_FILES]:
+            console.print(f"    [dim]{skipped_path}[/dim]")
+        if len(skipped_binary_files) > _MAX_LISTED_BINARY_FILES:
+            console.print(
+                f"    [dim]... and {len(skipped_binary_files) - _MAX_LISTED_BINARY_FILES} more[/dim]"
+            )
+
+
+def _print_findings(
+    secret_findings: List[Dict], undeclared_findings: List[Dict]
+) -> bool:
+    """
+    Prints the secret and undeclared-variable tables, for whichever of the
+    two has anything in it. Returns whether either did.
+    """
     found_issues = False
-    if all_secret_findings:
+    if secret_findings:
         found_issues = True
         console.print(
-            f"\n[bold red]🚨 DANGER: Found {len(all_secret_findings)} potential secret(s)![/bold red]"
+            f"\n[bold red]🚨 DANGER: Found {len(secret_findings)} potential secret(s)![/bold red]"
         )
         table = Table(title="Secret Scan Results", border_style="red")
         table.add_column("File", style="cyan")
         table.add_column("Line", style="yellow")
         table.add_column("Secret Type", style="magenta")
         table.add_column("Line Content", style="white")
-        for finding in all_secret_findings:
+        for finding in secret_findings:
             table.add_row(
                 finding["file_path"],
                 str(finding["line_num"]),
@@ -542,10 +2137,10 @@ def run_scan(
             )
         console.print(table)
 
-    if all_undeclared_findings:
+    if undeclared_findings:
         found_issues = True
         console.print(
-            f"\n[bold yellow]⚠️  WARNING: Found {len(all_undeclared_findings)} undeclared variable(s)![/bold yellow]"
+            f"\n[bold yellow]⚠️  WARNING: Found {len(undeclared_findings)} undeclared variable(s)![/bold yellow]"
         )
         undeclared_table = Table(
             title="Undeclared Variable Usage", border_style="yellow"
@@ -553,7 +2148,7 @@ def run_scan(
         undeclared_table.add_column("File", style="cyan")
         undeclared_table.add_column("Line", style="yellow")
         undeclared_table.add_column("Variable Name", style="white")
-        for finding in all_undeclared_findings:
+        for finding in undeclared_findings:
             undeclared_table.add_row(
                 finding["file_path"],
                 str(finding["line_num"]),
@@ -564,18 +2159,51 @@ def run_scan(
             "\n[bold]Suggestion:[/bold] Please add these variables to your 'env.schema.toml' to maintain your configuration contract."
         )
 
-    if not found_issues:
-        console.print(
-            "\n[bold green]✓ No issues found. Your configuration is secure and compliant![/bold green]"
-        )
-        return
+    return found_issues
 
-    if staged_only:
-        console.print(
-            "\n[bold red]Commit aborted. Please fix the issues above before committing.[/bold red]"
-        )
 
-    raise typer.Exit(code=1)
+# How many of the slowest patterns `--profile` lists.
+_MAX_PROFILED_PATTERNS = 10
+
+
+def _print_timings(timings: scan_timings.ScanTimings) -> None:
+    """
+    The `--profile` report: time per scan phase, the slowest patterns, and
+    the costliest single runs of one pattern over one file.
+    """
+    report = timings.as_dict()
+    table = Table(title="Scan Profile", border_style="blue")
+    table.add_column("Phase", style="cyan")
+    table.add_column("Seconds", style="yellow", justify="right")
+    table.add_column("% of wall", style="white", justify="right")
+    for phase, seconds in report["phases"].items():
+        share = 100 * seconds / report["wall"] if report["wall"] else 0.0
+        table.add_row(phase, f"{seconds:.3f}", f"{share:.0f}%")
+    table.add_row("[bold]wall clock[/bold]", f"[bold]{report['wall']:.3f}[/bold]", "")
+    console.print()
+    console.print(table)
+
+    if report["patterns"]:
+        pattern_table = Table(title="Slowest Patterns", border_style="blue")
+        pattern_table.add_column("Pattern", style="magenta")
+        pattern_table.add_column("Seconds", style="yellow", justify="right")
+        slowest = list(report["patterns"].items())[:_MAX_PROFILED_PATTERNS]
+        for name, seconds in slowest:
+            pattern_table.add_row(name, f"{seconds:.3f}")
+        console.print(pattern_table)
+
+    if report["hotspots"]:
+        hotspot_table = Table(title="Costliest Pattern Runs", border_style="blue")
+        hotspot_table.add_column("Pattern", style="magenta")
+        hotspot_table.add_column("File", style="cyan")
+        hotspot_table.add_column("Seconds", style="yellow", justify="right")
+        for hotspot in report["hotspots"]:
+            hotspot_table.add_row(
+                hotspot["pattern"], hotspot["file_path"], f"{hotspot['seconds']:.3f}"
+            )
+        console.print(hotspot_table)
+    # Worker-process time is summed, so it can add up past the wall clock.
+    console.print("[dim]Read and match times are summed across worker processes.[/dim]")
 
 
 def scan_result(
@@ -584,27 +2212,185 @@ def scan_result(
     config_path: Optional[str],
     exclude_patterns: Optional[List[str]],
     service_name: Optional[str] = None,
+    jobs: Optional[int] = None,
+    use_cache: bool = True,
+    respect_gitignore: bool = True,
+    profile: bool = False,
+    diff_range: Optional[str] = None,
+    shard: Optional[Tuple[int, int, str]] = None,
 ) -> Dict[str, Any]:
     """
     Same scan as run_scan, but silences every Rich print/progress-bar (so
     stdout stays pure JSON) and returns a plain, JSON-serializable dict
     instead of rendering tables and raising typer.Exit -- for '--json'.
+    With `profile`, the dict also has a `timings` key (see
+    scan_timings.ScanTimings.as_dict).
     """
-    was_quiet = console.quiet
-    console.quiet = True
-    try:
-        secrets, undeclared, skipped = _scan_files(
-            paths, staged_only, config_path, exclude_patterns, service_name
+    timings = scan_timings.ScanTimings() if profile else None
+    with _quiet_console():
+        secrets, undeclared, skipped, skipped_binary, skipped_lines = _scan_files(
+            paths,
+            staged_only,
+            config_path,
+            exclude_patterns,
+            service_name,
+            jobs,
+            use_cache,
+            respect_gitignore,
+            timings=timings,
+            diff_range=diff_range,
+            shard=shard,
         )
-    finally:
-        console.quiet = was_quiet
 
-    return {
+    result = {
         "clean": not (secrets or undeclared),
         "secrets": secrets,
         "undeclared_variables": undeclared,
         "skipped_files": skipped,
+        "skipped_binary_files": skipped_binary,
+        "skipped_lines": skipped_lines,
     }
+    if timings is not None:
+        result["timings"] = timings.as_dict()
+    if shard is not None:
+        # What `scan-merge` checks the shards add up to a whole scan by.
+        result["shard"] = {"index": shard[0], "count": shard[1], "by": shard[2]}
+    return result
+
+
+def scan_ndjson(
+    out: IO[str],
+    paths: Optional[List[str]],
+    staged_only: bool,
+    config_path: Optional[str],
+    exclude_patterns: Optional[List[str]],
+    service_name: Optional[str] = None,
+    jobs: Optional[int] = None,
+    use_cache: bool = True,
+    respect_gitignore: bool = True,
+    profile: bool = False,
+    diff_range: Optional[str] = None,
+    shard: Optional[Tuple[int, int, str]] = None,
+) -> bool:
+    """
+    Same scan as scan_result, but written to `out` as newline-delimited
+    JSON -- for '--format ndjson'. Each finding is one
+    {"type": "secret" | "undeclared_variable", ...finding} line, written
+    and flushed as soon as its file has been scanned, rather than held
+    until the whole scan is done; a final {"type": "summary", ...} line
+    carries the counts and skipped files (and, with `profile`, the
+    scan's `timings`). Returns whether the scan was clean.
+    """
+    timings = scan_timings.ScanTimings() if profile else None
+    counts = {"secret": 0, "undeclared_variable": 0}
+
+    def _write(record_type: str, findings: List[Dict]) -> None:
+        for finding in findings:
+            out.write(json.dumps({"type": record_type, **finding}) + "\n")
+        counts[record_type] += len(findings)
+
+    def _on_findings(secrets: List[Dict], undeclared: List[Dict]) -> None:
+        _write("secret", secrets)
+        _write("undeclared_variable", undeclared)
+        if secrets or undeclared:
+            out.flush()
+
+    with _quiet_console():
+        _secrets, _undeclared, skipped, skipped_binary, skipped_lines = _scan_files(
+            paths,
+            staged_only,
+            config_path,
+            exclude_patterns,
+            service_name,
+            jobs,
+            use_cache,
+            respect_gitignore,
+            on_findings=_on_findings,
+            timings=timings,
+            diff_range=diff_range,
+            shard=shard,
+        )
+
+    clean = not (counts["secret"] or counts["undeclared_variable"])
+    summary = {
+        "type": "summary",
+        "clean": clean,
+        "secrets": counts["secret"],
+        "undeclared_variables": counts["undeclared_variable"],
+        "skipped_files": skipped,
+        "skipped_binary_files": skipped_binary,
+        "skipped_lines": skipped_lines,
+    }
+    if timings is not None:
+        summary["timings"] = timings.as_dict()
+    out.write(json.dumps(summary) + "\n")
+    out.flush()
+    return clean
+
+
+def scan_sarif(
+    out: IO[str],
+    paths: Optional[List[str]],
+    staged_only: bool,
+    config_path: Optional[str],
+    exclude_patterns: Optional[List[str]],
+    service_name: Optional[str] = None,
+    jobs: Optional[int] = None,
+    use_cache: bool = True,
+    respect_gitignore: bool = True,
+    profile: bool = False,
+    diff_range: Optional[str] = None,
+    shard: Optional[Tuple[int, int, str]] = None,
+) -> bool:
+    """
+    Same scan as scan_result, but written to `out` as a SARIF 2.1.0 log
+    for code scanning platforms -- for '--format sarif'. Results are
+    written as each file's come in (see sarif.SarifWriter), whether they
+    were scanned in a worker process or came from the cache. With
+    `profile`, the scan's timings go in the invocation's properties.
+    Returns whether the scan was clean.
+    """
+    from ..core import sarif
+
+    timings = scan_timings.ScanTimings() if profile else None
+    writer = sarif.SarifWriter(out, SECRET_PATTERNS)
+    writer.start()
+    with _quiet_console():
+        _secrets, _undeclared, skipped, skipped_binary, skipped_lines = _scan_files(
+            paths,
+            staged_only,
+            config_path,
+            exclude_patterns,
+            service_name,
+            jobs,
+            use_cache,
+            respect_gitignore,
+            on_findings=writer.add,
+            timings=timings,
+            diff_range=diff_range,
+            shard=shard,
+        )
+    writer.finish(
+        skipped,
+        skipped_binary,
+        skipped_lines,
+        timings=timings.as_dict() if timings is not None else None,
+    )
+    return writer.result_count == 0
+
+
+@contextlib.contextmanager
+def _quiet_console():
+    """
+    Silences every Rich print/progress-bar for the duration, so stdout
+    carries nothing but machine-readable output.
+    """
+    was_quiet = console.quiet
+    console.quiet = True
+    try:
+        yield
+    finally:
+        console.quiet = was_quiet
 
 
 _ENVSHIELD_HOOK_MARKER = "# Hook installed by EnvShield"
@@ -661,6 +2447,50 @@ def _warn_hooks_path_redirect(hooks_dir: str, git_root: str) -> None:
         )
 
 
+def _generate_pre_commit_hook_content() -> str:
+    """
+    Generates the pre-commit hook script. If any `envshield daemon` of
+    this user is listening (a socket in daemon_client.socket_dir -- checked
+    in the shell, so a user who never started one pays nothing for it), it
+    first offers the scan to it through the thin client (see
+    daemon_client), run by the same interpreter envshield itself is
+    installed in; only if no daemon takes it (exit status 75) does it start
+    envshield cold. So does a client that never got to ask -- that
+    interpreter gone or unrunnable (126, 127), or envshield no longer
+    importable by it (an ImportError, mapped to 75) -- rather than blocking
+    the commit.
+    """
+    from ..core import daemon_client
+
+    unavailable = daemon_client.UNAVAILABLE
+    return (
+        "#!/bin/sh\n\n"
+        "# Hook installed by EnvShield\n"
+        "# This hook scans for hardcoded secrets AND undeclared environment variables.\n"
+        "# If `envshield daemon` is serving this repository, the scan runs there,\n"
+        "# already warmed up; otherwise it runs here as usual.\n"
+        f"ENVSHIELD_PYTHON={shlex.quote(sys.executable)}\n"
+        "ENVSHIELD_DAEMON=\n"
+        f"for sock in {daemon_client.socket_dir_shell()}/*.sock; do\n"
+        '  if [ -S "$sock" ]; then ENVSHIELD_DAEMON=1; break; fi\n'
+        "done\n"
+        'if [ -n "$ENVSHIELD_DAEMON" ] && [ -x "$ENVSHIELD_PYTHON" ]; then\n'
+        '  "$ENVSHIELD_PYTHON" -c \'import sys\n'
+        "try:\n"
+        "    from envshield.core import daemon_client\n"
+        "except ImportError:\n"
+        f"    sys.exit({unavailable})\n"
+        "sys.exit(daemon_client.main())'\n"
+        "  status=$?\n"
+        '  case "$status" in\n'
+        f"    {unavailable}|126|127) ;;\n"
+        '    *) exit "$status" ;;\n'
+        "  esac\n"
+        "fi\n"
+        "envshield scan --staged\n"
+    )
+
+
 def install_pre_commit_hook(force: bool = False, non_interactive: bool = False):
     """Installs the Git pre-commit hook."""
     git_root = git_utils.get_git_root()
@@ -672,7 +2502,7 @@ def install_pre_commit_hook(force: bool = False, non_interactive: bool = False):
     os.makedirs(hooks_dir, exist_ok=True)
     pre_commit_path = os.path.join(hooks_dir, "pre-commit")
 
-    hook_script_content = "#!/bin/sh\n\n# Hook installed by EnvShield\n# This hook scans for hardcoded secrets AND undeclared environment variables.\nenvshield scan --staged\n"
+    hook_script_content = _generate_pre_commit_hook_content()
 
     try:
         if os.path.exists(pre_commit_path):
@@ -689,6 +2519,9 @@ def install_pre_commit_hook(force: bool = False, non_interactive: bool = False):
                 return
 
             if not force:
+                # Only ever needed here, so `scan` itself never loads it.
+                import questionary
+
                 overwrite = questionary.confirm(
                     f"A pre-commit hook already exists ({_describe_existing_hook(existing_content)}). Do you want to overwrite it?",
                     default=False,
@@ -804,6 +2637,9 @@ def install_post_merge_hook(force: bool = False, non_interactive: bool = False):
                 return
 
             if not force:
+                # Only ever needed here, so `scan` itself never loads it.
+                import questionary
+
                 overwrite = questionary.confirm(
                     f"A post-merge hook already exists ({_describe_existing_hook(existing_content)}). Do you want to overwrite it?",
                     default=False,
@@ -12,8 +12,11 @@ import shutil
 import tempfile
 from typing import Iterator, Optional
 
+import pytest
 from typer.testing import CliRunner
 
+from envshield.utils import git_utils
+
 
 @contextlib.contextmanager
 def _isolated_filesystem(
@@ -31,3 +34,15 @@ def _isolated_filesystem(
 
 
 CliRunner.isolated_filesystem = _isolated_filesystem
+
+
+@pytest.fixture(autouse=True)
+def _fresh_git_context() -> Iterator[None]:
+    """
+    git_utils caches what it resolves about a repository for the rest of
+    the process -- right for a CLI run, wrong across tests that each build
+    (and reconfigure) a throwaway repo of their own.
+    """
+    git_utils.invalidate_git_context()
+    yield
+    git_utils.invalidate_git_context()
@@ -0,0 +1,124 @@
+# envshield/tests/core/test_sarif.py
+import io
+import json
+import os
+
+from typer.testing import CliRunner
+
+from envshield.cli import app
+from envshield.core import sarif, scanner
+
+runner = CliRunner()
+
+
+def test_rule_ids_are_derived_from_pattern_names_and_unique():
+    assert (
+        sarif.rule_id("GitHub Personal Access Token (Classic)")
+        == "secret/github-personal-access-token-classic"
+    )
+    ids = [sarif.rule_id(p["name"]) for p in scanner.SECRET_PATTERNS]
+    assert len(set(ids)) == len(ids)
+    assert sarif.UNDECLARED_VARIABLE_RULE_ID not in ids
+
+
+def test_writer_streams_a_complete_log(tmp_path):
+    out = io.StringIO()
+    writer = sarif.SarifWriter(out, scanner.SECRET_PATTERNS, root=str(tmp_path))
+    writer.start()
+    writer.add([], [])
+    writer.add(
+        [
+            {
+                "file_path": str(tmp_path / "dir with space" / "a.py"),
+                "line_num": 3,
+                "secret_type": "Generic API Key",
+                "line_content": "API_KEY = 'abcdefghijklmnop1234'",
+            }
+        ],
+        [{"file_path": "/elsewhere/b.py", "line_num": 1, "variable_name": "FOO"}],
+    )
+    writer.finish(
+        [str(tmp_path / "huge.log")],
+        ["x.png"],
+        [
+            {
+                "file_path": str(tmp_path / "bundle.js"),
+                "line_num": 7,
+                "patterns": ["Database Connection String"],
+                "reason": "line too long",
+            }
+        ],
+    )
+
+    log = json.loads(out.getvalue())
+    run = log["runs"][0]
+    assert log["version"] == "2.1.0"
+    secret, undeclared = run["results"]
+    assert secret["ruleId"] == "secret/generic-api-key"
+    assert run["tool"]["driver"]["rules"][secret["ruleIndex"]]["id"] == secret["ruleId"]
+    assert secret["locations"][0]["physicalLocation"] == {
+        "artifactLocation": {
+            "uri": "dir%20with%20space/a.py",
+            "uriBaseId": "%SRCROOT%",
+        },
+        "region": {"startLine": 3},
+    }
+    assert undeclared["level"] == "warning"
+    assert undeclared["locations"][0]["physicalLocation"]["artifactLocation"] == {
+        "uri": "file:///elsewhere/b.py"
+    }
+    notification, line_notification = run["invocations"][0][
+        "toolExecutionNotifications"
+    ]
+    assert (
+        notification["locations"][0]["physicalLocation"]["artifactLocation"]["uri"]
+        == "huge.log"
+    )
+    assert line_notification["locations"][0]["physicalLocation"] == {
+        "artifactLocation": {"uri": "bundle.js", "uriBaseId": "%SRCROOT%"},
+        "region": {"startLine": 7},
+    }
+    # The matched text itself never goes into an uploaded report.
+    assert "abcdefghijklmnop1234" not in out.getvalue()
+
+
+def test_scan_format_sarif_matches_json_findings(tmp_path, monkeypatch):
+    monkeypatch.setattr(scanner, "_PARALLEL_SCAN_MIN_FILES", 2)
+    with runner.isolated_filesystem(temp_dir=tmp_path):
+        for i in range(4):
+            with open(f"mod_{i}.py", "w") as f:
+                f.write(f'TOKEN_{i} = "sk_live_123456789abcdefghijk{i}"\n')
+                f.write(f"x = os.getenv('UNDECLARED_{i}')\n")
+
+        as_json = json.loads(runner.invoke(app, ["scan", ".", "--json"]).stdout)
+        parallel = runner.invoke(
+            app, ["scan", ".", "--format", "sarif", "--jobs", "2", "--no-cache"]
+        )
+        cached = runner.invoke(app, ["scan", ".", "--format", "sarif"])
+
+        assert parallel.exit_code == 1
+        assert parallel.stdout == cached.stdout
+        results = json.loads(parallel.stdout)["runs"][0]["results"]
+        locations = [
+            (
+                r["locations"][0]["physicalLocation"]["artifactLocation"]["uri"],
+                r["locations"][0]["physicalLocation"]["region"]["startLine"],
+            )
+            for r in results
+        ]
+        expected = [
+            (os.path.relpath(f["file_path"]), f["line_num"])
+            for f in as_json["secrets"] + as_json["undeclared_variables"]
+        ]
+        assert sorted(locations) == sorted(expected)
+
+
+def test_scan_format_sarif_of_a_clean_tree_exits_zero(tmp_path):
+    with runner.isolated_filesystem(temp_dir=tmp_path):
+        with open("clean.py", "w") as f:
+            f.write("x = 1\n")
+
+        result = runner.invoke(app, ["scan", ".", "--format", "sarif"])
+
+        assert result.exit_code == 0
+        assert json.loads(result.stdout)["runs"][0]["results"] == []
@@ -0,0 +1,147 @@
+# envshield/tests/core/test_scan_cache.py
+import json
+import os
+
+from envshield.core import scan_cache
+
+
+def _write(path, content, mtime_ns=None):
+    with open(path, "w") as f:
+        f.write(content)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return os.stat(path)
+
+
+# Comfortably outside the racy window, so a stat match alone is trusted.
+_OLD_MTIME_NS = 1_600_000_000 * 10**9
+
+
+def _cache(tmp_path, **kwargs):
+    return scan_cache.ScanCache(
+        "fp", path=str(tmp_path / ".envshield" / "scan_cache.json"), **kwargs
+    )
+
+
+def test_unchanged_file_hits_without_reading_it(tmp_path, monkeypatch):
+    path = str(tmp_path / "a.py")
+    st = _write(path, "x = 1\n", _OLD_MTIME_NS)
+    cache = _cache(tmp_path)
+    assert cache.lookup(path, st) is None
+    cache.store(path, st, [(1, "Generic API Key")], [(1, "FOO")])
+    cache.save()
+
+    def _no_read(_path):
+        raise AssertionError("a stat match must not read the file")
+
+    monkeypatch.setattr(scan_cache, "file_digest", _no_read)
+    assert _cache(tmp_path).lookup(path, os.stat(path)) == (
+        [(1, "Generic API Key")],
+        [(1, "FOO")],
+    )
+
+
+def test_touched_but_identical_file_still_hits(tmp_path):
+    path = str(tmp_path / "a.py")
+    st = _write(path, "x = 1\n", _OLD_MTIME_NS)
+    cache = _cache(tmp_path)
+    cache.lookup(path, st)
+    cache.store(path, st, [], [(1, "FOO")])
+    cache.save()
+
+    st = _write(path, "x = 1\n", _OLD_MTIME_NS + 5 * 10**9)
+    assert _cache(tmp_path).lookup(path, st) == ([], [(1, "FOO")])
+
+
+def test_same_size_same_mtime_edit_is_caught_for_a_recently_scanned_file(tmp_path):
+    """
+    A file scanned moments after being written can be rewritten within the
+    same mtime tick at the same size -- only its content hash can tell.
+    """
+    path = str(tmp_path / "a.py")
+    st = _write(path, "x = 1\n")
+    cache = _cache(tmp_path)
+    cache.lookup(path, st)
+    cache.store(path, st, [], [])
+    cache.save()
+
+    st = _write(path, "y = 2\n", st.st_mtime_ns)
+    assert _cache(tmp_path).lookup(path, st) is None
+
+
+def test_modified_file_misses(tmp_path):
+    path = str(tmp_path / "a.py")
+    st = _write(path, "x = 1\n", _OLD_MTIME_NS)
+    cache = _cache(tmp_path)
+    cache.lookup(path, st)
+    cache.store(path, st, [], [])
+    cache.save()
+
+    st = _write(path, "x = 12\n", _OLD_MTIME_NS)
+    assert _cache(tmp_path).lookup(path, st) is None
+
+
+def test_different_pattern_fingerprint_discards_the_cache(tmp_path):
+    path = str(tmp_path / "a.py")
+    st = _write(path, "x = 1\n", _OLD_MTIME_NS)
+    cache = _cache(tmp_path)
+    cache.lookup(path, st)
+    cache.store(path, st, [], [])
+    cache.save()
+
+    other = scan_cache.ScanCache("other", path=cache.path)
+    assert other.lookup(path, st) is None
+
+
+def test_fingerprint_changes_with_any_pattern_change():
+    patterns = [{"name": "A", "pattern": "a+", "keywords": ("a",)}]
+    changed = [{"name": "A", "pattern": "a+b", "keywords": ("a",)}]
+    assert scan_cache.fingerprint(patterns) == scan_cache.fingerprint(list(patterns))
+    assert scan_cache.fingerprint(patterns) != scan_cache.fingerprint(changed)
+
+
+def test_least_recently_used_entries_are_evicted_beyond_the_cap(tmp_path):
+    paths = [str(tmp_path / f"f{i}.py") for i in range(3)]
+    stats = [_write(p, f"v{i}\n", _OLD_MTIME_NS) for i, p in enumerate(paths)]
+
+    cache = _cache(tmp_path, max_entries=2)
+    for path, st in zip(paths[:2], stats[:2]):
+        cache.lookup(path, st)
+        cache.store(path, st, [], [])
+    cache.save()
+
+    # A later run uses f1 again and adds f2 -- f0 is now the oldest.
+    cache = _cache(tmp_path, max_entries=2)
+    assert cache.lookup(paths[1], stats[1]) is not None
+    cache.lookup(paths[2], stats[2])
+    cache.store(paths[2], stats[2], [], [])
+    cache.save()
+
+    cache = _cache(tmp_path, max_entries=2)
+    assert cache.lookup(paths[0], stats[0]) is None
+    assert cache.lookup(paths[1], stats[1]) is not None
+    assert cache.lookup(paths[2], stats[2]) is not None
+
+
+def test_cache_file_never_contains_matched_line_text(tmp_path):
+    path = str(tmp_path / "a.py")
+    st = _write(path, "API_KEY = 'abcdefghijklmnop1234'\n", _OLD_MTIME_NS)
+    cache = _cache(tmp_path)
+    cache.lookup(path, st)
+    cache.store(path, st, [(1, "Generic API Key")], [])
+    cache.save()
+
+    with open(cache.path) as f:
+        raw = f.read()
+    assert "abcdefghijklmnop1234" not in raw
+    assert json.loads(raw)["entries"]
+
+
+def test_unreadable_or_corrupt_cache_starts_cold(tmp_path):
+    path = str(tmp_path / "a.py")
+    st = _write(path, "x = 1\n", _OLD_MTIME_NS)
+    cache_path = tmp_path / ".envshield" / "scan_cache.json"
+    cache_path.parent.mkdir()
+    cache_path.write_text("{not json")
+
+    assert _cache(tmp_path).lookup(path, st) is None
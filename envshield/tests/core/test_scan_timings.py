@@ -0,0 +1,117 @@
+# envshield/tests/core/test_scan_timings.py
+import json
+import time
+
+from typer.testing import CliRunner
+
+from envshield.cli import app
+from envshield.core import scan_timings, scanner
+
+runner = CliRunner()
+
+
+def test_timed_iter_charges_nested_phase_time_only_once():
+    timings = scan_timings.ScanTimings()
+
+    def _filtered():
+        for item in range(3):
+            with timings.phase(scan_timings.FILTER):
+                time.sleep(0.02)
+            yield item
+
+    items = list(
+        timings.timed_iter(
+            _filtered(), scan_timings.ENUMERATE, net_of=scan_timings.FILTER
+        )
+    )
+
+    assert items == [0, 1, 2]
+    assert timings.phases[scan_timings.FILTER] >= 0.06
+    assert 0 <= timings.phases[scan_timings.ENUMERATE] < 0.02
+
+
+def test_merge_adds_a_workers_share():
+    timings = scan_timings.ScanTimings()
+    timings.add_pattern("A", 1.0)
+    worker = scan_timings.ScanTimings()
+    worker.add_pattern("A", 2.0)
+    worker.add(scan_timings.READ, 0.5)
+
+    timings.merge(worker.as_dict())
+
+    assert timings.patterns["A"] == 3.0
+    assert timings.phases[scan_timings.MATCH] == 3.0
+    assert timings.phases[scan_timings.READ] == 0.5
+
+
+def test_hotspots_keep_only_the_costliest_pattern_runs_per_file():
+    timings = scan_timings.ScanTimings()
+    for i in range(scan_timings.MAX_HOTSPOTS + 5):
+        with timings.file(f"f{i}.js"):
+            timings.add_pattern("A", i)
+            timings.add_pattern("A", i)
+            timings.add_pattern("B", 0.5)
+    timings.add_pattern("A", 100.0)  # outside any file: totals only
+    worker = scan_timings.ScanTimings()
+    with worker.file("worker.js"):
+        worker.add_pattern("B", 50.0)
+
+    timings.merge(worker.as_dict())
+    hotspots = timings.as_dict()["hotspots"]
+
+    assert len(hotspots) == scan_timings.MAX_HOTSPOTS
+    assert hotspots[0] == {"file_path": "worker.js", "pattern": "B", "seconds": 50.0}
+    assert hotspots[1] == {"file_path": "f14.js", "pattern": "A", "seconds": 28.0}
+    assert all(h["pattern"] == "A" for h in hotspots[1:])
+
+
+def test_profiled_scan_reports_every_pattern_including_worker_time(
+    tmp_path, monkeypatch
+):
+    monkeypatch.setattr(scanner, "_PARALLEL_SCAN_MIN_FILES", 2)
+    monkeypatch.chdir(tmp_path)
+    for i in range(4):
+        (tmp_path / f"mod_{i}.py").write_text(f"x = os.getenv('VAR_{i}')\n")
+
+    for jobs in (1, 2):
+        timings = scan_timings.ScanTimings()
+        scanner._scan_files(
+            ["."], False, None, None, jobs=jobs, use_cache=False, timings=timings
+        )
+        names = {p["name"] for p in scanner.SECRET_PATTERNS + scanner.USAGE_PATTERNS}
+        assert set(timings.patterns) == names, jobs
+        assert timings.phases[scan_timings.READ] > 0
+        assert timings.wall > 0
+    # Nothing is left switched on for the next, unprofiled, scan.
+    assert scanner._timings is None
+
+
+def test_scan_json_profile_adds_a_timings_key(tmp_path):
+    with runner.isolated_filesystem(temp_dir=tmp_path):
+        with open("app.py", "w") as f:
+            f.write("x = 1\n")
+
+        plain = json.loads(runner.invoke(app, ["scan", ".", "--json"]).stdout)
+        profiled = runner.invoke(
+            app, ["scan", ".", "--json", "--profile", "--no-cache"]
+        )
+
+        assert "timings" not in plain
+        timings = json.loads(profiled.stdout)["timings"]
+        assert set(timings) == {"wall", "phases", "patterns", "hotspots"}
+        assert "pattern matching" in timings["phases"]
+        assert "Generic API Key" in timings["patterns"]
+        assert {h["file_path"] for h in timings["hotspots"]} == {"./app.py"}
+
+
+def test_scan_profile_prints_a_breakdown(tmp_path):
+    with runner.isolated_filesystem(temp_dir=tmp_path):
+        with open("app.py", "w") as f:
+            f.write("x = 1\n")
+
+        result = runner.invoke(app, ["scan", ".", "--profile"])
+
+        assert result.exit_code == 0
+        assert "Scan Profile" in result.stdout
+        assert "pattern matching" in result.stdout
+        assert "Slowest Patterns" in result.stdout
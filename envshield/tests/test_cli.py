@@ -1,6 +1,9 @@
 # envshield/tests/test_cli.py
+import io
 import json
 import os
+import subprocess
+import sys
 
 from typer.testing import CliRunner
 
@@ -631,4 +634,205 @@ def test_scan_json_reports_clean_state(tmp_path):
             "secrets": [],
             "undeclared_variables": [],
             "skipped_files": [],
+            "skipped_binary_files": [],
+            "skipped_lines": [],
         }
+
+
+def test_scan_json_with_parallel_jobs(tmp_path, monkeypatch):
+    from envshield.core import scanner
+
+    monkeypatch.setattr(scanner, "_PARALLEL_SCAN_MIN_FILES", 2)
+    with runner.isolated_filesystem(temp_dir=tmp_path):
+        for i in range(6):
+            with open(f"mod_{i}.py", "w") as f:
+                f.write(f'TOKEN_{i} = "sk_live_123456789abcdefghijk{i}"\n')
+
+        parallel = runner.invoke(
+            app, ["scan", ".", "--json", "--jobs", "2", "--no-cache"]
+        )
+        serial = runner.invoke(
+            app, ["scan", ".", "--json", "--jobs", "1", "--no-cache"]
+        )
+
+        assert parallel.exit_code == 1
+        assert json.loads(parallel.stdout) == json.loads(serial.stdout)
+        assert len(json.loads(parallel.stdout)["secrets"]) == 6
+
+
+def test_scan_reuses_cached_results_unless_no_cache(tmp_path, mocker):
+    from envshield.core import scanner
+
+    with runner.isolated_filesystem(temp_dir=tmp_path):
+        _write_root_service()
+        with open("settings.py", "w") as f:
+            f.write('API_KEY = "abcdefghijklmnop1234"\nx = os.getenv("UNDECLARED")\n')
+
+        first = runner.invoke(app, ["scan", "settings.py", "--json"])
+        assert os.path.exists(".envshield/scan_cache.json")
+
+        spy = mocker.spy(scanner, "_scan_single_file")
+        second = runner.invoke(app, ["scan", "settings.py", "--json"])
+        assert spy.call_count == 0
+        assert json.loads(second.stdout) == json.loads(first.stdout)
+        assert len(json.loads(second.stdout)["secrets"]) == 1
+
+        third = runner.invoke(app, ["scan", "settings.py", "--json", "--no-cache"])
+        assert spy.call_count == 1
+        assert json.loads(third.stdout) == json.loads(first.stdout)
+
+
+def test_scan_caches_in_the_project_root_and_nowhere_outside_a_project(tmp_path):
+    with runner.isolated_filesystem(temp_dir=tmp_path):
+        os.makedirs("src")
+        with open("src/settings.py", "w") as f:
+            f.write('API_KEY = "abcdefghijklmnop1234"\n')
+
+        result = runner.invoke(app, ["scan", ".", "--json"])
+        assert len(json.loads(result.stdout)["secrets"]) == 1
+        assert sorted(os.listdir(".")) == ["src"]
+        assert os.listdir("src") == ["settings.py"]
+
+        _write_root_service()
+        root = os.getcwd()
+        os.chdir("src")
+        runner.invoke(app, ["scan", ".", "--json"])
+        assert os.listdir(os.path.join(root, "src")) == ["settings.py"]
+        assert os.path.exists(os.path.join(root, ".envshield", "scan_cache.json"))
+
+
+def test_scan_ndjson_streams_one_finding_per_line_then_a_summary(tmp_path):
+    with runner.isolated_filesystem(temp_dir=tmp_path):
+        with open("settings.py", "w") as f:
+            f.write('API_KEY = "abcdefghijklmnop1234"\nx = os.getenv("UNDECLARED")\n')
+        with open("clean.py", "w") as f:
+            f.write("x = 1\n")
+
+        result = runner.invoke(app, ["scan", ".", "--format", "ndjson"])
+        as_json = runner.invoke(app, ["scan", ".", "--json"])
+
+        assert result.exit_code == 1
+        records = [json.loads(line) for line in result.stdout.splitlines()]
+        assert [r["type"] for r in records] == [
+            "secret",
+            "undeclared_variable",
+            "summary",
+        ]
+        payload = json.loads(as_json.stdout)
+        assert {k: v for k, v in records[0].items() if k != "type"} == payload[
+            "secrets"
+        ][0]
+        assert records[-1] == {
+            "type": "summary",
+            "clean": False,
+            "secrets": 1,
+            "undeclared_variables": 1,
+            "skipped_files": [],
+            "skipped_binary_files": [],
+            "skipped_lines": [],
+        }
+
+
+def test_scan_ndjson_writes_findings_before_the_scan_finishes(tmp_path, mocker):
+    from envshield.core import scanner
+
+    written_before_save = []
+    real_save = scanner.scan_cache.ScanCache.save
+
+    def _save(self):
+        written_before_save.append(output.getvalue())
+        real_save(self)
+
+    output = io.StringIO()
+    mocker.patch.object(scanner.scan_cache.ScanCache, "save", _save)
+    with runner.isolated_filesystem(temp_dir=tmp_path):
+        _write_root_service()
+        with open("leak.py", "w") as f:
+            f.write('API_KEY = "abcdefghijklmnop1234"\n')
+
+        assert scanner.scan_ndjson(output, ["leak.py"], False, None, None) is False
+
+    assert '"type": "secret"' in written_before_save[0]
+    assert '"summary"' not in written_before_save[0]
+
+
+def test_scan_format_rejects_unknown_formats_and_json_conflicts():
+    unknown = runner.invoke(app, ["scan", ".", "--format", "xml"])
+    assert unknown.exit_code == 1
+    assert "Unsupported --format 'xml'" in unknown.stdout
+
+    conflict = runner.invoke(app, ["scan", ".", "--json", "--format", "ndjson"])
+    assert conflict.exit_code == 1
+    assert "cannot be used together" in conflict.stdout
+
+
+def test_scan_rejects_zero_jobs():
+    result = runner.invoke(app, ["scan", ".", "--jobs", "0"])
+    assert result.exit_code != 0
+
+
+# What `envshield scan --staged` -- run by the pre-commit hook on every
+# commit -- may cost to start up. Generous, so a slow CI machine doesn't
+# trip it: it's there to catch the CLI going back to importing every
+# command module up front (~380ms on a laptop, against ~150ms now).
+STARTUP_BUDGET_SECONDS = 1.0
+
+_STARTUP_PROBE = """
+import sys, time
+started = time.perf_counter()
+import envshield.cli
+from envshield.core import scanner
+elapsed = time.perf_counter() - started
+heavy = ("questionary", "prompt_toolkit", "envshield.core.importer",
+         "envshield.core.doctor", "envshield.core.generator",
+         "envshield.core.setup_manager", "envshield.core.service_discovery",
+         "envshield.parsers", "envshield.core.scan_history",
+         "envshield.core.scan_watch", "envshield.core.scan_shard")
+print(elapsed)
+print(",".join(m for m in heavy if m in sys.modules))
+"""
+
+
+def test_scan_startup_loads_no_other_command_modules_and_stays_in_budget():
+    probe = subprocess.run(
+        [sys.executable, "-c", _STARTUP_PROBE],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed, loaded = probe.stdout.splitlines()
+
+    assert loaded == ""
+    assert float(elapsed) < STARTUP_BUDGET_SECONDS
+
+
+_SCAN_PROBE = """
+import sys
+from envshield.cli import app
+try:
+    app(["scan", ".", "--json", "--no-cache"])
+except SystemExit:
+    pass
+modes = ("envshield.core.scan_history", "envshield.core.scan_watch",
+         "envshield.core.scan_shard", "envshield.core.sarif",
+         "envshield.core.daemon_client")
+print("loaded:" + ",".join(m for m in modes if m in sys.modules))
+"""
+
+
+def test_a_plain_scan_loads_no_other_scan_mode_modules(tmp_path):
+    """
+    --history, --watch and --shard each import their module only when
+    given, as do --format sarif and the hook's daemon client.
+    """
+    package_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    probe = subprocess.run(
+        [sys.executable, "-c", _SCAN_PROBE],
+        cwd=tmp_path,
+        env={**os.environ, "PYTHONPATH": package_root},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert probe.stdout.splitlines()[-1] == "loaded:"
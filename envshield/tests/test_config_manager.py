@@ -506,3 +506,30 @@ def test_add_service_overwrites_a_service_registered_under_the_same_name(
     config_manager.add_service("alpha", "alpha/env.schema.toml", description="new")
 
     assert config_manager.get_services()["alpha"]["description"] == "new"
+
+
+def test_kept_parsed_files_are_reused_until_they_change(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config_manager.add_service("app", config_manager.SCHEMA_FILE_NAME)
+    with open(config_manager.SCHEMA_FILE_NAME, "w") as f:
+        f.write('[API_URL]\ndescription = "x"\n')
+    # Old enough that its stat alone can vouch for it.
+    os.utime(config_manager.SCHEMA_FILE_NAME, (1, 1))
+    parses = []
+    real_load = config_manager.toml.load
+    monkeypatch.setattr(
+        config_manager.toml, "load", lambda f: parses.append(f) or real_load(f)
+    )
+
+    config_manager.keep_parsed_files()
+    try:
+        config_manager.load_schema("app")["MUTATED"] = {}
+        assert config_manager.load_schema("app") == {"API_URL": {"description": "x"}}
+        assert len(parses) == 1
+
+        with open(config_manager.SCHEMA_FILE_NAME, "a") as f:
+            f.write('[DB_URL]\ndescription = "y"\n')
+        assert "DB_URL" in config_manager.load_schema("app")
+        assert len(parses) == 2
+    finally:
+        config_manager.keep_parsed_files(False)
@@ -73,3 +73,163 @@ def test_install_pre_commit_hook_writes_into_configured_hooks_path(
 
     assert os.path.exists(tmp_path / ".husky" / "pre-commit")
     assert not os.path.exists(tmp_path / ".git" / "hooks" / "pre-commit")
+
+
+def _commit_file(path, name, content):
+    (path / name).write_text(content)
+    subprocess.run(["git", "add", name], cwd=path, check=True)
+    subprocess.run(["git", "commit", "-q", "-m", f"add {name}"], cwd=path, check=True)
+
+
+def test_blob_reader_reads_staged_and_head_content(tmp_path, monkeypatch):
+    _init_repo(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    _commit_file(tmp_path, "a.txt", "committed\n")
+    (tmp_path / "a.txt").write_text("staged\n")
+    (tmp_path / "b.txt").write_text("brand new\n")
+    subprocess.run(["git", "add", "a.txt", "b.txt"], cwd=tmp_path, check=True)
+    (tmp_path / "a.txt").write_text("working tree only\n")
+
+    with git_utils.BlobReader() as blobs:
+        assert blobs.staged_content(str(tmp_path / "a.txt")) == "staged\n"
+        assert blobs.head_content(str(tmp_path / "a.txt")) == "committed\n"
+        assert blobs.staged_content(str(tmp_path / "b.txt")) == "brand new\n"
+        assert blobs.head_content(str(tmp_path / "b.txt")) is None
+        assert blobs.staged_content(str(tmp_path / "missing.txt")) is None
+        # Still usable after a miss -- 'missing' responses carry no body.
+        assert blobs.staged_content(str(tmp_path / "a.txt")) == "staged\n"
+
+
+def test_blob_reader_uses_one_process_for_many_files(tmp_path, monkeypatch):
+    _init_repo(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    for i in range(20):
+        (tmp_path / f"f{i}.txt").write_text(f"content {i}\n")
+    subprocess.run(["git", "add", "."], cwd=tmp_path, check=True)
+
+    popen_calls = []
+    real_popen = subprocess.Popen
+
+    def _counting_popen(*args, **kwargs):
+        popen_calls.append(args[0])
+        return real_popen(*args, **kwargs)
+
+    monkeypatch.setattr(subprocess, "Popen", _counting_popen)
+
+    with git_utils.BlobReader() as blobs:
+        contents = [
+            blobs.staged_content(str(tmp_path / f"f{i}.txt")) for i in range(20)
+        ]
+
+    assert contents == [f"content {i}\n" for i in range(20)]
+    assert [call[:2] for call in popen_calls].count(["git", "cat-file"]) == 1
+
+
+def test_blob_reader_falls_back_to_git_show_when_cat_file_is_unavailable(
+    tmp_path, monkeypatch
+):
+    _init_repo(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.txt").write_text("staged\n")
+    subprocess.run(["git", "add", "a.txt"], cwd=tmp_path, check=True)
+
+    blobs = git_utils.BlobReader()
+    monkeypatch.setattr(blobs, "_ensure_process", lambda: None)
+    blobs._broken = True
+
+    assert blobs.staged_content(str(tmp_path / "a.txt")) == "staged\n"
+
+
+def test_git_context_is_resolved_once_per_directory(tmp_path, monkeypatch):
+    _init_repo(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    calls = []
+    real_run = subprocess.run
+
+    def _counting_run(*args, **kwargs):
+        calls.append(args[0])
+        return real_run(*args, **kwargs)
+
+    monkeypatch.setattr(subprocess, "run", _counting_run)
+
+    for _ in range(5):
+        assert git_utils.get_git_root() == str(tmp_path)
+        assert git_utils.get_hooks_dir() == os.path.join(str(tmp_path), ".git", "hooks")
+
+    assert len(calls) == 2  # one rev-parse, one `git config` for core.hooksPath
+    context = git_utils.get_git_context()
+    assert context.index_path == os.path.join(str(tmp_path), ".git", "index")
+
+
+def test_git_context_is_keyed_on_working_directory(tmp_path, monkeypatch):
+    repo = tmp_path / "repo"
+    outside = tmp_path / "outside"
+    repo.mkdir()
+    outside.mkdir()
+    _init_repo(repo)
+
+    monkeypatch.chdir(repo)
+    assert git_utils.get_git_root() == str(repo)
+    monkeypatch.chdir(outside)
+    assert git_utils.get_git_root() is None
+
+
+def test_invalidate_git_context_picks_up_a_new_hooks_path(tmp_path, monkeypatch):
+    _init_repo(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    assert git_utils.get_hooks_dir() == os.path.join(str(tmp_path), ".git", "hooks")
+
+    subprocess.run(
+        ["git", "config", "core.hooksPath", ".husky"], cwd=tmp_path, check=True
+    )
+    git_utils.invalidate_git_context()
+
+    assert git_utils.get_hooks_dir() == os.path.join(str(tmp_path), ".husky")
+
+
+def _rev_parse(path, name):
+    return subprocess.run(
+        ["git", "rev-parse", name], cwd=path, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+def test_get_staged_blob_ids_maps_staged_files_to_their_blob_oids(
+    tmp_path, monkeypatch
+):
+    _init_repo(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    _commit_file(tmp_path, "old name.txt", "renamed content\n")
+    _commit_file(tmp_path, "gone.txt", "deleted\n")
+    subprocess.run(
+        ["git", "mv", "old name.txt", "new name.txt"], cwd=tmp_path, check=True
+    )
+    subprocess.run(["git", "rm", "-q", "gone.txt"], cwd=tmp_path, check=True)
+    (tmp_path / "added.txt").write_text("added\n")
+    subprocess.run(["git", "add", "added.txt"], cwd=tmp_path, check=True)
+
+    blob_ids = git_utils.get_staged_blob_ids()
+
+    assert blob_ids == {
+        str(tmp_path / "new name.txt"): _rev_parse(tmp_path, ":new name.txt"),
+        str(tmp_path / "added.txt"): _rev_parse(tmp_path, ":added.txt"),
+    }
+    assert set(blob_ids) == set(git_utils.get_staged_files())
+    with git_utils.BlobReader() as blobs:
+        oid = blob_ids[str(tmp_path / "added.txt")]
+        assert blobs.blob_content(oid, str(tmp_path / "added.txt")) == "added\n"
+
+
+def test_git_context_common_dir_is_shared_by_linked_worktrees(tmp_path, monkeypatch):
+    repo, worktree = tmp_path / "repo", tmp_path / "wt"
+    repo.mkdir()
+    _init_repo(repo)
+    _commit_file(repo, "a.txt", "a\n")
+    subprocess.run(
+        ["git", "worktree", "add", "-q", str(worktree)], cwd=repo, check=True
+    )
+
+    main = git_utils.get_git_context(str(repo))
+    linked = git_utils.get_git_context(str(worktree))
+
+    assert main.common_dir == linked.common_dir == str(repo / ".git")
+    assert main.index_path != linked.index_path
@@ -1,30 +1,110 @@
 # envshield/utils/git_utils.py
 # Helper functions for interacting with the local Git repository.
 
+import codecs
 import os
+import re
 import subprocess
 
 
-def get_git_root() -> str | None:
+class GitContext:
     """
-    Finds the root directory of the current Git repository.
+    The facts about the current repository that every helper in this
+    module needs -- its root, the hooks directory Git will actually run
+    hooks from, the index file's path, and the common Git directory every
+    linked worktree shares -- resolved once per working directory and then
+    shared for the rest of the process (see get_git_context).
 
-    Returns:
-        The absolute path to the Git root, or None if not in a Git repository.
+    `hooks_dir` is only resolved on first access: a scan never needs it,
+    and it costs a `git config` subprocess of its own.
+    """
+
+    def __init__(self, root: str, index_path: str, common_dir: str):
+        self.root = root
+        self.index_path = index_path
+        self.common_dir = common_dir
+        self._hooks_dir: str | None = None
+
+    @property
+    def hooks_dir(self) -> str:
+        if self._hooks_dir is None:
+            self._hooks_dir = _resolve_hooks_dir(self.root)
+        return self._hooks_dir
+
+
+# Keyed on the absolute working directory a lookup was made from, since
+# that's what `git rev-parse` itself resolves against -- the CLI chdir()s to
+# the project root before running a command, and tests hop between
+# throwaway repos, so one process can legitimately see several. A cached
+# None (not a repository) is as useful as a real context.
+_GIT_CONTEXT_CACHE: dict[str, GitContext | None] = {}
+
+
+def get_git_context(cwd: str | None = None) -> GitContext | None:
     """
+    Returns the GitContext for `cwd` (default: the current directory), or
+    None if it isn't inside a Git repository -- resolving it with a single
+    `git rev-parse` the first time, and from a per-process cache after that.
+
+    Without this, every helper below re-ran `git rev-parse --show-toplevel`
+    for itself -- once per staged file read, once per hook check -- so most
+    of the per-file overhead of a staged scan was subprocess startup.
+    Anything that changes what this resolves to mid-process (`git init`, a
+    new core.hooksPath) must call invalidate_git_context() afterwards.
+    """
+    key = os.path.abspath(cwd or os.getcwd())
+    if key not in _GIT_CONTEXT_CACHE:
+        _GIT_CONTEXT_CACHE[key] = _resolve_git_context(key)
+    return _GIT_CONTEXT_CACHE[key]
+
+
+def invalidate_git_context() -> None:
+    """Forgets every cached GitContext, so the next lookup asks Git again."""
+    _GIT_CONTEXT_CACHE.clear()
+
+
+def _resolve_git_context(cwd: str) -> GitContext | None:
     try:
-        # This git command returns the top-level directory path.
         result = subprocess.run(
-            ["git", "rev-parse", "--show-toplevel"],
+            [
+                "git",
+                "rev-parse",
+                "--show-toplevel",
+                "--git-path",
+                "index",
+                "--git-common-dir",
+            ],
+            cwd=cwd,
             capture_output=True,
             text=True,
             check=True,
         )
-        return result.stdout.strip()
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        # Fails if not in a git repo or if git is not installed.
+    except (subprocess.CalledProcessError, FileNotFoundError, NotADirectoryError):
+        # Fails if not in a git repo (or a bare one, with no working tree)
+        # or if git is not installed.
         return None
 
+    lines = result.stdout.splitlines()
+    if len(lines) < 3:
+        return None
+    root, index_path, common_dir = (line.strip() for line in lines[:3])
+    return GitContext(
+        root,
+        os.path.abspath(os.path.join(cwd, index_path)),
+        os.path.abspath(os.path.join(cwd, common_dir)),
+    )
+
+
+def get_git_root() -> str | None:
+    """
+    Finds the root directory of the current Git repository.
+
+    Returns:
+        The absolute path to the Git root, or None if not in a Git repository.
+    """
+    context = get_git_context()
+    return context.root if context else None
+
 
 def get_hooks_dir() -> str | None:
     """
@@ -40,10 +120,11 @@ def get_hooks_dir() -> str | None:
         The absolute path to the hooks directory, or None if not in a Git
         repository.
     """
-    git_root = get_git_root()
-    if not git_root:
-        return None
+    context = get_git_context()
+    return context.hooks_dir if context else None
 
+
+def _resolve_hooks_dir(git_root: str) -> str:
     try:
         result = subprocess.run(
             ["git", "config", "--get", "core.hooksPath"],
@@ -78,14 +159,17 @@ def get_staged_files() -> list[str]:
 
     try:
         # This git command lists files that are added, copied, modified, or renamed.
+        # NUL-separated (-z), so a path with unusual characters comes back
+        # verbatim instead of C-quoted -- and so matches every other path
+        # this module hands out.
         result = subprocess.run(
-            ["git", "diff", "--cached", "--name-only", "--diff-filter=ACMR"],
+            ["git", "diff", "--cached", "--name-only", "-z", "--diff-filter=ACMR"],
             capture_output=True,
             text=True,
             check=True,
         )
         # The output is relative to the git root, so we make it absolute.
-        relative_paths = result.stdout.strip().split("\n")
+        relative_paths = result.stdout.split("\0")
         absolute_paths = [
             os.path.join(git_root, path) for path in relative_paths if path
         ]
@@ -94,6 +178,308 @@ def get_staged_files() -> list[str]:
         return []
 
 
+# A tracked entry in `git ls-files --stage` output: '<mode> <oid> <stage>\t<path>'.
+# Untracked (--others) entries are bare paths.
+_STAGED_ENTRY_RE = re.compile(rb"^([0-7]{6}) [0-9a-f]+ [0-3]\t(.*)$", re.DOTALL)
+
+# The mode of a gitlink -- a submodule's entry in its parent's index.
+_GITLINK_MODE = b"160000"
+
+
+def list_unignored_files(directory: str) -> list[str] | None:
+    """
+    Lists every file under `directory` that Git would consider part of the
+    project -- tracked, plus untracked but not ignored by .gitignore,
+    .git/info/exclude, or core.excludesFile -- with one `git ls-files`,
+    instead of walking the whole tree on disk.
+
+    Paths are relative to `directory`, '/'-separated, in Git's (sorted)
+    order. An untracked nested repository shows up as a single entry
+    ending in '/', since Git doesn't look inside it -- and so does a
+    submodule, which the index only records as one gitlink (mode 160000),
+    recognized from `--stage`'s mode column. Returns None if `directory`
+    isn't inside a Git work tree, or Git isn't available.
+    """
+    try:
+        result = subprocess.run(
+            [
+                "git",
+                "ls-files",
+                "-z",
+                "--stage",
+                "--cached",
+                "--others",
+                "--exclude-standard",
+            ],
+            cwd=directory,
+            capture_output=True,
+            check=True,
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError, NotADirectoryError):
+        return None
+    paths = []
+    for entry in result.stdout.split(b"\0"):
+        if not entry:
+            continue
+        match = _STAGED_ENTRY_RE.match(entry)
+        if match is None:
+            paths.append(os.fsdecode(entry))
+        elif match.group(1) == _GITLINK_MODE:
+            paths.append(os.fsdecode(match.group(2)).rstrip("/") + "/")
+        else:
+            paths.append(os.fsdecode(match.group(2)))
+    # A path with unresolved merge conflicts is listed once per stage.
+    return list(dict.fromkeys(paths))
+
+
+def get_staged_blob_ids() -> dict[str, str]:
+    """
+    Maps every staged file (the same set get_staged_files returns) to the
+    OID of the blob staged for it, from one `git diff --cached --raw`.
+    A blob's OID is the hash of its content, so it identifies exactly what
+    will be committed -- and lets identical content be recognized without
+    reading it (see scan_cache.BlobScanCache). Submodules, which stage a
+    commit rather than a blob, are left out.
+
+    Returns an empty dict if not in a repository or on any git error.
+    """
+    context = get_git_context()
+    if not context:
+        return {}
+
+    try:
+        result = subprocess.run(
+            [
+                "git",
+                "diff",
+                "--cached",
+                "--raw",
+                "-z",
+                "--no-abbrev",
+                "--diff-filter=ACMR",
+            ],
+            cwd=context.root,
+            capture_output=True,
+            check=True,
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return {}
+
+    # Each record is ':<old mode> <new mode> <old oid> <new oid> <status>'
+    # then its path -- two paths (source, destination) for a copy/rename.
+    fields = result.stdout.decode("utf-8", errors="replace").split("\0")
+    blob_ids = {}
+    i = 0
+    while i < len(fields):
+        meta = fields[i].split()
+        i += 1
+        if len(meta) != 5 or not meta[0].startswith(":"):
+            continue
+        path_count = 2 if meta[4][:1] in ("R", "C") else 1
+        path = fields[i + path_count - 1] if i + path_count - 1 < len(fields) else ""
+        i += path_count
+        if path and meta[1] != "160000":
+            blob_ids[os.path.join(context.root, path)] = meta[3]
+    return blob_ids
+
+
+_HUNK_HEADER_RE = re.compile(r"^@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+def _unquote_diff_path(path: str) -> str:
+    """
+    Undoes the C-style quoting Git applies to a path in a diff header when
+    it contains a quote, backslash, or control character (and the trailing
+    tab it appends when a path contains a space).
+    """
+    if path.startswith('"') and path.endswith('"'):
+        raw = codecs.escape_decode(path[1:-1].encode("utf-8"))[0]
+        return raw.decode("utf-8", errors="replace")
+    return path.rstrip("\t")
+
+
+_INDEX_LINE_RE = re.compile(r"^index [0-9a-f]+\.\.([0-9a-f]+)")
+
+
+def parse_added_lines(
+    diff_output: str, git_root: str, blob_ids: dict[str, str] | None = None
+) -> dict[str, set[int] | None]:
+    """
+    Parses `git diff --unified=0` output into {absolute_path: added_lines}:
+    the 1-indexed line numbers, in the new version of each file, that the
+    diff adds. A file that's entirely new (not in the old side at all) maps
+    to None rather than a set, meaning "every line is new".
+
+    With zero context lines, every hunk header's '+start,count' is exactly
+    the run of added lines, so this never has to compare file contents at
+    all -- the hunk bodies are only walked to step over them, by the
+    counts the header gives, so an added line that happens to look like a
+    header ('+++ ...', '@@ ...') can't be mistaken for one.
+
+    If `blob_ids` is given, it's filled in with {absolute_path: oid} for the
+    new version of each file, from the 'index <old>..<new>' header lines --
+    full OIDs only if the diff was run with `--full-index`.
+    """
+    added: dict[str, set[int] | None] = {}
+    current: str | None = None
+    is_new_file = False
+    new_oid: str | None = None
+    lines = diff_output.split("\n")
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        i += 1
+        if line.startswith("diff --git "):
+            current, is_new_file, new_oid = None, False, None
+        elif line.startswith("new file mode"):
+            is_new_file = True
+        elif line.startswith("index "):
+            match = _INDEX_LINE_RE.match(line)
+            new_oid = match.group(1) if match else None
+        elif line.startswith("+++ "):
+            path = _unquote_diff_path(line[4:])
+            if path == "/dev/null":
+                current = None
+                continue
+            if path.startswith("b/"):
+                path = path[2:]
+            current = os.path.join(git_root, path)
+            added[current] = None if is_new_file else set()
+            if blob_ids is not None and new_oid:
+                blob_ids[current] = new_oid
+        elif line.startswith("@@ "):
+            match = _HUNK_HEADER_RE.match(line)
+            if not match:
+                continue
+            old_count = int(match.group(1) or 1)
+            new_start = int(match.group(2))
+            new_count = int(match.group(3) or 1)
+            if current is not None and added[current] is not None:
+                added[current].update(range(new_start, new_start + new_count))
+            while i < len(lines) and (old_count or new_count):
+                body = lines[i]
+                if body.startswith("-") and old_count:
+                    old_count -= 1
+                elif body.startswith("+") and new_count:
+                    new_count -= 1
+                elif not body.startswith("\\"):
+                    break
+                i += 1
+    return added
+
+
+def get_staged_added_lines() -> dict[str, set[int] | None]:
+    """
+    Returns the lines each staged file adds relative to HEAD, for every
+    staged file at once, as {absolute_path: line_numbers} -- see
+    parse_added_lines for the exact shape. One `git diff --cached -U0`
+    replaces fetching both the HEAD and staged copy of each file and
+    diffing them in Python.
+
+    A file missing from the result has no added lines at all. On any git
+    error this returns an empty dict, i.e. "nothing new anywhere" -- the
+    same conservative answer diff-aware scanning always fell back to.
+    """
+    context = get_git_context()
+    if not context:
+        return {}
+
+    try:
+        result = subprocess.run(
+            [
+                "git",
+                "-c",
+                "core.quotePath=false",
+                "diff",
+                "--cached",
+                "--unified=0",
+                "--no-color",
+                "--no-ext-diff",
+                "--no-textconv",
+                # A renamed file is a brand-new path as far as HEAD is
+                # concerned -- fully rescanned, as it always has been.
+                "--no-renames",
+                # Explicit, so a user's diff.noprefix/mnemonicPrefix config
+                # can't change the header shape parse_added_lines expects.
+                "--src-prefix=a/",
+                "--dst-prefix=b/",
+                "--diff-filter=ACMR",
+            ],
+            cwd=context.root,
+            capture_output=True,
+            check=True,
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return {}
+
+    return parse_added_lines(
+        result.stdout.decode("utf-8", errors="replace"), context.root
+    )
+
+
+def get_range_added_lines(
+    diff_range: str,
+) -> tuple[dict[str, set[int] | None], dict[str, str]] | None:
+    """
+    The lines each file a commit range ('BASE..HEAD', or 'BASE...HEAD' for
+    everything since the two diverged) adds, as parse_added_lines returns
+    them, and the OID of each file's blob at the range's end -- the same
+    pair a staged scan gets from get_staged_added_lines and
+    get_staged_blob_ids, but from a single `git diff -U0 --full-index`.
+    Nothing is read from the working tree or the index, so this works in
+    any checkout of the range's end.
+
+    A file whose changes only delete lines maps to an empty set; a binary
+    file, which the diff has no lines for, isn't listed at all. Returns
+    None if the range can't be diffed (a typo, or a commit a shallow clone
+    hasn't fetched).
+    """
+    context = get_git_context()
+    if not context or diff_range.startswith("-"):
+        return None
+
+    try:
+        result = subprocess.run(
+            [
+                "git",
+                "-c",
+                "core.quotePath=false",
+                "diff",
+                "--unified=0",
+                "--full-index",
+                "--no-color",
+                "--no-ext-diff",
+                "--no-textconv",
+                "--no-renames",
+                "--src-prefix=a/",
+                "--dst-prefix=b/",
+                "--diff-filter=ACMR",
+                diff_range,
+                "--",
+            ],
+            cwd=context.root,
+            capture_output=True,
+            check=True,
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+
+    blob_ids: dict[str, str] = {}
+    added = parse_added_lines(
+        result.stdout.decode("utf-8", errors="replace"), context.root, blob_ids
+    )
+    return added, blob_ids
+
+
+def get_range_end(diff_range: str) -> str | None:
+    """
+    The OID of the commit a range ('BASE..HEAD', 'BASE...HEAD') ends at --
+    HEAD's, if it leaves its end out ('BASE..') -- or None if that isn't a
+    commit.
+    """
+    return resolve_commit(diff_range.rpartition("..")[2] or "HEAD")
+
+
 def get_staged_file_content(file_path: str) -> str | None:
     """
     Reads a file's content as it exists in the Git index (staged), not on disk.
@@ -125,9 +511,10 @@ def get_staged_file_content(file_path: str) -> str | None:
         return None
 
 
-def get_head_file_content(file_path: str) -> str | None:
+def get_head_file_content(file_path: str, revision: str = "HEAD") -> str | None:
     """
-    Reads a file's content from HEAD (the last committed version).
+    Reads a file's content from HEAD (the last committed version) -- or
+    from any other commit, `revision`.
 
     Used for diff-aware scanning: compares HEAD vs staged to detect new lines.
 
@@ -142,7 +529,7 @@ def get_head_file_content(file_path: str) -> str | None:
     relative_path = os.path.relpath(file_path, git_root)
     try:
         result = subprocess.run(
-            ["git", "show", f"HEAD:{relative_path}"],
+            ["git", "show", f"{revision}:{relative_path}"],
             cwd=git_root,
             capture_output=True,
             check=True,
@@ -151,3 +538,278 @@ def get_head_file_content(file_path: str) -> str | None:
     except (subprocess.CalledProcessError, FileNotFoundError):
         # File doesn't exist in HEAD (brand new file) or git error
         return None
+
+
+class BlobReader:
+    """
+    Reads any number of blobs -- staged (':path') or committed
+    ('HEAD:path') -- through one long-lived `git cat-file --batch` process,
+    instead of spawning `git rev-parse` plus `git show` for every file.
+
+    A large staged commit (a vendored directory, say) used to cost two
+    subprocesses per file just to read it, plus two more per excluded file
+    for diff-aware scanning -- tens of seconds of pure process startup in
+    the pre-commit hook. The git root is resolved once, here, and the
+    cat-file process is started lazily on first read. Use as a context
+    manager so the process is always reaped:
+
+        with git_utils.BlobReader() as blobs:
+            content = blobs.staged_content(path)
+    """
+
+    def __init__(self, git_root: str | None = None):
+        self.git_root = git_root or get_git_root()
+        self._process: subprocess.Popen | None = None
+        self._broken = False
+
+    def __enter__(self) -> "BlobReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stops the cat-file process, if one was ever started."""
+        if self._process is None:
+            return
+        try:
+            self._process.stdin.close()
+            self._process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self._process.kill()
+            self._process.wait()
+        finally:
+            self._process.stdout.close()
+            self._process = None
+
+    def _ensure_process(self) -> subprocess.Popen | None:
+        if self._process is None and not self._broken:
+            try:
+                self._process = subprocess.Popen(
+                    ["git", "cat-file", "--batch"],
+                    cwd=self.git_root,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                )
+            except (OSError, ValueError):
+                self._broken = True
+        return self._process
+
+    def read(self, object_name: str) -> bytes | None:
+        """
+        Returns the raw bytes of the blob `object_name` names (anything
+        `git cat-file` accepts, e.g. ':path' or 'HEAD:path'), or None if it
+        doesn't exist or isn't a blob -- the same cases `git show` fails on.
+        """
+        if not self.git_root or "\n" in object_name:
+            # cat-file's batch protocol is newline-delimited, so a path
+            # that contains one can't be asked for through it at all.
+            return None
+        process = self._ensure_process()
+        if process is None:
+            return None
+
+        try:
+            process.stdin.write(object_name.encode("utf-8") + b"\n")
+            process.stdin.flush()
+            header = process.stdout.readline().decode("utf-8", errors="replace")
+            fields = header.split()
+            # '<name> missing' / '<name> ambiguous' carry no body to read.
+            if len(fields) != 3 or not fields[2].isdigit():
+                if not header:
+                    self._broken = True
+                return None
+            _oid, object_type, size = fields
+            data = process.stdout.read(int(size))
+            process.stdout.read(1)  # the LF cat-file terminates every body with
+        except (OSError, ValueError):
+            self._broken = True
+            self.close()
+            return None
+
+        return data if object_type == "blob" else None
+
+    def _read_text(self, object_name: str, file_path: str, fallback) -> str | None:
+        """
+        Decodes one blob the same way the one-shot helpers do. Falls back to
+        that one-shot helper (`fallback`) for the rare path cat-file's batch
+        protocol can't carry, or if the cat-file process couldn't be started
+        or died -- a scan must never silently skip a file just because the
+        fast path is unavailable.
+        """
+        if not self.git_root:
+            return None
+        if "\n" not in object_name:
+            data = self.read(object_name)
+            if not self._broken:
+                return (
+                    data.decode("utf-8", errors="ignore") if data is not None else None
+                )
+        return fallback(file_path)
+
+    def blob_content(
+        self, blob_oid: str, file_path: str, revision: str | None = None
+    ) -> str | None:
+        """
+        Reads the blob `blob_oid` (as returned by get_staged_blob_ids for
+        `file_path`) directly by OID, decoded like staged_content. For a
+        blob get_range_added_lines returned, pass the range's end as
+        `revision`: the fallback then reads `file_path` from that commit,
+        not from the index.
+        """
+        if revision is None:
+            return self._read_text(blob_oid, file_path, get_staged_file_content)
+        return self._read_text(
+            blob_oid, file_path, lambda path: get_head_file_content(path, revision)
+        )
+
+    def staged_content(self, file_path: str) -> str | None:
+        """Batched equivalent of get_staged_file_content."""
+        relative_path = os.path.relpath(file_path, self.git_root or ".")
+        return self._read_text(f":{relative_path}", file_path, get_staged_file_content)
+
+    def head_content(self, file_path: str, revision: str = "HEAD") -> str | None:
+        """Batched equivalent of get_head_file_content."""
+        relative_path = os.path.relpath(file_path, self.git_root or ".")
+        return self._read_text(
+            f"{revision}:{relative_path}",
+            file_path,
+            lambda path: get_head_file_content(path, revision),
+        )
+
+
+def resolve_commit(revision: str) -> str | None:
+    """
+    The full OID of the commit `revision` (a branch, tag, SHA, 'HEAD~3',
+    ...) names, or None if it names none -- or HEAD is asked for in a
+    repository with no commits yet.
+    """
+    context = get_git_context()
+    if not context or revision.startswith("-"):
+        return None
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--verify", "--quiet", f"{revision}^{{commit}}"],
+            cwd=context.root,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+    return result.stdout.strip() or None
+
+
+def list_history_blobs(
+    revisions: list[str],
+) -> tuple[int, list[tuple[str, str, int]]] | None:
+    """
+    Every blob in the history `revisions` selects (as `git rev-list` takes
+    them: 'HEAD', '^v1.0', ...), as (commit_count, [(oid, path, size)]).
+
+    `git rev-list --objects` lists each object once, however many commits
+    and paths it appears under, so every blob here is unique -- listed
+    under the first path the walk (newest commits first) reached it by. Its
+    output is piped straight into one `git cat-file --batch-check`, which
+    tells blobs from trees and commits and gives each blob's size, so
+    nothing is read yet. Returns None if either git command fails.
+    """
+    context = get_git_context()
+    if not context:
+        return None
+    try:
+        rev_list = subprocess.Popen(
+            ["git", "rev-list", "--objects", *revisions, "--"],
+            cwd=context.root,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+    except OSError:
+        return None
+    try:
+        with rev_list:
+            result = subprocess.run(
+                [
+                    "git",
+                    "cat-file",
+                    "--batch-check=%(objectname) %(objecttype) %(objectsize) %(rest)",
+                ],
+                cwd=context.root,
+                stdin=rev_list.stdout,
+                capture_output=True,
+                check=True,
+            )
+    except (subprocess.CalledProcessError, OSError):
+        return None
+    if rev_list.returncode != 0:
+        return None
+
+    commit_count = 0
+    blobs = []
+    for line in result.stdout.decode("utf-8", errors="replace").split("\n"):
+        fields = line.split(" ", 3)
+        if len(fields) < 3:
+            continue
+        if fields[1] == "commit":
+            commit_count += 1
+        elif fields[1] == "blob" and len(fields) == 4 and fields[3]:
+            blobs.append((fields[0], _unquote_diff_path(fields[3]), int(fields[2])))
+    return commit_count, blobs
+
+
+def get_blob_introductions(
+    revisions: list[str], blob_oids: set[str]
+) -> dict[str, list[tuple[str, str]]]:
+    """
+    Maps each of `blob_oids` to every (commit, path) in the history
+    `revisions` selects that introduced it -- added the path with that
+    content, or changed the path to it -- oldest first, from one `git log
+    --raw` over the whole history. A blob only a merge commit introduced
+    (a conflict resolution, say) has none, since a merge's raw diff isn't
+    shown.
+
+    Returns an empty dict on any git error.
+    """
+    context = get_git_context()
+    if not context or not blob_oids:
+        return {}
+    try:
+        result = subprocess.run(
+            [
+                "git",
+                "-c",
+                "core.quotePath=false",
+                "log",
+                "--raw",
+                "--no-abbrev",
+                "--no-renames",
+                "--root",
+                "--diff-filter=AMT",
+                "--format=%H",
+                *revisions,
+                "--",
+            ],
+            cwd=context.root,
+            capture_output=True,
+            check=True,
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return {}
+
+    introductions: dict[str, list[tuple[str, str]]] = {}
+    commit = None
+    for line in result.stdout.decode("utf-8", errors="replace").split("\n"):
+        if not line.startswith(":"):
+            commit = line.strip() or commit
+            continue
+        # ':<old mode> <new mode> <old oid> <new oid> <status>\t<path>'
+        meta, _, path = line.partition("\t")
+        fields = meta.split()
+        if commit and len(fields) == 5 and fields[3] in blob_oids:
+            introductions.setdefault(fields[3], []).append(
+                (commit, _unquote_diff_path(path))
+            )
+    for found in introductions.values():
+        found.reverse()
+    return introductions